@@ -0,0 +1,45 @@
+import random
+
+import numpy as np
+import pytest
+
+from wordle_adversary import Adversary, ShortestWinSearch
+from wordle_feedback import FeedbackTable
+from wordle_wordlist import default_answers
+
+
+@pytest.fixture
+def table(tmp_path):
+    words = list(default_answers()[:80])
+    return FeedbackTable.build(words, words, cache_dir=str(tmp_path))
+
+
+def test_adversary_never_runs_out_of_candidates(table):
+    rng = random.Random(3)
+    for _ in range(20):
+        adversary = Adversary(table)
+        for _ in range(8):
+            before = adversary.solver.get_candidate_ids()
+            guess = rng.choice(table.guesses)
+            feedback = adversary.respond(guess)
+            assert adversary.remaining >= 1
+            if feedback.is_solved():
+                assert list(before) == [table.answer_ids[guess]]
+                break
+            # It keeps the largest bucket
+            counts = np.bincount(
+                table.guess_row(guess)[before], minlength=table.num_patterns
+            )
+            assert adversary.remaining == counts.max()
+
+
+def test_shortest_win_beats_the_adversary(table):
+    search = ShortestWinSearch(table, beam_width=None)
+    path = search.solve(max_guesses=6)
+    assert path is not None
+    assert search.solve(max_guesses=len(path) - 1) is None
+
+    adversary = Adversary(table)
+    for guess in path[:-1]:
+        assert not adversary.respond(guess).is_solved()
+    assert adversary.respond(path[-1]).is_solved()
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from wordle_analytics import analyze_game, analyze_line
+from wordle_feedback import get_default_table
+
+_GRID = "Wordle 1,234 3/6\n\n⬛🟨⬛⬛⬛\n⬛⬛🟨⬛🟨\n🟩🟩🟩🟩🟩"
+
+
+@pytest.mark.parametrize("record", [
+    {"grid": 5},
+    {"grid": _GRID, "answer": 7},
+    {"grid": _GRID, "guesses": ["CRANE", 7, "ROBIN"]},
+    {"grid": _GRID, "guesses": "CRANE"},
+])
+def test_malformed_fields_become_error_rows(record):
+    row = analyze_line(json.dumps(record), get_default_table())
+    assert row["error"]
+
+
+def test_errors_do_not_lose_later_rows():
+    table = get_default_table()
+    rows = [
+        analyze_line(json.dumps(record), table)
+        for record in [{"id": 1, "grid": 5}, {"id": 2, "grid": _GRID}]
+    ]
+    assert [row["id"] for row in rows] == [1, 2]
+    assert rows[0]["error"] and rows[1]["error"] is None
+
+
+def test_grid_without_words_reports_candidates_from_colours():
+    row = analyze_game({"grid": _GRID}, get_default_table())
+    assert row["error"] is None
+    assert row["guesses"] == 3 and row["solved"]
+    assert row["luck"] is None
+    counts = [int(count) for count in row["candidates"].split()]
+    assert counts[0] == len(get_default_table().answers)
+    assert counts == sorted(counts, reverse=True)
+
+
+def test_answer_recovers_words_pinned_down_by_the_colours():
+    # Against ROBIN, only ROBOT and ROUND give the first two rows
+    grid = "🟩🟩🟩⬛⬛\n🟩🟩⬛🟨⬛\n🟩🟩🟩🟩🟩"
+    row = analyze_game({"grid": grid, "answer": "robin"}, get_default_table())
+    assert row["error"] is None
+    assert row["answer"] == "ROBIN"
+    assert row["luck"] is not None and row["skill"] is not None
+
+
+def test_unsolved_grid_without_words_keeps_the_given_answer():
+    row = analyze_game(
+        {"grid": "⬛🟨⬛⬛⬛", "answer": "ROBIN"}, get_default_table()
+    )
+    assert row["answer"] == "ROBIN"
+    assert not row["solved"] and row["luck"] is None
+
+
+def test_answer_which_cannot_produce_the_grid_is_an_error():
+    with pytest.raises(ValueError):
+        analyze_game(
+            {"grid": "🟩🟩🟩🟩🟩", "answer": "ROBIN", "guesses": ["CRANE"]},
+            get_default_table()
+        )
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from wordle_batch import parse_guess, solve_line, solve_stream
+from wordle_feedback import get_default_table
+
+
+@pytest.mark.parametrize("entry", [
+    [123, "BBBBB"],
+    {"word": None, "hints": "BBBBB"},
+    ["CRANE", 5],
+    ["CRANE", {"tiles": "BBBBB"}],
+    ["CRANE", [True, False, None, 1, 0]],
+])
+def test_parse_guess_rejects_malformed_entries(entry):
+    with pytest.raises(TypeError):
+        parse_guess(entry)
+
+
+def test_malformed_record_does_not_stop_the_batch():
+    lines = [
+        json.dumps({"id": 1, "guesses": [["CRANE", "BYBBB"]]}),
+        json.dumps({"id": 2, "guesses": [[123, "BBBBB"]]}),
+        json.dumps({"id": 3, "guesses": [["CRANE", {"tiles": "BBBBB"}]]}),
+        json.dumps({"id": 4, "guesses": [["ÉCRAN", "BBBBB"]]}),
+        "not json",
+        json.dumps({"id": 5, "guesses": [["CRANE", "BYBBB"]]}),
+    ]
+    table = get_default_table()
+    results = [json.loads(solve_line(line, table)) for line in lines]
+
+    assert [result["id"] for result in results] == [1, 2, 3, 4, None, 5]
+    assert [("error" in result) for result in results] == [
+        False, True, True, True, True, False
+    ]
+    assert results[0]["candidates"] == results[-1]["candidates"]
+
+
+def test_malformed_record_does_not_stop_a_worker_pool():
+    lines = [
+        json.dumps({"id": i, "guesses": [[123, "BBBBB"]]}) if i % 2
+        else json.dumps({"id": i, "guesses": [["CRANE", "BYBBB"]]})
+        for i in range(6)
+    ]
+    results = [json.loads(line) for line in solve_stream(lines, workers=2)]
+    assert [result["id"] for result in results] == list(range(6))
+    assert [("error" in result) for result in results] == [
+        i % 2 == 1 for i in range(6)
+    ]
@@ -0,0 +1,55 @@
+import pytest
+
+from wordle_benchmark import compare
+
+
+def _result(median, mad, fastest=None, runs=30):
+    return {
+        "runs": runs, "min": fastest or median * 0.9, "median": median,
+        "mean": median, "stdev": mad * 1.4826, "mad": mad, "max": median * 2
+    }
+
+
+def _baseline(**results):
+    return {"version": 1, "word_lists": "abc", "benchmarks": results}
+
+
+def test_doubled_median_is_a_regression():
+    # Medians 1.7 ms and 3.3 ms. The runs are noisy and one of them was as
+    # fast as the baseline, but most were far slower.
+    baseline = _baseline(empty_state=_result(0.0017, 0.0002))
+    results = {"empty_state": _result(0.0033, 0.0012, fastest=0.0016)}
+    assert len(compare(results, baseline, 0.25, 0.0005)) == 1
+
+
+def test_slowdown_within_noise_is_not_a_regression():
+    baseline = _baseline(empty_state=_result(0.0017, 0.0002, runs=10))
+    results = {"empty_state": _result(0.0023, 0.0020, runs=10)}
+    assert compare(results, baseline, 0.25, 0.0005) == []
+
+
+def test_small_absolute_slowdown_is_not_a_regression():
+    baseline = _baseline(empty_state=_result(0.0001, 0.000001))
+    results = {"empty_state": _result(0.0002, 0.000001)}
+    assert compare(results, baseline, 0.25, 0.0005) == []
+
+
+def test_consistent_slowdown_is_a_regression():
+    baseline = _baseline(rank=_result(0.010, 0.0002))
+    results = {"rank": _result(0.020, 0.0003, fastest=0.019)}
+    assert len(compare(results, baseline, 0.25, 0.0005)) == 1
+
+
+def test_baseline_without_mad_uses_stdev():
+    previous = _result(0.010, 0.0002)
+    del previous["mad"]
+    results = {"rank": _result(0.020, 0.0003, fastest=0.019)}
+    assert len(compare(results, _baseline(rank=previous), 0.25)) == 1
+
+
+def test_baseline_for_other_word_lists_is_refused():
+    baseline = _baseline(rank=_result(0.010, 0.0002))
+    results = {"rank": _result(0.010, 0.0002)}
+    assert compare(results, baseline, 0.25, digest="abc") == []
+    with pytest.raises(ValueError, match="word lists"):
+        compare(results, baseline, 0.25, digest="def")
@@ -0,0 +1,41 @@
+import pytest
+
+import wordle_constraints
+from wordle_constraints import Constraints, WordIndex, compile_constraints
+from wordle_solver import Wordle, WordleSolver
+
+
+@pytest.mark.parametrize("word", ["ÉCRAN", "CR4NE", "CRA-E", "CRAN"])
+def test_add_guess_rejects_words_outside_a_to_z(word):
+    constraints = Constraints(5)
+    with pytest.raises(ValueError, match=word):
+        constraints.add_guess(word, [False] * 5)
+
+
+def test_solver_rejects_non_ascii_guess():
+    solver = WordleSolver(Wordle([Wordle.Guess("ÉCRAN", "BBBBB")]))
+    with pytest.raises(ValueError, match="ÉCRAN"):
+        solver.get_valid_answers()
+
+
+def test_matches_rejects_words_outside_a_to_z():
+    constraints = compile_constraints([Wordle.Guess("CRANE", "BBBBB")])
+    assert constraints.matches("DOILY")
+    assert not constraints.matches("DOİLY")
+    assert not constraints.matches("D0ILY")
+
+
+def test_index_filters_like_matches():
+    words = ["CRANE", "DOILY", "EERIE", "LLAMA", "ROBIN"]
+    constraints = compile_constraints([Wordle.Guess("EERIE", "GYYBB")])
+    index = WordIndex(words)
+    assert index.words_in(index.filter(constraints)) == [
+        word for word in words if constraints.matches(word)
+    ]
+
+
+def test_index_cache_is_bounded():
+    lists = [["CRANE", "DOILY"] for _ in range(40)]
+    indexes = [wordle_constraints.get_index(words) for words in lists]
+    assert len(wordle_constraints._INDEXES) <= 16
+    assert wordle_constraints.get_index(lists[-1]) is indexes[-1]
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from wordle_feedback import Feedback, FeedbackTable
+from wordle_multiboard import MultiBoardSolver, play_game
+from wordle_solver import Wordle, WordleSolver
+from wordle_wordlist import default_answers
+
+
+@pytest.fixture
+def table(tmp_path):
+    words = list(default_answers()[::20])
+    return FeedbackTable.build(words, words, cache_dir=str(tmp_path))
+
+
+def test_boards_match_independent_solvers(table):
+    rng = random.Random(5)
+    answers = rng.sample(table.answers, 4)
+    solver = MultiBoardSolver(len(answers), table)
+    singles = [WordleSolver(Wordle([]), table) for _ in answers]
+
+    for guess in rng.sample(table.guesses, 4) + [answers[0]]:
+        feedback = [
+            Feedback(table.pattern(guess, answer), table.word_length)
+            for answer in answers
+        ]
+        live = solver.unsolved_boards()
+        solver.add_guess(guess, [
+            board_feedback if board in live else None
+            for board, board_feedback in enumerate(feedback)
+        ])
+
+        for board in live:
+            if feedback[board].is_solved():
+                assert solver.is_board_solved(board)
+                assert solver.get_valid_answers(board) == []
+                continue
+            singles[board].add_guess(Wordle.Guess(guess, feedback[board]))
+            assert solver.get_valid_answers(board) == \
+                singles[board].get_valid_answers()
+
+
+def test_one_board_ranks_like_a_single_solver(table):
+    guess = table.guesses[0]
+    feedback = Feedback(
+        table.pattern(guess, table.answers[7]), table.word_length
+    )
+    solver = MultiBoardSolver(1, table)
+    solver.add_guess(guess, [feedback])
+    single = WordleSolver(Wordle([Wordle.Guess(guess, feedback)]), table)
+
+    multi_scores = dict(solver.rank_guesses(len(table.guesses)))
+    for word, bits in single.rank_guesses(10, workers=1):
+        assert multi_scores[word] == pytest.approx(bits)
+
+
+def test_play_game_solves_every_board(table):
+    answers = random.Random(7).sample(table.answers, 4)
+    guesses = play_game(answers, table)
+    assert set(answers) <= set(guesses)
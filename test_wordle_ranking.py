@@ -0,0 +1,34 @@
+import numpy as np
+
+import wordle_ranking
+from wordle_feedback import get_default_table
+from wordle_ranking import entropies, parallel_entropies
+
+
+def test_worker_counts_share_one_pool(monkeypatch):
+    monkeypatch.setattr(wordle_ranking, "_PARALLEL_THRESHOLD", 0)
+    table = get_default_table()
+    guess_ids, candidate_ids = np.arange(200), np.arange(300)
+    expected = entropies(table, guess_ids, candidate_ids)
+
+    for workers in (2, 3):
+        pool = wordle_ranking._get_pool()
+        assert np.allclose(
+            parallel_entropies(table, guess_ids, candidate_ids, workers),
+            expected
+        )
+        assert wordle_ranking._get_pool() is pool
+
+
+def test_pool_shut_down_by_another_caller_falls_back(monkeypatch):
+    monkeypatch.setattr(wordle_ranking, "_PARALLEL_THRESHOLD", 0)
+    table = get_default_table()
+    guess_ids, candidate_ids = np.arange(200), np.arange(300)
+
+    pool = wordle_ranking._get_pool()
+    wordle_ranking._shutdown_pool(pool)
+    monkeypatch.setattr(wordle_ranking, "_get_pool", lambda: pool)
+    assert np.allclose(
+        parallel_entropies(table, guess_ids, candidate_ids, 2),
+        entropies(table, guess_ids, candidate_ids)
+    )
@@ -0,0 +1,62 @@
+import random
+
+import numpy as np
+import pytest
+
+from wordle_feedback import FeedbackTable
+from wordle_reverse import ReverseIndex
+from wordle_wordlist import default_answers
+
+
+@pytest.fixture
+def table(tmp_path):
+    words = list(default_answers()[::20])
+    return FeedbackTable.build(words, words, cache_dir=str(tmp_path))
+
+
+def _brute_force(table, patterns):
+    # Every answer for which each row has its own guess giving its pattern
+    return [
+        answer_id for answer_id, answer in enumerate(table.answers)
+        if all(
+            sum(table.pattern(guess, answer) == pattern
+                for guess in table.guesses) >= patterns.count(pattern)
+            for pattern in patterns
+        )
+    ]
+
+
+@pytest.mark.parametrize("guess_sets", [True, False])
+def test_known_answer_is_consistent_with_its_grid(table, guess_sets):
+    index = ReverseIndex.build(table, guess_sets)
+    rng = random.Random(11)
+    for _ in range(10):
+        answer = rng.choice(table.answers)
+        guesses = rng.sample(table.guesses, 3)
+        patterns = [table.pattern(guess, answer) for guess in guesses]
+
+        answer_ids = index.consistent_answer_ids(patterns)
+        assert table.answer_ids[answer] in answer_ids
+        assert list(answer_ids) == _brute_force(table, patterns)
+
+        answer_id = table.answer_ids[answer]
+        for guess, pattern in zip(guesses, patterns):
+            assert table.guess_ids[guess] in \
+                index.guesses_for(answer_id, pattern)
+
+
+def test_solve_counts_guesses_per_row(table):
+    index = ReverseIndex.build(table)
+    answer = table.answers[3]
+    patterns = [table.pattern(guess, answer) for guess in table.guesses[:2]]
+    result = index.solve(patterns)
+
+    assert answer in result.answers
+    for row, pattern in enumerate(patterns):
+        expected = sum(
+            any(table.pattern(guess, candidate) == pattern
+                for candidate in result.answers)
+            for guess in table.guesses
+        )
+        assert result.row_guess_counts[row] == expected
+    assert np.all(result.answer_guess_counts >= 1)
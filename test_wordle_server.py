@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from wordle_benchmark import differential_check
+from wordle_feedback import FeedbackTable
+from wordle_server import HTTPError, SolveService
+
+_WORDS = ["BARK", "BEAR", "CARE", "DEAR", "FEAR", "GEAR", "LOOK", "NEAR"]
+
+
+def _table(tmp_path) -> FeedbackTable:
+    return FeedbackTable.build(_WORDS, _WORDS, cache_dir=str(tmp_path))
+
+
+def test_server_solves_other_word_lengths(tmp_path):
+    table = _table(tmp_path)
+    service = SolveService(table, workers=1)
+    result = asyncio.run(service.solve({
+        "guesses": [{"word": "BEAR", "hints": "BGGG"}], "rank": 2
+    }))
+    assert result["candidates"] == ["DEAR", "FEAR", "GEAR", "NEAR"]
+    assert len(result["suggestions"]) == 2
+
+
+def test_differential_check_passes_on_other_word_lengths(tmp_path):
+    assert differential_check(_table(tmp_path), samples=200, games=20) == []
+
+
+def test_unknown_paths_share_one_counter(tmp_path):
+    service = SolveService(_table(tmp_path), workers=1)
+
+    async def scan() -> None:
+        for i in range(50):
+            with pytest.raises(HTTPError):
+                await service.route("GET", f"/random/{i}", b"")
+        await service.route("GET", "/health", b"")
+
+    asyncio.run(scan())
+    assert service.requests == {"other": 50, "/health": 1}
@@ -0,0 +1,94 @@
+import gc
+import threading
+import tracemalloc
+
+from wordle_feedback import get_default_table
+from wordle_sessions import SessionStore
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_expired_sessions_are_not_present():
+    clock = _Clock()
+    store = SessionStore(get_default_table(), ttl=60, clock=clock)
+    store.create("old")
+    clock.now = 30
+    store.create("new")
+    clock.now = 61
+
+    assert "old" not in store
+    assert "new" in store
+    assert len(store) == 1
+
+
+def test_byte_limit_counts_the_full_cost_of_each_session():
+    table = get_default_table()
+    store = SessionStore(table)
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    for i in range(5000):
+        session_id = store.create()
+        store.add_guess(
+            session_id, "CRANE", table.pattern("CRANE", table.answers[i % 50])
+        )
+    gc.collect()
+    measured = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    # Object sizes differ between interpreters, so only the scale is checked
+    estimated = store.stats()["bytes"]
+    assert measured / 2 <= estimated <= 2 * measured
+
+
+def test_byte_limit_evicts_least_recently_used():
+    store = SessionStore(get_default_table(), max_bytes=10000)
+    for i in range(100):
+        store.create(str(i))
+    assert store.stats()["bytes"] <= 10000
+    assert "99" in store and "0" not in store
+
+
+def test_restored_sessions_expire_behind_live_ones(tmp_path):
+    clock = _Clock()
+    table = get_default_table()
+    path = str(tmp_path / "sessions.json")
+    store = SessionStore(table, ttl=60, clock=clock)
+    store.create("stale")
+    clock.now = 50
+    store.snapshot(path)
+
+    restored = SessionStore(table, ttl=60, clock=clock)
+    restored.create("fresh")
+    restored.restore(path)
+    clock.now = 70
+
+    assert "stale" not in restored
+    assert "fresh" in restored
+    assert restored.stats()["sessions"] == 1
+
+
+def test_concurrent_snapshots_to_one_path(tmp_path):
+    table = get_default_table()
+    store = SessionStore(table)
+    for i in range(200):
+        store.add_guess(store.create(str(i)), "CRANE", "BYBBB")
+    path = str(tmp_path / "sessions.json")
+
+    threads = [
+        threading.Thread(target=store.snapshot, args=(path,))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert SessionStore(table).restore(path) == 200
+    assert [p.name for p in tmp_path.iterdir()] == ["sessions.json"]
@@ -0,0 +1,15 @@
+from wordle_solver import Wordle, WordleSolver
+
+
+def test_assigning_hints_updates_feedback_and_candidates():
+    guess = Wordle.Guess("CRANE", "BBBBB")
+    solver = WordleSolver(Wordle([guess]))
+    assert "BROTH" not in solver.get_valid_answers()
+
+    guess.hints = [None, True, None, None, None]
+    assert str(guess.feedback) == "BGBBB"
+    assert guess.hints == [None, True, None, None, None]
+    assert "BROTH" in solver.get_valid_answers()
+
+    guess.hints = "BBBBB"
+    assert "BROTH" not in solver.get_valid_answers()
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from wordle_feedback import FeedbackTable
+from wordle_tree import OBJECTIVE_MINIMAX, StrategyTree
+from wordle_wordlist import default_answers
+
+
+@pytest.fixture
+def table(tmp_path):
+    words = list(default_answers()[:60])
+    return FeedbackTable.build(words, words, cache_dir=str(tmp_path))
+
+
+def _play(tree, table, answer):
+    patterns = []
+    while True:
+        guess = tree.next_guess(patterns)
+        patterns.append(table.pattern(guess, answer))
+        if guess == answer:
+            return len(patterns)
+
+
+def test_tree_solves_every_answer_within_its_cost(table):
+    tree, cost = StrategyTree.build(table, OBJECTIVE_MINIMAX)
+    assert max(_play(tree, table, answer) for answer in table.answers) \
+        == cost
+
+
+def test_save_and_load_round_trip(table, tmp_path):
+    tree, _ = StrategyTree.build(table)
+    path = str(tmp_path / "tree.npz")
+    tree.save(path)
+
+    loaded = StrategyTree.load(path, table)
+    for name in ("guesses", "child_offsets", "child_patterns", "child_nodes"):
+        assert np.array_equal(getattr(loaded, name), getattr(tree, name))
+    assert all(
+        _play(loaded, table, answer) == _play(tree, table, answer)
+        for answer in table.answers
+    )
+
+
+def test_load_rejects_other_word_lists(table, tmp_path):
+    tree, _ = StrategyTree.build(table)
+    path = str(tmp_path / "tree.npz")
+    tree.save(path)
+
+    words = list(default_answers()[60:120])
+    other = FeedbackTable.build(words, words, cache_dir=str(tmp_path))
+    with pytest.raises(ValueError, match="different word list"):
+        StrategyTree.load(path, other)
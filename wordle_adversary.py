@@ -0,0 +1,277 @@
+import argparse
+import sys
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from wordle_constraints import check_word
+from wordle_feedback import Feedback, FeedbackTable, get_default_table
+from wordle_ranking import pattern_counts
+from wordle_simulator import Strategy, load_strategy
+from wordle_solver import Wordle, WordleSolver
+
+# Games against the adversary are abandoned after this many guesses, so
+# that a strategy which never narrows its candidates cannot loop forever
+_GUESS_LIMIT = 20
+
+
+@lru_cache(maxsize=None)
+def _pattern_preference(length: int) -> np.ndarray:
+    """When buckets tie for size, the adversary shows the pattern which
+    reveals the least: fewest green tiles, then fewest yellow tiles. Solving
+    the game outright is always its last resort.
+
+    Args:
+        length (int): The number of letters in a word
+
+    Returns:
+        np.ndarray: A preference per pattern code, higher is preferred, with
+        every value below the number of patterns
+    """
+    num_patterns = 3 ** length
+    codes = np.arange(num_patterns)
+    tiles = np.stack([codes // 3 ** i % 3 for i in range(length)])
+    greens = (tiles == Feedback.CORRECT).sum(axis=0)
+    yellows = (tiles == Feedback.WRONG_PLACE).sum(axis=0)
+    order = np.lexsort((codes, yellows, greens))
+
+    preference = np.empty(num_patterns, dtype=np.int64)
+    preference[order] = np.arange(num_patterns - 1, -1, -1)
+    return preference
+
+
+def adversary_patterns(
+    table: FeedbackTable, guess_ids: np.ndarray, candidate_ids: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Works out the adversary's reply to many guesses at once.
+
+    Args:
+        table (FeedbackTable): The feedback table to read patterns from
+        guess_ids (np.ndarray): Row ids of the guesses
+        candidate_ids (np.ndarray): Column ids of the remaining answers
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The pattern the adversary shows for
+        each guess, and how many candidates remain after it
+    """
+    counts = pattern_counts(table, guess_ids, candidate_ids)
+    preference = _pattern_preference(table.word_length)
+    chosen = np.argmax(counts * table.num_patterns + preference, axis=1)
+    return chosen, counts[np.arange(len(guess_ids)), chosen]
+
+
+class Adversary:
+    """An Absurdle-style opponent. It never picks an answer. Instead, after
+    each guess it keeps the largest set of candidates which give the same
+    pattern and shows that pattern, so it only loses once a single candidate
+    remains and that candidate is guessed.
+    """
+
+    def __init__(self, feedback_table: Optional[FeedbackTable] = None) -> None:
+        self.solver = WordleSolver(Wordle([]), feedback_table)
+        self.table = self.solver.feedback_table
+
+    @property
+    def remaining(self) -> int:
+        return len(self.solver.get_candidate_ids())
+
+    def respond(self, guess: str) -> Feedback:
+        """
+        Args:
+            guess (str): The guessed word
+
+        Returns:
+            Feedback: The pattern the adversary shows for it
+        """
+        guess = guess.upper()
+        candidate_ids = self.solver.get_candidate_ids()
+        patterns = self.table.guess_row(guess)[candidate_ids]
+        counts = np.bincount(patterns, minlength=self.table.num_patterns)
+        pattern = np.argmax(
+            counts * self.table.num_patterns
+            + _pattern_preference(self.table.word_length)
+        )
+        feedback = Feedback(int(pattern), self.table.word_length)
+
+        self.solver.add_guess(Wordle.Guess(guess, feedback))
+        return feedback
+
+    def undo(self) -> None:
+        self.solver.undo()
+
+
+def play_against(strategy: Strategy, table: FeedbackTable) -> List[str]:
+    """Plays a strategy against the adversary until it wins.
+
+    Args:
+        strategy (Strategy): Picks each guess, as in wordle_simulator
+        table (FeedbackTable): The feedback table to play with
+
+    Returns:
+        List[str]: The guesses made
+    """
+    adversary = Adversary(table)
+    solver = WordleSolver(Wordle([]), table)
+
+    guesses = []
+    while len(guesses) < _GUESS_LIMIT:
+        guess = strategy(solver)
+        guesses.append(guess)
+        feedback = adversary.respond(guess)
+        if feedback.is_solved():
+            break
+        solver.add_guess(Wordle.Guess(guess, feedback))
+    return guesses
+
+
+class ShortestWinSearch:
+    """Searches for the fewest guesses which are sure to beat the adversary.
+    Since the adversary's replies are fixed by the guesses, a win is a
+    single sequence of guesses, found by iterative deepening. Each candidate
+    set is scored against every guess in one vectorized pass, and only the
+    beam_width guesses which leave the fewest candidates are tried.
+    """
+
+    def __init__(
+        self,
+        table: FeedbackTable,
+        beam_width: Optional[int] = 20,
+        guess_ids: Optional[np.ndarray] = None
+    ) -> None:
+        self.table = table
+        self.beam_width = beam_width
+        self.guess_ids = (
+            np.arange(len(table.guesses)) if guess_ids is None else guess_ids
+        )
+        self._answer_guess_ids = np.array([
+            table.guess_ids.get(word, -1) for word in table.answers
+        ])
+
+        # Candidate key -> the most guesses known not to be enough to win
+        self._lost: Dict[bytes, int] = {}
+
+    def _search(
+        self, candidate_ids: np.ndarray, guesses_left: int
+    ) -> Optional[List[int]]:
+        if len(candidate_ids) == 1:
+            guess_id = int(self._answer_guess_ids[candidate_ids[0]])
+            return [guess_id] if guess_id >= 0 and guesses_left >= 1 else None
+        # Two or more candidates need a guess to single one out, then a
+        # guess to win
+        if guesses_left < 2:
+            return None
+
+        key = candidate_ids.astype(np.int32).tobytes()
+        if self._lost.get(key, 0) >= guesses_left:
+            return None
+
+        patterns, remaining = adversary_patterns(
+            self.table, self.guess_ids, candidate_ids
+        )
+        order = np.argsort(remaining, kind="stable")
+        if guesses_left == 2:
+            # Only a guess which leaves one candidate can still win
+            order = order[remaining[order] == 1]
+        else:
+            order = order[remaining[order] < len(candidate_ids)]
+        if self.beam_width is not None:
+            order = order[:self.beam_width]
+
+        for i in order:
+            guess_id = int(self.guess_ids[i])
+            if patterns[i] == self.table.all_correct:
+                return [guess_id]
+            child = candidate_ids[
+                self.table.patterns[guess_id][candidate_ids] == patterns[i]
+            ]
+            path = self._search(child, guesses_left - 1)
+            if path is not None:
+                return [guess_id] + path
+
+        self._lost[key] = guesses_left
+        return None
+
+    def solve(
+        self,
+        candidate_ids: Optional[np.ndarray] = None,
+        max_guesses: int = 8
+    ) -> Optional[List[str]]:
+        """
+        Args:
+            candidate_ids (Optional[np.ndarray]): The answers the adversary
+            can still choose from. Defaults to every answer in the table.
+            max_guesses (int): The longest win to look for
+
+        Returns:
+            Optional[List[str]]: The guesses of the shortest win found, the
+            last of which solves the game, or None if there is no win within
+            max_guesses among the guesses searched
+        """
+        if candidate_ids is None:
+            candidate_ids = np.arange(len(self.table.answers))
+        for guesses_left in range(1, max_guesses + 1):
+            path = self._search(candidate_ids, guesses_left)
+            if path is not None:
+                return [self.table.guesses[i] for i in path]
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Play Wordle against an adversary which avoids "
+        "committing to an answer"
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--solve", action="store_true",
+        help="Search for the shortest guaranteed win"
+    )
+    mode.add_argument(
+        "-s", "--strategy",
+        help="Play a simulator strategy (name or module:function) against "
+        "the adversary"
+    )
+    parser.add_argument(
+        "--beam-width", type=int, default=20,
+        help="Guesses tried per position by --solve (0 for all)"
+    )
+    parser.add_argument("--max-guesses", type=int, default=8)
+    args = parser.parse_args()
+
+    table = get_default_table()
+    if args.solve:
+        search = ShortestWinSearch(table, args.beam_width or None)
+        path = search.solve(max_guesses=args.max_guesses)
+        if path is None:
+            print(f"No win found within {args.max_guesses} guesses")
+        else:
+            print(f"{len(path)} guesses: {' '.join(path)}")
+    elif args.strategy:
+        guesses = play_against(load_strategy(args.strategy), table)
+        print(f"{len(guesses)} guesses: {' '.join(guesses)}")
+    else:
+        adversary = Adversary(table)
+        print("Enter guesses, one per line (undo to take one back)")
+        for line in sys.stdin:
+            guess = line.strip().upper()
+            if not guess:
+                continue
+            if guess == "UNDO":
+                try:
+                    adversary.undo()
+                except IndexError as error:
+                    print(error)
+                    continue
+            else:
+                try:
+                    guess = check_word(guess, table.word_length)
+                except ValueError as error:
+                    print(error)
+                    continue
+                feedback = adversary.respond(guess)
+                if feedback.is_solved():
+                    print(f"{feedback} Solved!")
+                    break
+                print(feedback, end=' ')
+            print(f"({adversary.remaining} candidates left)")
@@ -0,0 +1,499 @@
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+)
+
+import numpy as np
+
+from wordle_constraints import check_word
+from wordle_feedback import Feedback, FeedbackTable, get_default_table
+from wordle_parallel import bounded_map, chunk_lines
+from wordle_reverse import ReverseIndex
+from wordle_solver import Wordle, WordleSolver
+
+# Shared results sent to a worker in one task
+_CHUNK_SIZE = 64
+
+# Chunks in flight per worker. Bounds memory regardless of input size.
+_CHUNKS_PER_WORKER = 4
+
+# e.g. "Wordle 1,234 4/6*", where X is a loss and * marks hard mode
+_HEADER = re.compile(
+    r"Wordle\s+(?P<puzzle>\d[\d,.]*)\s+(?P<score>[\dX])/\d+(?P<hard>\*)?",
+    re.IGNORECASE
+)
+
+# Columns of the CSV output. Per-turn values are space-separated, one per
+# guess.
+COLUMNS = [
+    "id", "puzzle", "answer", "hard_mode", "guesses", "solved", "skill",
+    "luck", "candidates", "information", "expected", "best", "error"
+]
+
+
+class SharedGame(NamedTuple):
+    """A parsed shared result."""
+
+    puzzle: Optional[int]
+    hard_mode: bool
+    words: List[Optional[str]]
+    feedback: List[Feedback]
+
+
+def parse_grid(text: str) -> SharedGame:
+    """Parses a shared result, such as
+
+        Wordle 1,234 3/6
+
+        ⬛🟨⬛🟩⬛ CRANE
+        🟩🟩⬛⬛🟨 ROBIN
+        🟩🟩🟩🟩🟩 ROUND
+
+    The header is optional, and so are the guessed words, which may come
+    before or after each row of tiles. Any other lines are ignored.
+
+    Args:
+        text (str): The shared text
+
+    Returns:
+        SharedGame: The puzzle number, whether it was played in hard mode,
+        and the guessed word (or None) and feedback of each row
+    """
+    puzzle = None
+    hard_mode = False
+    words = []
+    feedback = []
+    for line in text.splitlines():
+        header = _HEADER.search(line)
+        if header:
+            puzzle = int(re.sub(r"\D", "", header.group("puzzle")))
+            hard_mode = bool(header.group("hard"))
+            continue
+
+        word = None
+        tiles = []
+        for token in line.split():
+            if token.isascii() and token.isalpha():
+                word = token.upper()
+            else:
+                tiles.append(token)
+        if not tiles:
+            continue
+        try:
+            feedback.append(Feedback.parse(''.join(tiles)))
+        except ValueError:
+            continue
+        words.append(word)
+
+    return SharedGame(puzzle, hard_mode, words, feedback)
+
+
+def _expected_information(
+    table: FeedbackTable, word: str, candidate_ids: np.ndarray
+) -> float:
+    """
+    Returns:
+        float: The information, in bits, a guess is expected to reveal about
+        the candidates, whether or not it is in the guess list
+    """
+    counts = np.bincount(table.guess_row(word)[candidate_ids])
+    p = counts[counts > 0] / len(candidate_ids)
+    return float((p * np.log2(1 / p)).sum())
+
+
+def _format_bits(values: Iterable[float]) -> str:
+    return ' '.join(f"{value:.3f}" for value in values)
+
+
+# The reverse index over the last table analyzed, built on first use
+_reverse_index: Optional[ReverseIndex] = None
+
+
+def _get_reverse_index(table: FeedbackTable) -> ReverseIndex:
+    global _reverse_index
+    if _reverse_index is None or _reverse_index.table is not table:
+        # Only the counts are kept: a column read recovers the guesses for
+        # one answer
+        _reverse_index = ReverseIndex.build(table, guess_sets=False)
+    return _reverse_index
+
+
+def _recover_words(
+    game: SharedGame,
+    words: List[Optional[str]],
+    answer: Optional[str],
+    table: FeedbackTable
+) -> Tuple[List[Optional[str]], Optional[str]]:
+    """Fills in what the colours alone determine. A solved grid which only
+    one answer fits gives the answer, and a row which only one guess could
+    have made against the answer gives that guess.
+
+    Returns:
+        Tuple[List[Optional[str]], Optional[str]]: The guessed words, still
+        None where they could not be recovered, and the answer if known
+    """
+    index = _get_reverse_index(table)
+    answer_ids = index.consistent_answer_ids(game.feedback)
+    if answer is None:
+        if game.feedback[-1].is_solved() and len(answer_ids) == 1:
+            answer = table.answers[answer_ids[0]]
+        else:
+            return words, None
+
+    answer_id = table.answer_ids.get(answer)
+    if answer_id is None:
+        return words, answer
+    if answer_id not in answer_ids:
+        raise ValueError(f"{answer} cannot produce this grid")
+
+    recovered = []
+    for word, feedback in zip(words, game.feedback):
+        if word is None:
+            guess_ids = index.guesses_for(answer_id, feedback)
+            if len(guess_ids) == 1:
+                word = table.guesses[guess_ids[0]]
+        recovered.append(word)
+    return recovered, answer
+
+
+def _colours_only(
+    game: SharedGame, answer: Optional[str], table: FeedbackTable
+) -> dict:
+    """
+    Returns:
+        dict: A row for a grid whose words cannot all be recovered. The
+        candidates before each turn are the answers which the colours of the
+        earlier rows allow; the rest depends on the words, so is left empty.
+    """
+    index = _get_reverse_index(table)
+    turns = len(game.feedback)
+    for turn, feedback in enumerate(game.feedback):
+        if feedback.is_solved():
+            turns = turn + 1
+            break
+    candidates = [
+        len(index.consistent_answer_ids(game.feedback[:turn]))
+        for turn in range(turns)
+    ]
+    row = dict.fromkeys(COLUMNS)
+    row.update({
+        "puzzle": game.puzzle,
+        "answer": answer,
+        "hard_mode": game.hard_mode,
+        "guesses": turns,
+        "solved": game.feedback[turns - 1].is_solved(),
+        "candidates": ' '.join(str(count) for count in candidates)
+    })
+    return row
+
+
+def analyze_game(record: Dict[str, Any], table: FeedbackTable) -> dict:
+    """Replays a shared game with the solver. Each guess's expected
+    information is compared with that of the best guess available at the
+    time (its skill), and the information it actually revealed is compared
+    with what was expected (its luck).
+
+    Shared grids usually leave the words out. Words which the colours and
+    answer determine are recovered; if some still are not known, the row
+    only holds the candidate counts which the colours alone give.
+
+    Args:
+        record (Dict[str, Any]): A shared result under "grid", with an
+        optional "id", "answer" and "guesses" (the guessed words, if the
+        grid does not hold them)
+        table (FeedbackTable): The feedback table to solve with
+
+    Returns:
+        dict: A row with the COLUMNS. skill is the mean ratio of expected to
+        best expected information over the turns with more than one
+        candidate; luck is the total information revealed beyond what was
+        expected, in bits.
+
+    Raises:
+        TypeError: If a field has the wrong type
+        ValueError: If the grid cannot be replayed
+    """
+    grid = record["grid"]
+    if not isinstance(grid, str):
+        raise TypeError(f"grid must be a string, got {grid!r}")
+    game = parse_grid(grid)
+    if not game.feedback:
+        raise ValueError("No rows of tiles in the grid")
+
+    words = list(game.words)
+    guesses = record.get("guesses")
+    if guesses:
+        if not isinstance(guesses, list):
+            raise TypeError(f"guesses must be a list, got {guesses!r}")
+        guesses = [check_word(word, table.word_length) for word in guesses]
+        if len(guesses) != len(words):
+            raise ValueError(
+                f"{len(guesses)} guesses for {len(words)} rows of tiles"
+            )
+        words = [word or guess for word, guess in zip(words, guesses)]
+
+    answer = record.get("answer")
+    if answer is not None:
+        if not isinstance(answer, str):
+            raise TypeError(f"answer must be a string, got {answer!r}")
+        answer = check_word(answer, table.word_length)
+    if None in words:
+        words, answer = _recover_words(game, words, answer, table)
+        if None in words:
+            row = _colours_only(game, answer, table)
+            row["id"] = record.get("id")
+            return row
+    if answer is None and game.feedback[-1].is_solved():
+        answer = words[-1]
+
+    solver = WordleSolver(Wordle([]), table)
+    candidates, information, expected, best = [], [], [], []
+    for word, feedback in zip(words, game.feedback):
+        if answer is not None and table.pattern(word, answer) != feedback:
+            raise ValueError(f"{word} {feedback} does not match {answer}")
+        candidate_ids = solver.get_candidate_ids()
+        if len(candidate_ids) == 0:
+            raise ValueError("No answer fits the grid")
+
+        remaining = int(
+            (table.guess_row(word)[candidate_ids] == feedback).sum()
+        )
+        if remaining == 0:
+            raise ValueError(f"No answer fits {word} {feedback}")
+        ranking = solver.rank_guesses(1, workers=1, hard_mode=game.hard_mode)
+
+        candidates.append(len(candidate_ids))
+        information.append(math.log2(len(candidate_ids) / remaining))
+        expected.append(_expected_information(table, word, candidate_ids))
+        best.append(ranking[0][1] if ranking else 0.0)
+
+        if feedback.is_solved():
+            break
+        solver.add_guess(Wordle.Guess(word, feedback))
+
+    choices = [
+        (played, most)
+        for count, played, most in zip(candidates, expected, best)
+        if count > 1
+    ]
+    skill = (
+        sum(min(played / most, 1.0) if most > 0 else 1.0
+            for played, most in choices) / len(choices)
+        if choices else None
+    )
+
+    return {
+        "id": record.get("id"),
+        "puzzle": game.puzzle,
+        "answer": answer,
+        "hard_mode": game.hard_mode,
+        "guesses": len(candidates),
+        "solved": game.feedback[len(candidates) - 1].is_solved(),
+        "skill": None if skill is None else round(skill, 4),
+        "luck": round(sum(information) - sum(expected), 4),
+        "candidates": ' '.join(str(count) for count in candidates),
+        "information": _format_bits(information),
+        "expected": _format_bits(expected),
+        "best": _format_bits(best),
+        "error": None
+    }
+
+
+def analyze_line(line: str, table: FeedbackTable) -> dict:
+    """Analyzes one JSONL shared result. Malformed results produce a row
+    with only the id and error set rather than stopping the whole run.
+    """
+    record: Any = None
+    try:
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("Expected a JSON object")
+        return analyze_game(record, table)
+    except (KeyError, TypeError, ValueError) as error:
+        row = dict.fromkeys(COLUMNS)
+        if isinstance(record, dict):
+            row["id"] = record.get("id")
+        row["error"] = str(error) or type(error).__name__
+        return row
+
+
+class Summary:
+    """Running totals over analyzed games, in constant memory."""
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.errors = 0
+        self.solved = 0
+        self.guess_counts: Counter = Counter()
+        self._skill_total = 0.0
+        self._skill_games = 0
+        self._luck_total = 0.0
+        self._luck_games = 0
+
+    def add(self, row: dict) -> None:
+        if row["error"] is not None:
+            self.errors += 1
+            return
+        self.games += 1
+        if row["solved"]:
+            self.solved += 1
+            self.guess_counts[row["guesses"]] += 1
+        else:
+            self.guess_counts['X'] += 1
+        if row["skill"] is not None:
+            self._skill_total += row["skill"]
+            self._skill_games += 1
+        # Grids whose words could not be recovered have no luck
+        if row["luck"] is not None:
+            self._luck_total += row["luck"]
+            self._luck_games += 1
+
+    def to_dict(self) -> dict:
+        solved_guesses = sum(
+            count * guesses for guesses, count in self.guess_counts.items()
+            if guesses != 'X'
+        )
+        return {
+            "games": self.games,
+            "errors": self.errors,
+            "solved": self.solved,
+            "mean_guesses": solved_guesses / self.solved if self.solved
+            else None,
+            "distribution": {
+                str(guesses): count
+                for guesses, count in sorted(
+                    self.guess_counts.items(), key=lambda item: str(item[0])
+                )
+            },
+            "mean_skill": round(self._skill_total / self._skill_games, 4)
+            if self._skill_games else None,
+            "mean_luck": round(self._luck_total / self._luck_games, 4)
+            if self._luck_games else None
+        }
+
+
+# The table opened by each worker process, memory-mapped from the shared
+# cache file
+_worker_table: Optional[FeedbackTable] = None
+
+
+def _init_worker() -> None:
+    global _worker_table
+    _worker_table = get_default_table()
+
+
+def _analyze_chunk(lines: List[str]) -> List[dict]:
+    return [analyze_line(line, _worker_table) for line in lines]
+
+
+def analyze_stream(
+    lines: Iterable[str],
+    workers: Optional[int] = None,
+    ordered: bool = True
+) -> Iterator[dict]:
+    """Analyzes a stream of JSONL shared results on a pool of processes,
+    reading only a bounded window of the input ahead of the output.
+
+    Args:
+        lines (Iterable[str]): JSONL shared results, read lazily
+        workers (Optional[int]): Number of worker processes. Defaults to the
+        number of CPUs. With one worker, results are analyzed in this
+        process.
+        ordered (bool): Whether rows keep the order of the input
+
+    Returns:
+        Iterator[dict]: One row per shared result
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        table = get_default_table()
+        for line in lines:
+            if line.strip():
+                yield analyze_line(line, table)
+        return
+
+    # Build (or load) the table before forking so that workers only ever
+    # memory-map the finished file
+    get_default_table()
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as executor:
+        for rows in bounded_map(
+            _analyze_chunk,
+            chunk_lines(lines, _CHUNK_SIZE),
+            executor,
+            workers * _CHUNKS_PER_WORKER,
+            ordered
+        ):
+            yield from rows
+
+
+def _read_lines(paths: List[str]) -> Iterator[str]:
+    for path in paths:
+        if path == '-':
+            yield from sys.stdin
+        else:
+            with open(path, encoding="utf-8") as input_file:
+                yield from input_file
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Score the skill and luck of shared Wordle results",
+        epilog="Shared grids usually leave out the words. Words which the "
+        "colours and the answer pin down are recovered; otherwise only the "
+        "candidate counts the colours allow are reported, and skill and luck "
+        "are left empty. Give \"guesses\" or the words in the grid for a "
+        "full replay."
+    )
+    parser.add_argument(
+        "inputs", nargs='*', default=['-'],
+        help="JSONL files of shared results ('-' for stdin), each with a "
+        "\"grid\" and optionally an \"id\", \"answer\" and \"guesses\""
+    )
+    parser.add_argument(
+        "-o", "--output", help="CSV file to write (default stdout)"
+    )
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument(
+        "--unordered", action="store_true",
+        help="Write rows as soon as they are ready"
+    )
+    parser.add_argument(
+        "--summary", metavar="PATH",
+        help="Write aggregate statistics as JSON to PATH instead of stderr"
+    )
+    args = parser.parse_args(argv)
+
+    output_file = open(args.output, 'w', newline='') if args.output \
+        else sys.stdout
+    summary = Summary()
+    try:
+        writer = csv.DictWriter(output_file, COLUMNS)
+        writer.writeheader()
+        for row in analyze_stream(
+            _read_lines(args.inputs), args.workers, not args.unordered
+        ):
+            writer.writerow(row)
+            summary.add(row)
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    report = json.dumps(summary.to_dict(), indent=2)
+    if args.summary:
+        with open(args.summary, 'w') as summary_file:
+            summary_file.write(report + '\n')
+    else:
+        sys.stderr.write(report + '\n')
+
+
+if __name__ == "__main__":
+    main()
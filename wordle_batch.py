@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional
+
+import wordle_stats
+from wordle_feedback import FeedbackTable, get_default_table
+from wordle_parallel import bounded_map, chunk_lines
+from wordle_solver import Wordle, WordleSolver
+
+# Game states sent to a worker in one task. Amortizes the cost of passing
+# work between processes.
+_CHUNK_SIZE = 256
+
+# Chunks in flight per worker. Bounds memory regardless of input size.
+_CHUNKS_PER_WORKER = 4
+
+
+def parse_guess(entry) -> Wordle.Guess:
+    """
+    Args:
+        entry: Either {"word": ..., "hints": ...} or a [word, hints] pair.
+        Hints are a tile string such as "GYBBB" or a list of true, false and
+        null as used by Wordle.Guess.
+
+    Returns:
+        Wordle.Guess: The parsed guess
+
+    Raises:
+        TypeError: If the word is not a string, or the hints are neither a
+        string nor a list of true, false and null
+    """
+    if isinstance(entry, dict):
+        word, hints = entry["word"], entry["hints"]
+    else:
+        word, hints = entry
+
+    if not isinstance(word, str):
+        raise TypeError(f"Expected a word, got {word!r}")
+    if not isinstance(hints, str):
+        if not isinstance(hints, (list, tuple)) or not all(
+            hint is None or isinstance(hint, bool) for hint in hints
+        ):
+            raise TypeError(
+                f"Expected hints for {word!r} as a tile string or a list of "
+                f"true, false and null, got {hints!r}"
+            )
+        hints = list(hints)
+    return Wordle.Guess(word.upper(), hints)
+
+
+def solve_record(
+    record: dict, table: FeedbackTable, rank: int = 0
+) -> dict:
+    """
+    Args:
+        record (dict): A game state with an optional "id" and a "guesses"
+        list of entries accepted by parse_guess
+        table (FeedbackTable): The feedback table to solve with
+        rank (int): The number of ranked guesses to include
+
+    Returns:
+        dict: The id, count and list of candidates, plus the ranked
+        "suggestions" when rank is positive
+    """
+    guesses = [parse_guess(entry) for entry in record.get("guesses", [])]
+    solver = WordleSolver(Wordle(guesses), table)
+    candidates = solver.get_valid_answers()
+
+    result = {
+        "id": record.get("id"),
+        "count": len(candidates),
+        "candidates": candidates
+    }
+    if rank > 0:
+        result["suggestions"] = solver.rank_guesses(rank, workers=1)
+    return result
+
+
+def solve_line(line: str, table: FeedbackTable, rank: int = 0) -> str:
+    """Solves one JSONL game state. Malformed states produce an "error"
+    result rather than stopping the whole batch.
+    """
+    try:
+        record = json.loads(line)
+    except ValueError as error:
+        return json.dumps({"id": None, "error": str(error)})
+    if not isinstance(record, dict):
+        return json.dumps({"id": None, "error": "Expected a JSON object"})
+
+    try:
+        result = solve_record(record, table, rank)
+    except (KeyError, TypeError, ValueError) as error:
+        result = {"id": record.get("id"), "error": str(error)}
+    return json.dumps(result)
+
+
+# The table opened by each worker process. It is memory-mapped from the
+# shared cache file, so workers share its pages rather than copying it.
+_worker_table: Optional[FeedbackTable] = None
+
+
+def _init_worker() -> None:
+    global _worker_table
+    _worker_table = get_default_table()
+
+
+def _solve_chunk(lines: List[str], rank: int) -> List[str]:
+    return [solve_line(line, _worker_table, rank) for line in lines]
+
+
+def solve_stream(
+    lines: Iterable[str],
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    rank: int = 0
+) -> Iterator[str]:
+    """Solves a stream of JSONL game states on a pool of processes.
+
+    Args:
+        lines (Iterable[str]): JSONL game states, read lazily
+        workers (Optional[int]): Number of worker processes. Defaults to the
+        number of CPUs. With one worker, states are solved in this process.
+        ordered (bool): Whether results keep the order of the input
+        rank (int): The number of ranked guesses to include per state
+
+    Returns:
+        Iterator[str]: One JSON result per game state
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        table = get_default_table()
+        for line in lines:
+            if line.strip():
+                yield solve_line(line, table, rank)
+        return
+
+    # Build (or load) the table before forking so that workers only ever
+    # memory-map the finished file
+    get_default_table()
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as executor:
+        results = bounded_map(
+            _solve_chunk,
+            chunk_lines(lines, _CHUNK_SIZE),
+            executor,
+            workers * _CHUNKS_PER_WORKER,
+            ordered,
+            args=(rank,)
+        )
+        for chunk in results:
+            yield from chunk
+
+
+def _read_lines(paths: List[str]) -> Iterator[str]:
+    for path in paths:
+        if path == '-':
+            yield from sys.stdin
+        else:
+            with open(path) as input_file:
+                yield from input_file
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Solve JSONL Wordle game states in parallel"
+    )
+    parser.add_argument(
+        "inputs", nargs='*', default=['-'],
+        help="JSONL files of game states ('-' for stdin)"
+    )
+    parser.add_argument("-o", "--output", help="Output file (default stdout)")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument(
+        "--unordered", action="store_true",
+        help="Write results as soon as they are ready"
+    )
+    parser.add_argument(
+        "--rank", type=int, default=0,
+        help="Include this many ranked guesses per state"
+    )
+    parser.add_argument(
+        "--profile", nargs='?', const='', metavar="PATH",
+        help="Solve in this process under cProfile, printing a report to "
+        "stderr or dumping the raw profile to PATH"
+    )
+    parser.add_argument(
+        "--stats", action="store_true",
+        help="Solve in this process and print stage timings, counters and "
+        "cache statistics to stderr"
+    )
+    args = parser.parse_args(argv)
+
+    workers = args.workers
+    if args.profile is not None or args.stats:
+        # Worker processes keep their own statistics
+        workers = 1
+        wordle_stats.enable()
+
+    output_file = open(args.output, 'w') if args.output else sys.stdout
+
+    def run() -> None:
+        for result in solve_stream(
+            _read_lines(args.inputs), workers, not args.unordered, args.rank
+        ):
+            output_file.write(result + '\n')
+
+    try:
+        if args.profile is not None:
+            wordle_stats.profile(run, path=args.profile or None)
+        else:
+            run()
+            if args.stats:
+                sys.stderr.write(wordle_stats.to_json(indent=2) + '\n')
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from wordle_constraints import compile_constraints
+from wordle_feedback import (
+    Feedback, FeedbackTable, get_default_table, score_guess
+)
+from wordle_solver import ANSWERS_CACHE, RANKING_CACHE, Wordle, WordleSolver
+
+_BASELINE_VERSION = 1
+
+# Fewest timed runs a benchmark gets when compared with a baseline. Fewer
+# give medians too noisy to compare.
+_MIN_COMPARE_REPEATS = 10
+
+# A slowdown only counts once it is this many standard errors of the
+# difference between the two medians
+_NOISE_DEVIATIONS = 3
+
+# A benchmark is set up once, then its returned function is timed
+Benchmark = Callable[[FeedbackTable], Callable[[], Any]]
+
+# Games in progress towards ROBIN (one and three guesses) and ELDER
+_STATES = {
+    "one_guess": [("CRANE", "BYBBB")],
+    "three_guesses": [
+        ("CRANE", "BYBYB"), ("TOURS", "BGBYB"), ("VISOR", "BYBYY")
+    ],
+    # Repeated letters exercise the minimum and maximum letter counts
+    "duplicates": [
+        ("EERIE", "GYYBB"), ("SASSY", "BBBBB"), ("LLAMA", "BGBBB")
+    ],
+}
+
+
+def _guesses(state: List[Tuple[str, str]]) -> List[Wordle.Guess]:
+    return [Wordle.Guess(word, tiles) for word, tiles in state]
+
+
+def _clear_caches() -> None:
+    ANSWERS_CACHE.clear()
+    RANKING_CACHE.clear()
+
+
+def _solve_state(state: List[Tuple[str, str]]) -> Benchmark:
+    def setup(table: FeedbackTable) -> Callable[[], Any]:
+        guesses = _guesses(state)
+
+        def run() -> List[str]:
+            _clear_caches()
+            return WordleSolver(Wordle(list(guesses)), table) \
+                .get_valid_answers()
+        return run
+    return setup
+
+
+def _check_solution(table: FeedbackTable) -> Callable[[], Any]:
+    solver = WordleSolver(Wordle(_guesses(_STATES["three_guesses"])), table)
+
+    def run() -> int:
+        return sum(solver._check_solution(answer) for answer in table.answers)
+    return run
+
+
+def _corpus_filter(table: FeedbackTable) -> Callable[[], Any]:
+    # One random game state per answer, each filtered from scratch
+    rng = random.Random(0)
+    states = []
+    for answer in table.answers:
+        guess = rng.choice(table.guesses)
+        states.append([Wordle.Guess(
+            guess, Feedback(table.pattern(guess, answer), table.word_length)
+        )])
+
+    def run() -> int:
+        _clear_caches()
+        return sum(
+            len(WordleSolver(Wordle(list(state)), table).get_valid_answers())
+            for state in states
+        )
+    return run
+
+
+def _rank(state: List[Tuple[str, str]]) -> Benchmark:
+    def setup(table: FeedbackTable) -> Callable[[], Any]:
+        guesses = _guesses(state)
+
+        def run() -> List[Tuple[str, float]]:
+            _clear_caches()
+            return WordleSolver(Wordle(list(guesses)), table) \
+                .rank_guesses(10, workers=1)
+        return run
+    return setup
+
+
+_STARTUP_SCRIPT = (
+    "from wordle_solver import Wordle, WordleSolver; "
+    "WordleSolver(Wordle([])).get_valid_answers()"
+)
+
+
+def _startup(cold: bool) -> Benchmark:
+    """Times a fresh interpreter solving an empty game. A cold start has an
+    empty cache directory, so it includes building the feedback table.
+    """
+    def setup(table: FeedbackTable) -> Callable[[], Any]:
+        directory = os.path.dirname(os.path.abspath(__file__))
+
+        def run() -> None:
+            env = dict(os.environ)
+            with tempfile.TemporaryDirectory() as cache_dir:
+                if cold:
+                    env["WORDLE_SOLVER_CACHE"] = cache_dir
+                subprocess.run(
+                    [sys.executable, "-c", _STARTUP_SCRIPT],
+                    cwd=directory, env=env, check=True
+                )
+        return run
+    return setup
+
+
+BENCHMARKS: Dict[str, Tuple[Benchmark, int]] = {
+    # Name -> (benchmark, default repeats)
+    "empty_state": (_solve_state([]), 100),
+    "one_guess": (_solve_state(_STATES["one_guess"]), 100),
+    "three_guesses": (_solve_state(_STATES["three_guesses"]), 100),
+    "duplicates": (_solve_state(_STATES["duplicates"]), 100),
+    "check_solution": (_check_solution, 30),
+    "corpus_filter": (_corpus_filter, 10),
+    "rank_first_guess": (_rank([]), 10),
+    "rank_one_guess": (_rank(_STATES["one_guess"]), 30),
+    "startup_warm": (_startup(cold=False), 10),
+    "startup_cold": (_startup(cold=True), 10),
+}
+
+
+def measure(
+    run: Callable[[], Any], repeats: int, warmup: int = 3
+) -> Dict[str, float]:
+    """
+    Args:
+        run (Callable[[], Any]): The code to time
+        repeats (int): The number of timed runs
+        warmup (int): Untimed runs made first
+
+    Returns:
+        Dict[str, float]: The minimum, median, mean, standard deviation,
+        median absolute deviation and maximum run time in seconds
+    """
+    for _ in range(warmup):
+        run()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    median = statistics.median(times)
+    return {
+        "runs": repeats,
+        "min": min(times),
+        "median": median,
+        "mean": statistics.mean(times),
+        "stdev": statistics.stdev(times) if repeats > 1 else 0.0,
+        "mad": statistics.median(abs(time - median) for time in times),
+        "max": max(times)
+    }
+
+
+def differential_check(
+    table: FeedbackTable, samples: int = 20000, games: int = 200
+) -> List[str]:
+    """Checks the fast paths against the reference scorer, so that a speedup
+    cannot quietly change results.
+
+    Args:
+        table (FeedbackTable): The table to check
+        samples (int): Random (guess, answer) pairs to compare patterns for
+        games (int): Random games whose candidates are compared with a
+        brute-force filter
+
+    Returns:
+        List[str]: A description of each mismatch found
+    """
+    rng = random.Random(1)
+    mismatches = []
+
+    # Every guess with a repeated letter against a sample of answers, then
+    # random pairs
+    pairs = [
+        (guess, rng.choice(table.answers))
+        for guess in table.guesses if len(set(guess)) < len(guess)
+    ]
+    pairs += [
+        (rng.choice(table.guesses), rng.choice(table.answers))
+        for _ in range(samples)
+    ]
+    for guess, answer in pairs:
+        expected = score_guess(guess, answer)
+        if table.pattern(guess, answer) != expected:
+            mismatches.append(
+                f"pattern {guess}/{answer}: {table.pattern(guess, answer)} "
+                f"!= {expected}"
+            )
+
+    for _ in range(games):
+        answer = rng.choice(table.answers)
+        guesses = []
+        for _ in range(rng.randint(1, 4)):
+            guess = rng.choice(table.guesses)
+            pattern = score_guess(guess, answer)
+            if pattern == table.all_correct:
+                break
+            guesses.append(
+                Wordle.Guess(guess, Feedback(pattern, table.word_length))
+            )
+
+        expected = [
+            candidate for candidate in table.answers
+            if all(
+                score_guess(guess.word, candidate) == guess.feedback
+                for guess in guesses
+            )
+        ]
+        _clear_caches()
+        solver = WordleSolver(Wordle(guesses), table)
+        if solver.get_valid_answers() != expected:
+            mismatches.append(
+                f"candidates for {answer} after "
+                f"{[(g.word, str(g.feedback)) for g in guesses]}"
+            )
+        constraints = compile_constraints(guesses, table.word_length)
+        if not all(constraints.matches(word) for word in expected):
+            mismatches.append(f"constraints reject a candidate for {answer}")
+
+    return mismatches
+
+
+def _median_error(result: Dict[str, float]) -> float:
+    """
+    Returns:
+        float: The standard error of a result's median, from its median
+        absolute deviation. Baselines saved before that was recorded only
+        have the standard deviation.
+    """
+    sigma = result["mad"] * 1.4826 if "mad" in result else result["stdev"]
+    return 1.2533 * sigma / max(1, result["runs"]) ** 0.5
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Any],
+    threshold: float,
+    min_delta: float = 0.0,
+    digest: Optional[str] = None
+) -> List[str]:
+    """A benchmark regresses when its median is more than threshold slower
+    than the baseline's median, and the difference is beyond both min_delta
+    and the noise of the two medians.
+
+    Args:
+        results (Dict[str, Dict[str, float]]): Results from this run
+        baseline (Dict[str, Any]): A baseline file's contents
+        threshold (float): The fractional slowdown in median time allowed
+        min_delta (float): The smallest slowdown in seconds which counts
+        digest (Optional[str]): The digest of the word lists the results
+        were measured with
+
+    Returns:
+        List[str]: A description of each benchmark which regressed
+
+    Raises:
+        ValueError: If the baseline was measured with other word lists
+    """
+    if digest is not None and baseline.get("word_lists") != digest:
+        raise ValueError(
+            "The baseline was measured with different word lists"
+        )
+
+    regressions = []
+    for name, result in results.items():
+        previous = baseline["benchmarks"].get(name)
+        if previous is None:
+            continue
+        ratio = result["median"] / previous["median"]
+        noise = _NOISE_DEVIATIONS * (
+            _median_error(result) ** 2 + _median_error(previous) ** 2
+        ) ** 0.5
+        slower = ratio > 1 + threshold
+        beyond_noise = \
+            result["median"] - previous["median"] > max(min_delta, noise)
+        if slower and beyond_noise:
+            regressions.append(
+                f"{name}: median {result['median'] * 1000:.3f} ms is "
+                f"{(ratio - 1) * 100:.0f}% slower than the baseline "
+                f"{previous['median'] * 1000:.3f} ms"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the solver and check for regressions"
+    )
+    parser.add_argument(
+        "benchmarks", nargs='*',
+        help=f"Benchmarks to run (default all): {', '.join(BENCHMARKS)}"
+    )
+    parser.add_argument(
+        "-r", "--repeats", type=int, default=None,
+        help="Timed runs per benchmark (default depends on the benchmark)"
+    )
+    parser.add_argument(
+        "--save", metavar="PATH", help="Write the results as a baseline"
+    )
+    parser.add_argument(
+        "--baseline", metavar="PATH",
+        help="Compare with a baseline and fail on regressions"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.25,
+        help="Fractional slowdown in median time which counts as a "
+        "regression (default 0.25)"
+    )
+    parser.add_argument(
+        "--min-delta", type=float, default=0.5, metavar="MS",
+        help="Smallest slowdown in milliseconds which counts as a "
+        "regression, whatever the ratio (default 0.5)"
+    )
+    parser.add_argument(
+        "--no-check", action="store_true",
+        help="Skip the differential check against the reference scorer"
+    )
+    args = parser.parse_args(argv)
+
+    names = args.benchmarks or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            parser.error(f"Unknown benchmark {name!r}")
+
+    table = get_default_table()
+    status = 0
+
+    if not args.no_check:
+        mismatches = differential_check(table)
+        for mismatch in mismatches:
+            print(f"MISMATCH {mismatch}")
+        print(f"Differential check: {len(mismatches)} mismatches")
+        if mismatches:
+            status = 2
+
+    results = {}
+    for name in names:
+        benchmark, repeats = BENCHMARKS[name]
+        repeats = args.repeats or repeats
+        if args.baseline:
+            repeats = max(repeats, _MIN_COMPARE_REPEATS)
+        results[name] = measure(benchmark(table), repeats)
+        result = results[name]
+        print(
+            f"{name:<18} median {result['median'] * 1000:9.3f} ms  "
+            f"min {result['min'] * 1000:9.3f} ms  "
+            f"stdev {result['stdev'] * 1000:8.3f} ms  "
+            f"({result['runs']} runs)"
+        )
+
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            json.dump({
+                "version": _BASELINE_VERSION,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "word_lists": table.digest,
+                "benchmarks": results
+            }, baseline_file, indent=2)
+            baseline_file.write('\n')
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("version") != _BASELINE_VERSION:
+            parser.error(f"{args.baseline} has an unsupported version")
+        try:
+            regressions = compare(
+                results, baseline, args.threshold, args.min_delta / 1000,
+                table.digest
+            )
+        except ValueError as error:
+            parser.error(f"{args.baseline}: {error}")
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            status = status or 1
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
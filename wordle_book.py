@@ -0,0 +1,315 @@
+import argparse
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from wordle_feedback import (
+    FeedbackTable, default_cache_dir, get_default_table, word_list_hash
+)
+from wordle_parallel import bounded_map
+from wordle_ranking import rank_guesses
+
+_NO_GUESS = -1
+
+DEFAULT_OPENERS = ("RAISE", "SLATE", "CRANE", "TRACE", "CRATE")
+
+_BOOK_ENV = "WORDLE_OPENING_BOOK"
+
+
+def _best_guess_id(table: FeedbackTable, candidate_ids: np.ndarray) -> int:
+    if len(candidate_ids) == 0:
+        return _NO_GUESS
+    if len(candidate_ids) == 1:
+        # Guess the only answer left, if it is an allowed guess
+        answer = table.answers[candidate_ids[0]]
+        return table.guess_ids.get(answer, _NO_GUESS)
+    word = rank_guesses(table, candidate_ids, 1, workers=1)[0][0]
+    return table.guess_ids[word]
+
+
+def _split(
+    table: FeedbackTable, guess_id: int, candidate_ids: np.ndarray
+) -> List[Tuple[int, np.ndarray]]:
+    patterns = table.patterns[guess_id][candidate_ids]
+    return [
+        (int(pattern), candidate_ids[patterns == pattern])
+        for pattern in np.unique(patterns)
+        if pattern != table.all_correct
+    ]
+
+
+def _book_entry(
+    task: Tuple[int, int, int], table: FeedbackTable, depth: int
+) -> Tuple[int, int, int, Optional[np.ndarray]]:
+    """Works out the book's entries below one opener and pattern.
+
+    Args:
+        task (Tuple[int, int, int]): The opener's row in the book, its guess
+        id and the pattern it showed
+
+    Returns:
+        Tuple[int, int, int, Optional[np.ndarray]]: The opener's row, the
+        pattern, the best second guess, and (for depth 3) the best third
+        guess after each pattern the second guess can show
+    """
+    row, opener_id, pattern = task
+    candidate_ids = np.flatnonzero(table.patterns[opener_id] == pattern)
+    second_id = _best_guess_id(table, candidate_ids)
+
+    third = None
+    if depth >= 3 and second_id != _NO_GUESS:
+        third = np.full(table.num_patterns, _NO_GUESS, dtype=np.int32)
+        for second_pattern, bucket in _split(table, second_id, candidate_ids):
+            third[second_pattern] = _best_guess_id(table, bucket)
+    return row, pattern, second_id, third
+
+
+_worker_table: Optional[FeedbackTable] = None
+
+
+def _init_worker() -> None:
+    global _worker_table
+    _worker_table = get_default_table()
+
+
+def _book_entries(
+    tasks: List[Tuple[int, int, int]], depth: int
+) -> List[Tuple[int, int, int, Optional[np.ndarray]]]:
+    return [_book_entry(task, _worker_table, depth) for task in tasks]
+
+
+class OpeningBook:
+    """The best second guess, and optionally third guess, after each pattern
+    a fixed set of opening guesses can show. Entries are held in dense
+    arrays indexed by opener and pattern codes, so a lookup is a dictionary
+    access and one or two array reads.
+    """
+
+    def __init__(
+        self,
+        table: FeedbackTable,
+        openers: Sequence[str],
+        second: np.ndarray,
+        third: Optional[np.ndarray] = None
+    ) -> None:
+        self.table = table
+        self.openers = list(openers)
+        self.second = second
+        self.third = third
+
+        self._opener_rows: Dict[str, int] = {
+            opener: row for row, opener in enumerate(self.openers)
+        }
+
+    @classmethod
+    def build(
+        cls,
+        openers: Sequence[str] = DEFAULT_OPENERS,
+        depth: int = 2,
+        workers: Optional[int] = None
+    ) -> "OpeningBook":
+        """Generates a book over the default word lists, spreading the
+        work over a pool of processes.
+
+        Args:
+            openers (Sequence[str]): The first guesses to cover. The first
+            of these is suggested for the opening guess itself.
+            depth (int): 2 to store second guesses, 3 to store third guesses
+            as well
+            workers (Optional[int]): Number of worker processes. Defaults to
+            the number of CPUs.
+
+        Returns:
+            OpeningBook: The generated book
+        """
+        if depth not in (2, 3):
+            raise ValueError("An opening book covers 2 or 3 guesses")
+        table = get_default_table()
+        openers = [opener.upper() for opener in openers]
+        for opener in openers:
+            if opener not in table.guess_ids:
+                raise ValueError(f"{opener!r} is not an allowed guess")
+
+        tasks = [
+            (row, table.guess_ids[opener], int(pattern))
+            for row, opener in enumerate(openers)
+            for pattern in np.unique(table.guess_row(opener))
+            if pattern != table.all_correct
+        ]
+        index_dtype = np.int16 if len(table.guesses) < 2 ** 15 else np.int32
+        second = np.full(
+            (len(openers), table.num_patterns), _NO_GUESS, dtype=index_dtype
+        )
+        third = np.full(
+            (len(openers), table.num_patterns, table.num_patterns),
+            _NO_GUESS,
+            dtype=index_dtype
+        ) if depth >= 3 else None
+
+        workers = workers or os.cpu_count() or 1
+        chunk_size = max(1, len(tasks) // (workers * 8))
+        chunks = (
+            tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)
+        )
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker
+        ) as executor:
+            for entries in bounded_map(
+                _book_entries, chunks, executor, 2 * workers,
+                ordered=False, args=(depth,)
+            ):
+                for row, pattern, second_id, third_ids in entries:
+                    second[row, pattern] = second_id
+                    if third is not None and third_ids is not None:
+                        third[row, pattern] = third_ids
+
+        return cls(table, openers, second, third)
+
+    def save(self, path: str) -> None:
+        arrays = {
+            "word_list_hash": np.array(
+                word_list_hash(self.table.guesses, self.table.answers)
+            ),
+            "openers": np.array(self.openers),
+            "second": self.second
+        }
+        if self.third is not None:
+            arrays["third"] = self.third
+
+        # Write to a temporary file first so that readers never see a
+        # partially written book. Its name is unique, so books saved at the
+        # same time by other threads or processes cannot mix.
+        fd, temp_path = tempfile.mkstemp(
+            prefix=f"{os.path.basename(path)}.", suffix=".tmp",
+            dir=os.path.dirname(path) or None
+        )
+        try:
+            with os.fdopen(fd, "wb") as book_file:
+                np.savez_compressed(book_file, **arrays)
+            os.replace(temp_path, path)
+        except OSError:
+            os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str, table: FeedbackTable) -> "OpeningBook":
+        """
+        Args:
+            path (str): A file written by OpeningBook.save
+            table (FeedbackTable): The table over the word lists the book
+            was generated from
+
+        Returns:
+            OpeningBook: The loaded book
+        """
+        with np.load(path) as data:
+            expected_hash = word_list_hash(table.guesses, table.answers)
+            if str(data["word_list_hash"]) != expected_hash:
+                raise ValueError(
+                    f"{path} was built from a different word list"
+                )
+            return cls(
+                table,
+                [str(opener) for opener in data["openers"]],
+                data["second"],
+                data["third"] if "third" in data else None
+            )
+
+    def lookup(self, history: Sequence[Tuple[str, int]]) -> Optional[str]:
+        """
+        Args:
+            history (Sequence[Tuple[str, int]]): Each guess made so far with
+            the pattern code it showed
+
+        Returns:
+            Optional[str]: The book's next guess, or None if the book does
+            not cover this game
+        """
+        if not history:
+            return self.openers[0] if self.openers else None
+
+        row = self._opener_rows.get(history[0][0])
+        if row is None or len(history) > 2:
+            return None
+        second_id = self.second[row, history[0][1]]
+        if second_id == _NO_GUESS:
+            return None
+        if len(history) == 1:
+            return self.table.guesses[second_id]
+
+        if self.third is None \
+                or history[1][0] != self.table.guesses[second_id]:
+            return None
+        third_id = self.third[row, history[0][1], history[1][1]]
+        if third_id == _NO_GUESS:
+            return None
+        return self.table.guesses[third_id]
+
+
+def default_book_path(table: FeedbackTable) -> str:
+    """
+    Returns:
+        str: $WORDLE_OPENING_BOOK, or where the generator writes the book
+        for this table's word lists by default
+    """
+    return os.environ.get(_BOOK_ENV) or os.path.join(
+        default_cache_dir(), f"book-{table.digest[:16]}.npz"
+    )
+
+
+# Books loaded so far, keyed by the digest of their word lists. None
+# records that there is no usable book, so that the file is only checked
+# once.
+_books: Dict[str, Optional[OpeningBook]] = {}
+
+
+def get_default_book(table: FeedbackTable) -> Optional[OpeningBook]:
+    """
+    Args:
+        table (FeedbackTable): The table the book must match
+
+    Returns:
+        Optional[OpeningBook]: The book at default_book_path, or None if
+        there is none for these word lists
+    """
+    if table.digest not in _books:
+        try:
+            _books[table.digest] = OpeningBook.load(
+                default_book_path(table), table
+            )
+        except (OSError, ValueError, KeyError):
+            _books[table.digest] = None
+    return _books[table.digest]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate an opening book for the default word lists"
+    )
+    parser.add_argument(
+        "openers", nargs='*', default=list(DEFAULT_OPENERS),
+        help="First guesses to cover (the first is the suggested opener)"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="Where to write the book. Defaults to the cache directory, "
+        "where solvers pick it up automatically."
+    )
+    parser.add_argument(
+        "--depth", type=int, choices=[2, 3], default=2,
+        help="Store second guesses only, or third guesses as well"
+    )
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    book = OpeningBook.build(args.openers, args.depth, args.workers)
+    path = args.output or default_book_path(book.table)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    book.save(path)
+    entries = int((book.second != _NO_GUESS).sum())
+    if book.third is not None:
+        entries += int((book.third != _NO_GUESS).sum())
+    print(f"Wrote {entries} entries for {len(book.openers)} openers to {path}")
@@ -0,0 +1,126 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+def approximate_size(value: Any) -> int:
+    """
+    Args:
+        value (Any): A cached value, typically nested lists and tuples of
+        strings and numbers
+
+    Returns:
+        int: An estimate of the memory the value uses, in bytes
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(approximate_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(
+            approximate_size(key) + approximate_size(item)
+            for key, item in value.items()
+        )
+    return size
+
+
+class LRUCache:
+    """A thread-safe least-recently-used cache which evicts entries once it
+    holds more than max_entries of them, or once their estimated size passes
+    max_bytes. Either limit may be None to disable it.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 1024,
+        max_bytes: Optional[int] = None
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = approximate_size(key) + approximate_size(value) \
+            if self.max_bytes is not None else 0
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizes[key]
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._entries and (
+            (self.max_entries is not None
+             and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(key)
+            self.evictions += 1
+
+    def resize(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> None:
+        """Changes the limits, evicting entries straight away if needed."""
+        with self._lock:
+            # Sizes are only tracked while there is a byte limit
+            if max_bytes is not None and self.max_bytes is None:
+                self._sizes = {
+                    key: approximate_size(key) + approximate_size(value)
+                    for key, value in self._entries.items()
+                }
+                self._bytes = sum(self._sizes.values())
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: Hits, misses, evictions, the hit rate and the
+            current number and estimated size of entries
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "entries": len(self._entries),
+                "bytes": self._bytes if self.max_bytes is not None else None
+            }
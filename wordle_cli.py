@@ -0,0 +1,294 @@
+import argparse
+import json
+import sys
+from typing import IO, Any, Dict, List, Optional, Sequence, Tuple
+
+# Only the standard-library modules are imported up front. NumPy, the
+# feedback table and the solver are imported the first time ranked
+# suggestions are asked for, so that filtering alone starts quickly.
+from wordle_constraints import Constraints
+from wordle_patterns import WORD_LENGTH, Feedback
+from wordle_wordlist import default_answers
+
+_PROMPT = "> "
+_HELP = (
+    "Enter a guess and its tiles, e.g. CRANE BYG.. (G green, Y yellow, "
+    "B/. grey). Commands: undo, reset, help, quit."
+)
+
+
+def parse_entry(
+    text: str, length: int = WORD_LENGTH
+) -> Tuple[str, Feedback]:
+    """
+    Args:
+        text (str): A guess and its tiles, separated by whitespace, ':' or
+        '=', e.g. "CRANE BYG.." or "crane:bygbb"
+        length (int): The number of letters in a word
+
+    Returns:
+        Tuple[str, Feedback]: The upper-cased guess and its feedback
+    """
+    parts = text.replace(':', ' ').replace('=', ' ').split()
+    if len(parts) != 2:
+        raise ValueError(
+            f"Expected a guess and its tiles, got {text.strip()!r}"
+        )
+
+    word, tiles = parts
+    word = word.upper()
+    if len(word) != length or not word.isascii() or not word.isalpha():
+        raise ValueError(f"{word!r} is not a {length}-letter word")
+    return word, Feedback.parse(tiles, length)
+
+
+class Session:
+    """The state of one game in the CLI. Candidates are narrowed with the
+    standard-library constraints alone; the NumPy solver is only started
+    once suggestions are needed, and is then kept in step with each guess.
+    """
+
+    def __init__(
+        self, hard_mode: bool = False, time_budget: Optional[float] = None
+    ) -> None:
+        self.hard_mode = hard_mode
+        self.time_budget = time_budget
+        self.entries: List[Tuple[str, Feedback]] = []
+
+        # Candidates and constraints after each guess, so that undo is free
+        answers = default_answers()
+        self.word_length = answers.word_length
+        self._candidates: List[Sequence[str]] = [answers]
+        self._constraints: List[Constraints] = [
+            Constraints(self.word_length)
+        ]
+
+        self._solver = None
+
+    @property
+    def candidates(self) -> Sequence[str]:
+        return self._candidates[-1]
+
+    def add(self, word: str, feedback: Feedback) -> None:
+        constraints = self._constraints[-1].copy()
+        constraints.add_guess(word, feedback)
+        self._constraints.append(constraints)
+        self._candidates.append([
+            answer for answer in self.candidates if constraints.matches(answer)
+        ])
+        self.entries.append((word, feedback))
+        if self._solver is not None:
+            from wordle_solver import Wordle
+            self._solver.add_guess(Wordle.Guess(word, feedback))
+
+    def undo(self) -> None:
+        if not self.entries:
+            raise IndexError("There are no guesses to undo")
+        self.entries.pop()
+        self._candidates.pop()
+        self._constraints.pop()
+        if self._solver is not None:
+            self._solver.undo()
+
+    def reset(self) -> None:
+        del self.entries[:]
+        del self._candidates[1:]
+        del self._constraints[1:]
+        if self._solver is not None:
+            self._solver.rollback(0)
+
+    def suggestions(self, top_k: int) -> Dict[str, Any]:
+        """
+        Args:
+            top_k (int): The number of ranked guesses to return
+
+        Returns:
+            Dict[str, Any]: The best guesses with their expected information
+            in bits, best first, under "suggestions". With a time budget,
+            also how many of the guesses were scored exactly under
+            "refined" and "total"; guesses which were not have no score.
+        """
+        if self._solver is None:
+            from wordle_solver import Wordle, WordleSolver
+            self._solver = WordleSolver(Wordle([
+                Wordle.Guess(word, feedback) for word, feedback in self.entries
+            ]))
+
+        if self.time_budget is None:
+            return {"suggestions": self._solver.rank_guesses(
+                top_k, hard_mode=self.hard_mode
+            )}
+        result = self._solver.rank_guesses_within(
+            self.time_budget, top_k, self.hard_mode
+        )
+        return {
+            "suggestions": result.ranking,
+            "refined": result.refined,
+            "total": result.total
+        }
+
+    def result(self, rank: int) -> Dict[str, Any]:
+        result = {
+            "guesses": [
+                [word, str(feedback)] for word, feedback in self.entries
+            ],
+            "count": len(self.candidates),
+            "candidates": list(self.candidates)
+        }
+        if rank > 0:
+            result.update(self.suggestions(rank))
+        return result
+
+
+def format_result(result: Dict[str, Any], limit: int) -> str:
+    """
+    Args:
+        result (Dict[str, Any]): As returned by Session.result
+        limit (int): The most candidates to list
+
+    Returns:
+        str: The result as human-readable text
+    """
+    count = result["count"]
+    lines = [f"{count} candidate{'' if count == 1 else 's'}"]
+    if count:
+        shown = result["candidates"][:limit]
+        lines.append(' '.join(shown))
+        if count > len(shown):
+            lines[-1] += f" ... and {count - len(shown)} more"
+    if result.get("suggestions"):
+        lines.append("Suggestions: " + ', '.join(
+            word if bits is None else f"{word} ({bits:.2f} bits)"
+            for word, bits in result["suggestions"]
+        ))
+        if result.get("refined", 0) < result.get("total", 0):
+            lines[-1] += (
+                f" [{result['refined']} of {result['total']} guesses scored "
+                "in time]"
+            )
+    return '\n'.join(lines)
+
+
+def _write(
+    output: IO[str], result: Dict[str, Any], as_json: bool, limit: int
+) -> None:
+    output.write(
+        (json.dumps(result) if as_json else format_result(result, limit))
+        + '\n'
+    )
+    output.flush()
+
+
+def run_stream(
+    session: Session,
+    lines: IO[str],
+    output: IO[str],
+    rank: int = 0,
+    as_json: bool = False,
+    limit: int = 20
+) -> None:
+    """Reads one guess or command per line and writes the narrowed state
+    after each. Errors are reported and the stream carries on.
+    """
+    interactive = lines.isatty() and not as_json
+    if interactive:
+        output.write(_HELP + '\n' + _PROMPT)
+        output.flush()
+
+    for line in lines:
+        command = line.strip().lower()
+        try:
+            if not command or command.startswith('#'):
+                pass
+            elif command in ("quit", "exit"):
+                break
+            elif command == "help":
+                output.write(_HELP + '\n')
+            else:
+                if command == "undo":
+                    session.undo()
+                elif command == "reset":
+                    session.reset()
+                else:
+                    session.add(*parse_entry(line, session.word_length))
+                _write(output, session.result(rank), as_json, limit)
+        except (IndexError, ValueError) as error:
+            if as_json:
+                output.write(json.dumps({"error": str(error)}) + '\n')
+            else:
+                output.write(f"Error: {error}\n")
+
+        if interactive:
+            output.write(_PROMPT)
+            output.flush()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Solve Wordle from the command line"
+    )
+    parser.add_argument(
+        "guesses", nargs='*', metavar="GUESS:TILES",
+        help="Guesses made so far, e.g. CRANE:BYG.. (G green, Y yellow, "
+        "B or . grey)"
+    )
+    parser.add_argument(
+        "-i", "--interactive", action="store_true",
+        help="After any GUESS arguments, read one guess per line from stdin "
+        "(or undo, reset, quit) and print the state after each"
+    )
+    parser.add_argument(
+        "-r", "--rank", type=int, default=0,
+        help="Also suggest this many guesses ranked by expected information"
+    )
+    parser.add_argument(
+        "--hard-mode", action="store_true",
+        help="Only suggest guesses which reuse every revealed hint"
+    )
+    parser.add_argument(
+        "--budget", type=float, default=None, metavar="SECONDS",
+        help="Spend at most this long scoring suggestions exactly, falling "
+        "back to letter frequencies for the rest"
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Write JSON instead of text"
+    )
+    parser.add_argument(
+        "--limit", type=int, default=20,
+        help="The most candidates to list in text output"
+    )
+    parser.add_argument(
+        "--profile", nargs='?', const='', metavar="PATH",
+        help="Solve under cProfile, printing a report to stderr or dumping "
+        "the raw profile to PATH"
+    )
+    args = parser.parse_args(argv)
+
+    session = Session(args.hard_mode, args.budget)
+    try:
+        for entry in args.guesses:
+            session.add(*parse_entry(entry, session.word_length))
+    except ValueError as error:
+        parser.error(str(error))
+
+    def run() -> None:
+        if args.interactive:
+            run_stream(
+                session, sys.stdin, sys.stdout, args.rank, args.json,
+                args.limit
+            )
+        else:
+            _write(
+                sys.stdout, session.result(args.rank), args.json, args.limit
+            )
+
+    if args.profile is not None:
+        # Imported here so that the profiler only loads when asked for
+        import wordle_stats
+        wordle_stats.profile(run, path=args.profile or None)
+    else:
+        run()
+
+
+if __name__ == "__main__":
+    main()
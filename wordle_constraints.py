@@ -0,0 +1,333 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from wordle_cache import LRUCache
+from wordle_patterns import Feedback
+
+_NUM_LETTERS = 26
+_ALL_LETTERS = (1 << _NUM_LETTERS) - 1
+
+
+def _letter(char: str) -> int:
+    return ord(char) - ord('A')
+
+
+def check_word(word: str, word_length: int) -> str:
+    """
+    Args:
+        word (str): A guessed word
+        word_length (int): The length of the words being guessed
+
+    Returns:
+        str: The word in upper case
+
+    Raises:
+        TypeError: If the word is not a string
+        ValueError: If the word is not word_length letters from A to Z
+    """
+    if not isinstance(word, str):
+        raise TypeError(f"Expected a word, got {word!r}")
+    if not (word.isascii() and word.isalpha()):
+        raise ValueError(f"{word!r} must only use the letters A to Z")
+    if len(word) != word_length:
+        raise ValueError(
+            f"{word!r} does not fit a game of {word_length}-letter words"
+        )
+    return word.upper()
+
+
+class Constraints:
+    """Everything a set of guesses reveals about the answer, in normal form:
+    the letters still allowed at each position, the minimum number of times
+    each letter must appear, and the exact number of times for letters which
+    were shown as not in the word on at least one tile.
+
+    Two sets of guesses which reveal the same things compile to equal
+    constraints, whatever order the guesses came in.
+    """
+
+    def __init__(self, word_length: int) -> None:
+        self.word_length = word_length
+        self.allowed: List[int] = [_ALL_LETTERS] * word_length
+        self.min_counts: Dict[int, int] = {}
+        self.max_counts: Dict[int, int] = {}
+
+        # Letters shown green at each position. Implied by allowed, but kept
+        # so that hard mode does not mistake a position narrowed down by
+        # exclusions alone for a revealed one.
+        self.greens: List[Optional[int]] = [None] * word_length
+
+    def copy(self) -> "Constraints":
+        constraints = Constraints(self.word_length)
+        constraints.allowed = list(self.allowed)
+        constraints.min_counts = dict(self.min_counts)
+        constraints.max_counts = dict(self.max_counts)
+        constraints.greens = list(self.greens)
+        return constraints
+
+    def hard_mode(self) -> "Constraints":
+        """
+        Returns:
+            Constraints: The constraints every hard-mode guess must satisfy:
+            green letters stay in place and every revealed letter is used at
+            least as many times as it was revealed
+        """
+        constraints = Constraints(self.word_length)
+        for i, letter in enumerate(self.greens):
+            if letter is not None:
+                constraints.allowed[i] = 1 << letter
+                constraints.greens[i] = letter
+        constraints.min_counts = dict(self.min_counts)
+        return constraints
+
+    def add_guess(
+        self, word: str, hints: Union[Feedback, Sequence[Optional[bool]]]
+    ) -> None:
+        """Adds what one guess reveals.
+
+        Args:
+            word (str): The guessed word
+            hints (Union[Feedback, Sequence[Optional[bool]]]): The feedback
+            for the guess, or per-tile hints as used by Wordle.Guess (True,
+            False or None)
+        """
+        word = check_word(word, self.word_length)
+        tiles = Feedback.from_hints(hints).tiles
+        if len(tiles) != self.word_length:
+            raise ValueError(
+                f"Expected {self.word_length} tiles for {word}, "
+                f"got {len(tiles)}"
+            )
+
+        shown: Dict[int, int] = {}
+        greyed = set()
+        for i, (char, tile) in enumerate(zip(word, tiles)):
+            letter = _letter(char)
+            if tile == Feedback.CORRECT:
+                self.allowed[i] &= 1 << letter
+                self.greens[i] = letter
+                shown[letter] = shown.get(letter, 0) + 1
+            else:
+                # Had the answer used this letter here, the tile would have
+                # been green
+                self.allowed[i] &= ~(1 << letter)
+                if tile == Feedback.WRONG_PLACE:
+                    shown[letter] = shown.get(letter, 0) + 1
+                else:
+                    greyed.add(letter)
+
+        for letter, count in shown.items():
+            self.min_counts[letter] = max(
+                self.min_counts.get(letter, 0), count
+            )
+
+        # A grey tile means every copy of the letter in the answer was already
+        # accounted for by the green and yellow tiles
+        for letter in greyed:
+            count = shown.get(letter, 0)
+            self.max_counts[letter] = min(
+                self.max_counts.get(letter, self.word_length), count
+            )
+            if count == 0:
+                for i in range(self.word_length):
+                    self.allowed[i] &= ~(1 << letter)
+
+    def is_satisfiable(self) -> bool:
+        if not all(self.allowed):
+            return False
+        if sum(self.min_counts.values()) > self.word_length:
+            return False
+        return all(
+            count <= self.max_counts.get(letter, self.word_length)
+            for letter, count in self.min_counts.items()
+        )
+
+    def key(self) -> Tuple:
+        """
+        Returns:
+            Tuple: A hashable canonical form of these constraints
+        """
+        return (
+            tuple(self.allowed),
+            tuple(sorted(self.min_counts.items())),
+            tuple(sorted(self.max_counts.items()))
+        )
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Constraints) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def matches(self, word: str) -> bool:
+        """
+        Args:
+            word (str): A candidate answer
+
+        Returns:
+            bool: Indicates if the word satisfies every constraint
+        """
+        if len(word) != self.word_length \
+                or not (word.isascii() and word.isalpha()):
+            return False
+        letters = [_letter(char) for char in word.upper()]
+        for allowed, letter in zip(self.allowed, letters):
+            if not allowed >> letter & 1:
+                return False
+        for letter, count in self.min_counts.items():
+            if letters.count(letter) < count:
+                return False
+        for letter, count in self.max_counts.items():
+            if letters.count(letter) > count:
+                return False
+        return True
+
+
+def compile_constraints(
+    guesses: Iterable, word_length: int = 5
+) -> Constraints:
+    """
+    Args:
+        guesses (Iterable): Wordle.Guess objects, or anything else with word
+        and feedback (or hints) attributes
+        word_length (int): The length of the words being guessed
+
+    Returns:
+        Constraints: The normalized constraints revealed by the guesses
+    """
+    constraints = Constraints(word_length)
+    for guess in guesses:
+        feedback = getattr(guess, "feedback", None)
+        constraints.add_guess(
+            guess.word, guess.hints if feedback is None else feedback
+        )
+    return constraints
+
+
+def _bitset(ids: Iterable[int], size: int) -> int:
+    bitmap = bytearray((size + 7) // 8)
+    for i in ids:
+        bitmap[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bitmap, "little")
+
+
+def bitset_ids(bits: int) -> List[int]:
+    """
+    Args:
+        bits (int): A bitset of word ids
+
+    Returns:
+        List[int]: The ids in the bitset, in increasing order
+    """
+    ids = []
+    bitmap = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for byte_index, byte in enumerate(bitmap):
+        base = byte_index << 3
+        while byte:
+            low = byte & -byte
+            ids.append(base + low.bit_length() - 1)
+            byte ^= low
+    return ids
+
+
+class WordIndex:
+    """An inverted index over a word list. For each (letter, position) pair
+    and each (letter, count >= k) condition it holds a bitset of the ids of
+    the words which satisfy it, stored as a Python int. Filtering the words
+    by a set of constraints is then a handful of bitwise ANDs.
+    """
+
+    def __init__(self, words: Sequence[str]) -> None:
+        self.words = words
+        self.size = len(words)
+        self.word_length = len(words[0]) if self.size else 0
+        self.all_bits = (1 << self.size) - 1
+
+        at_position = [
+            [[] for _ in range(_NUM_LETTERS)] for _ in range(self.word_length)
+        ]
+        at_least = [
+            [[] for _ in range(self.word_length + 1)]
+            for _ in range(_NUM_LETTERS)
+        ]
+        for word_id, word in enumerate(words):
+            counts: Dict[int, int] = {}
+            check_word(word, self.word_length)
+            for i, char in enumerate(word):
+                letter = _letter(char)
+                at_position[i][letter].append(word_id)
+                counts[letter] = counts.get(letter, 0) + 1
+            for letter, count in counts.items():
+                for k in range(1, count + 1):
+                    at_least[letter][k].append(word_id)
+
+        self.position_bits = [
+            [_bitset(ids, self.size) for ids in letters]
+            for letters in at_position
+        ]
+        self.count_bits = [
+            [_bitset(ids, self.size) for ids in counts] for counts in at_least
+        ]
+        for counts in self.count_bits:
+            counts[0] = self.all_bits
+
+    def filter(self, constraints: Constraints) -> int:
+        """
+        Args:
+            constraints (Constraints): The constraints to filter by
+
+        Returns:
+            int: A bitset of the ids of the words which satisfy them
+        """
+        bits = self.all_bits
+
+        for position, allowed in enumerate(constraints.allowed):
+            if allowed == _ALL_LETTERS:
+                continue
+            letter_bits = self.position_bits[position]
+            # Whichever of the allowed and excluded letters are fewer
+            if bin(allowed).count('1') <= _NUM_LETTERS // 2:
+                matching = 0
+                for letter in range(_NUM_LETTERS):
+                    if allowed >> letter & 1:
+                        matching |= letter_bits[letter]
+                bits &= matching
+            else:
+                for letter in range(_NUM_LETTERS):
+                    if not allowed >> letter & 1:
+                        bits &= ~letter_bits[letter]
+
+        for letter, count in constraints.min_counts.items():
+            if count > self.word_length:
+                return 0
+            bits &= self.count_bits[letter][count]
+
+        for letter, count in constraints.max_counts.items():
+            if count < self.word_length:
+                bits &= ~self.count_bits[letter][count + 1]
+
+        return bits
+
+    def words_in(self, bits: int) -> List[str]:
+        return [self.words[i] for i in bitset_ids(bits)]
+
+
+# Indexes over the word lists used most recently, keyed by the id of their
+# word list. The word list is kept alongside so that its id cannot be reused
+# while the entry exists. Bounded, so that a long-running process which
+# loads many lists does not keep an index for every one of them.
+_INDEXES = LRUCache(max_entries=16)
+
+
+def get_index(words: Sequence[str]) -> WordIndex:
+    """
+    Args:
+        words (Sequence[str]): A word list
+
+    Returns:
+        WordIndex: The shared index over this word list
+    """
+    entry = _INDEXES.get(id(words))
+    if entry is None or entry[0] is not words:
+        entry = (words, WordIndex(words))
+        _INDEXES.put(id(words), entry)
+    return entry[1]
@@ -0,0 +1,416 @@
+import hashlib
+import os
+import tempfile
+import threading
+from functools import cached_property, lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# The pure-Python pattern helpers live in wordle_patterns so that they can be
+# used without NumPy. They are re-exported here for existing callers.
+from wordle_patterns import (
+    ALL_CORRECT, NUM_PATTERNS, WORD_LENGTH, Feedback, all_correct,
+    decode_pattern, encode_hints, format_pattern, num_patterns,
+    parse_pattern, score_guess
+)
+from wordle_cache import LRUCache
+from wordle_wordlist import (
+    WordList, default_answers, default_cache_dir, default_guesses
+)
+
+# Guess x answer x letter x letter comparisons made at once when scoring.
+# Bounds the intermediate arrays to a few tens of megabytes whatever the
+# word length.
+_COMPARISONS_PER_CHUNK = 1 << 22
+
+# Tables larger than this are not stored. Their patterns are computed when
+# they are needed instead, a row or a block at a time.
+_MAX_TABLE_BYTES = 1 << 32
+
+# Memory for the rows of an on-demand table kept for reuse
+_ROW_CACHE_BYTES = 1 << 26
+
+
+def pattern_dtype(length: int) -> np.dtype:
+    """
+    Args:
+        length (int): The number of letters in a word
+
+    Returns:
+        np.dtype: The smallest unsigned integer type which holds every
+        pattern code for words of this length
+    """
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if num_patterns(length) <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    raise ValueError(f"Words of {length} letters are not supported")
+
+
+@lru_cache(maxsize=None)
+def _layout(length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The place value of each tile, and
+        which positions come earlier than each position
+    """
+    place_dtype = np.uint16 if num_patterns(length) <= 1 << 16 \
+        else np.uint32
+    return (
+        3 ** np.arange(length, dtype=place_dtype),
+        np.tril(np.ones((length, length), dtype=bool), -1)
+    )
+
+
+def _word_bytes(words: Sequence[str]) -> bytes:
+    if isinstance(words, WordList):
+        return words.records
+    return ''.join(words).upper().encode("ascii")
+
+
+def word_length_of(words: Sequence[str]) -> int:
+    """
+    Args:
+        words (Sequence[str]): Equal-length words
+
+    Returns:
+        int: The length of the words, or WORD_LENGTH for an empty list
+    """
+    if isinstance(words, WordList):
+        return words.word_length
+    return len(words[0]) if len(words) else WORD_LENGTH
+
+
+def words_to_array(
+    words: Sequence[str], length: Optional[int] = None
+) -> np.ndarray:
+    """
+    Args:
+        words (Sequence[str]): Equal-length words made up of the letters A-Z
+        length (Optional[int]): The length of the words. Defaults to the
+        length of the first word.
+
+    Returns:
+        np.ndarray: An (N, length) uint8 array of letter numbers (A=0)
+    """
+    length = length or word_length_of(words)
+    letters = np.frombuffer(_word_bytes(words), dtype=np.uint8) - ord('A')
+    return letters.reshape(len(words), length)
+
+
+def bitset_array(bits: int, size: int) -> np.ndarray:
+    """
+    Args:
+        bits (int): A bitset of word ids, as used by wordle_constraints
+        size (int): The number of words in the list the ids refer to
+
+    Returns:
+        np.ndarray: The ids in the bitset, in increasing order
+    """
+    bitmap = np.frombuffer(bits.to_bytes((size + 7) // 8, "little"), np.uint8)
+    return np.flatnonzero(np.unpackbits(bitmap, bitorder="little"))
+
+
+def compute_patterns(
+    guesses: np.ndarray, answers: np.ndarray, out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Scores every guess against every answer in a vectorized fashion.
+
+    Args:
+        guesses (np.ndarray): (G, N) letter array of guesses
+        answers (np.ndarray): (A, N) letter array of answers
+        out (Optional[np.ndarray]): A (G, A) array to write the patterns to,
+        such as a memory-mapped file. Defaults to a new array.
+
+    Returns:
+        np.ndarray: A (G, A) array of base-3 pattern codes, of the
+        pattern_dtype for words of N letters
+    """
+    length = guesses.shape[1]
+    place_values, earlier_positions = _layout(length)
+    patterns = out if out is not None else np.empty(
+        (len(guesses), len(answers)), dtype=pattern_dtype(length)
+    )
+    chunk_size = max(
+        1, _COMPARISONS_PER_CHUNK // max(1, len(answers) * length * length)
+    )
+
+    for start in range(0, len(guesses), chunk_size):
+        chunk = guesses[start:start + chunk_size]
+
+        green = chunk[:, None, :] == answers[None, :, :]
+
+        # Copies of each guess letter in positions of the answer which were
+        # not already matched by a green tile
+        same_letter = chunk[:, None, :, None] == answers[None, :, None, :]
+        available = (same_letter & ~green[:, :, None, :]).sum(axis=3)
+
+        # Copies of each guess letter earlier in the guess which were not
+        # green. These claim the available copies first.
+        earlier_same = (
+            (chunk[:, :, None] == chunk[:, None, :]) & earlier_positions
+        )
+        claimed = (earlier_same[:, None, :, :] & ~green[:, :, None, :]).sum(
+            axis=3
+        )
+
+        yellow = ~green & (claimed < available)
+
+        tiles = green.astype(place_values.dtype) * Feedback.CORRECT + yellow
+        patterns[start:start + chunk_size] = tiles @ place_values
+
+    return patterns
+
+
+class OnDemandPatterns:
+    """Stands in for a guess x answer pattern matrix too large to keep,
+    computing rows as they are read. Indexing supports what the solvers use:
+    a row, a list of rows, or a single (row, column) cell. Recently read rows
+    are kept in a bounded cache.
+    """
+
+    def __init__(
+        self, guess_letters: np.ndarray, answer_letters: np.ndarray
+    ) -> None:
+        self.guess_letters = guess_letters
+        self.answer_letters = answer_letters
+        self.shape = (len(guess_letters), len(answer_letters))
+        self.dtype = pattern_dtype(guess_letters.shape[1])
+        self.ndim = 2
+
+        row_bytes = max(1, len(answer_letters) * self.dtype.itemsize)
+        self._rows = LRUCache(
+            max_entries=max(1, _ROW_CACHE_BYTES // row_bytes)
+        )
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def _row(self, i: int) -> np.ndarray:
+        row = self._rows.get(i)
+        if row is None:
+            row = compute_patterns(
+                self.guess_letters[i:i + 1], self.answer_letters
+            )[0]
+            row.flags.writeable = False
+            self._rows.put(i, row)
+        return row
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            row, column = key
+            return self[row][column]
+        if np.ndim(key) == 0:
+            return self._row(int(key))
+        return compute_patterns(self.guess_letters[key], self.answer_letters)
+
+
+def word_list_hash(guesses: Sequence[str], answers: Sequence[str]) -> str:
+    """
+    Args:
+        guesses (Sequence[str]): The allowed guesses
+        answers (Sequence[str]): The possible answers
+
+    Returns:
+        str: A hex digest identifying this pair of word lists
+    """
+    digest = hashlib.sha1()
+    digest.update(_word_bytes(guesses))
+    digest.update(b'|')
+    digest.update(_word_bytes(answers))
+    return digest.hexdigest()
+
+
+class FeedbackTable:
+    """A guess x answer matrix holding the feedback pattern the game shows for
+    each guess against each answer. The matrix is computed once, saved to disk
+    under a name derived from the word lists and memory-mapped on later runs.
+    Matrices too large to store are computed on demand instead (see
+    OnDemandPatterns).
+    """
+
+    def __init__(
+        self,
+        guesses: Sequence[str],
+        answers: Sequence[str],
+        patterns: np.ndarray,
+        path: Optional[str] = None
+    ) -> None:
+        self.guesses = guesses if isinstance(guesses, WordList) \
+            else list(guesses)
+        self.answers = answers if isinstance(answers, WordList) \
+            else list(answers)
+        self.patterns = patterns
+        self.path = path
+
+        self.word_length = word_length_of(self.guesses)
+        self.num_patterns = num_patterns(self.word_length)
+        self.all_correct = all_correct(self.word_length)
+
+    @cached_property
+    def guess_letters(self) -> np.ndarray:
+        return words_to_array(self.guesses, self.word_length)
+
+    @cached_property
+    def answer_letters(self) -> np.ndarray:
+        return words_to_array(self.answers, self.word_length)
+
+    @cached_property
+    def digest(self) -> str:
+        return word_list_hash(self.guesses, self.answers)
+
+    @cached_property
+    def guess_ids(self) -> Dict[str, int]:
+        return {word: i for (i, word) in enumerate(self.guesses)}
+
+    @cached_property
+    def answer_ids(self) -> Dict[str, int]:
+        return {word: i for (i, word) in enumerate(self.answers)}
+
+    @classmethod
+    def build(
+        cls,
+        guesses: Sequence[str],
+        answers: Sequence[str],
+        cache_dir: Optional[str] = None,
+        max_bytes: int = _MAX_TABLE_BYTES
+    ) -> "FeedbackTable":
+        """Loads the table for these word lists from the cache directory,
+        computing and saving it first if it is not there yet. The table is
+        written to disk a chunk of rows at a time, so building it never
+        holds the whole matrix in memory. If the cache directory cannot be
+        written to, the table is kept in memory only.
+
+        Args:
+            guesses (Sequence[str]): The allowed guesses (table rows)
+            answers (Sequence[str]): The possible answers (table columns)
+            cache_dir (Optional[str]): Where to keep table files. Defaults to
+            $WORDLE_SOLVER_CACHE or ~/.cache/wordle_solver.
+            max_bytes (int): The largest table to store. Patterns of larger
+            tables are computed on demand.
+
+        Returns:
+            FeedbackTable: The feedback table for these word lists
+        """
+        length = word_length_of(guesses)
+        if word_length_of(answers) != length:
+            raise ValueError("Guesses and answers differ in length")
+        dtype = pattern_dtype(length)
+        shape = (len(guesses), len(answers))
+        guess_letters = words_to_array(guesses, length)
+        answer_letters = words_to_array(answers, length)
+
+        if shape[0] * shape[1] * dtype.itemsize > max_bytes:
+            return cls(
+                guesses, answers,
+                OnDemandPatterns(guess_letters, answer_letters)
+            )
+
+        cache_dir = cache_dir or default_cache_dir()
+        file_name = f"feedback-{word_list_hash(guesses, answers)[:16]}.npy"
+        path = os.path.join(cache_dir, file_name)
+
+        try:
+            patterns = np.load(path, mmap_mode='r')
+            if patterns.shape == shape and patterns.dtype == dtype:
+                return cls(guesses, answers, patterns, path)
+        except (OSError, ValueError):
+            pass
+
+        # Write to a temporary file first so that concurrent builders never
+        # see a partially written table. Its name is unique to this builder,
+        # so builders in other threads or processes cannot overwrite it.
+        temp_path = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(
+                prefix=f"{file_name}.", suffix=".tmp", dir=cache_dir
+            )
+            os.close(fd)
+            patterns = np.lib.format.open_memmap(
+                temp_path, mode="w+", dtype=dtype, shape=shape
+            )
+            compute_patterns(guess_letters, answer_letters, patterns)
+            patterns.flush()
+            del patterns
+            os.replace(temp_path, path)
+        except OSError:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return cls(
+                guesses, answers,
+                compute_patterns(guess_letters, answer_letters)
+            )
+
+        return cls(guesses, answers, np.load(path, mmap_mode='r'), path)
+
+    def block(
+        self, guess_ids: np.ndarray, answer_ids: np.ndarray
+    ) -> np.ndarray:
+        """
+        Args:
+            guess_ids (np.ndarray): Row ids of guesses
+            answer_ids (np.ndarray): Column ids of answers
+
+        Returns:
+            np.ndarray: The (len(guess_ids), len(answer_ids)) patterns of
+            these guesses against these answers
+        """
+        if isinstance(self.patterns, OnDemandPatterns):
+            return compute_patterns(
+                self.guess_letters[guess_ids], self.answer_letters[answer_ids]
+            )
+        return self.patterns[guess_ids][:, answer_ids]
+
+    def guess_row(self, guess: str) -> np.ndarray:
+        """
+        Args:
+            guess (str): Any word, whether or not it is in the guess list
+
+        Returns:
+            np.ndarray: The patterns of this guess against every answer
+        """
+        row = self.guess_ids.get(guess)
+        if row is not None:
+            return self.patterns[row]
+
+        return compute_patterns(
+            words_to_array([guess], self.word_length), self.answer_letters
+        )[0]
+
+    def pattern(self, guess: str, answer: str) -> int:
+        """
+        Args:
+            guess (str): The guessed word
+            answer (str): The answer to score the guess against
+
+        Returns:
+            int: The base-3 pattern code for this guess and answer
+        """
+        row = self.guess_ids.get(guess)
+        column = self.answer_ids.get(answer)
+        if row is None or column is None:
+            return score_guess(guess, answer)
+        return int(self.patterns[row, column])
+
+
+_default_table: Optional[FeedbackTable] = None
+_default_table_lock = threading.Lock()
+
+
+def get_default_table() -> FeedbackTable:
+    """
+    Returns:
+        FeedbackTable: The shared table over the default guess and answer
+        lists (see wordle_wordlist)
+    """
+    global _default_table
+    if _default_table is None:
+        # Solves may start on several threads at once. Only the first
+        # builds the table; the others wait for it.
+        with _default_table_lock:
+            if _default_table is None:
+                _default_table = FeedbackTable.build(
+                    default_guesses(), default_answers()
+                )
+    return _default_table
@@ -0,0 +1,311 @@
+import argparse
+import random
+import sys
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import wordle_stats
+from wordle_feedback import Feedback, FeedbackTable, get_default_table
+from wordle_ranking import multi_board_entropies
+from wordle_solver import Wordle
+
+# Guesses allowed by the common variants, keyed by the number of boards
+_GUESS_LIMITS = {1: 6, 2: 7, 4: 9, 8: 13, 16: 21, 32: 37}
+
+Hints = Union[Feedback, str, List[Optional[bool]]]
+
+
+def guess_limit(num_boards: int) -> int:
+    """
+    Args:
+        num_boards (int): The number of boards played at once
+
+    Returns:
+        int: The number of guesses the variant allows, or num_boards + 5 for
+        sizes without a well-known variant
+    """
+    return _GUESS_LIMITS.get(num_boards, num_boards + 5)
+
+
+class MultiBoardSolver:
+    """Solves several Wordle boards played with the same guesses, as in
+    Dordle, Quordle and Octordle. One feedback table is shared by every
+    board: each guess reads its table row once and narrows each board's
+    candidates from the previous turn's, and guesses are ranked by the
+    information they reveal over all the unsolved boards together.
+    """
+
+    def __init__(
+        self, num_boards: int, feedback_table: Optional[FeedbackTable] = None
+    ) -> None:
+        if num_boards < 1:
+            raise ValueError("A game needs at least one board")
+        self.num_boards = num_boards
+        self.feedback_table = feedback_table or get_default_table()
+        self.guesses: List[str] = []
+
+        # Feedback per board for each guess, None for boards already solved
+        self.feedback: List[List[Optional[Feedback]]] = []
+
+        # Candidate answer ids per board after each turn. Entry i holds the
+        # state after the first i guesses. Solved boards have no candidates.
+        all_ids = np.arange(len(self.feedback_table.answers))
+        self._candidates: List[List[np.ndarray]] = [[all_ids] * num_boards]
+        self._solved: List[Tuple[bool, ...]] = [(False,) * num_boards]
+
+        # The guess id of each answer, or -1 if it is not an allowed guess
+        self._answer_guess_ids = np.array([
+            self.feedback_table.guess_ids.get(word, -1)
+            for word in self.feedback_table.answers
+        ])
+
+    def add_guess(self, word: str, hints: Sequence[Optional[Hints]]) -> None:
+        """
+        Args:
+            word (str): The guessed word
+            hints (Sequence[Optional[Hints]]): The feedback on each board,
+            in any form Wordle.Guess accepts. Boards which are already solved
+            take None.
+        """
+        if len(hints) != self.num_boards:
+            raise ValueError(
+                f"Expected feedback for {self.num_boards} boards, "
+                f"got {len(hints)}"
+            )
+        word = word.upper()
+
+        feedback: List[Optional[Feedback]] = []
+        for board, board_hints in enumerate(hints):
+            if self.is_board_solved(board):
+                feedback.append(None)
+            elif board_hints is None:
+                raise ValueError(f"Board {board + 1} needs feedback")
+            else:
+                feedback.append(Wordle.Guess(word, board_hints).feedback)
+
+        with wordle_stats.stage("narrow"):
+            row = self.feedback_table.guess_row(word)
+            candidates = []
+            for board, board_feedback in enumerate(feedback):
+                candidate_ids = self._candidates[-1][board]
+                if board_feedback is None:
+                    candidates.append(candidate_ids)
+                elif board_feedback.is_solved():
+                    candidates.append(candidate_ids[:0])
+                else:
+                    candidates.append(
+                        candidate_ids[row[candidate_ids] == board_feedback]
+                    )
+
+        self.guesses.append(word)
+        self.feedback.append(feedback)
+        self._candidates.append(candidates)
+        self._solved.append(tuple(
+            solved or board_feedback.is_solved()
+            for solved, board_feedback in zip(self._solved[-1], feedback)
+        ))
+
+    def undo(self) -> str:
+        """Removes the most recent guess.
+
+        Returns:
+            str: The guess which was removed
+        """
+        if not self.guesses:
+            raise IndexError("There are no guesses to undo")
+        self.feedback.pop()
+        self._candidates.pop()
+        self._solved.pop()
+        return self.guesses.pop()
+
+    def is_board_solved(self, board: int) -> bool:
+        return self._solved[-1][board]
+
+    def is_solved(self) -> bool:
+        return all(self._solved[-1])
+
+    def unsolved_boards(self) -> List[int]:
+        return [
+            board for board, solved in enumerate(self._solved[-1])
+            if not solved
+        ]
+
+    def get_candidate_ids(self) -> List[np.ndarray]:
+        """
+        Returns:
+            List[np.ndarray]: The feedback table column ids of each board's
+            possible solutions, empty for solved boards
+        """
+        return list(self._candidates[-1])
+
+    def get_valid_answers(self, board: int) -> List[str]:
+        """
+        Args:
+            board (int): The board's index
+
+        Returns:
+            List[str]: The possible solutions to the board
+        """
+        answers = self.feedback_table.answers
+        return [answers[i] for i in self._candidates[-1][board]]
+
+    def rank_guesses(
+        self, top_k: int = 10, guess_ids: Optional[np.ndarray] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Args:
+            top_k (int): The number of guesses to return
+            guess_ids (Optional[np.ndarray]): Row ids of the guesses to
+            consider. Defaults to every guess in the table.
+
+        Returns:
+            List[Tuple[str, float]]: The top_k guesses and their expected
+            information in bits summed over the unsolved boards, best first.
+            Ties go to the guess most likely to solve a board.
+        """
+        table = self.feedback_table
+        boards = [ids for ids in self._candidates[-1] if len(ids)]
+        if guess_ids is None:
+            guess_ids = np.arange(len(table.guesses))
+        if not boards or len(guess_ids) == 0:
+            return []
+
+        with wordle_stats.stage("rank"):
+            scores = multi_board_entropies(table, guess_ids, boards)
+
+            # The chance each guess solves a board, summed over the boards
+            solve_chances = np.zeros(len(table.guesses))
+            for candidate_ids in boards:
+                answer_guess_ids = self._answer_guess_ids[candidate_ids]
+                np.add.at(
+                    solve_chances,
+                    answer_guess_ids[answer_guess_ids >= 0],
+                    1 / len(candidate_ids)
+                )
+            order = np.lexsort((-solve_chances[guess_ids], -scores))[:top_k]
+
+        return [
+            (table.guesses[guess_ids[i]], float(scores[i])) for i in order
+        ]
+
+    def best_guess(self) -> Optional[str]:
+        """
+        Returns:
+            Optional[str]: The guess to play next. A board which is down to
+            one answer must be guessed eventually, so such answers are
+            played first, the most informative of them first.
+        """
+        known = [
+            self._answer_guess_ids[ids[0]]
+            for ids in self._candidates[-1]
+            if len(ids) == 1 and self._answer_guess_ids[ids[0]] >= 0
+        ]
+        ranking = self.rank_guesses(
+            1, np.unique(known) if known else None
+        )
+        return ranking[0][0] if ranking else None
+
+
+def play_game(
+    answers: Sequence[str],
+    table: FeedbackTable,
+    limit: Optional[int] = None
+) -> List[str]:
+    """Plays one game with MultiBoardSolver.best_guess until every board is
+    solved or the guesses run out.
+
+    Args:
+        answers (Sequence[str]): The answer on each board
+        table (FeedbackTable): The feedback table to solve and score with
+        limit (Optional[int]): The most guesses to make. Defaults to the
+        variant's guess limit.
+
+    Returns:
+        List[str]: The guesses made
+    """
+    solver = MultiBoardSolver(len(answers), table)
+    limit = limit or guess_limit(len(answers))
+    while not solver.is_solved() and len(solver.guesses) < limit:
+        guess = solver.best_guess()
+        solver.add_guess(guess, [
+            None if solver.is_board_solved(board)
+            else Feedback(table.pattern(guess, answer), table.word_length)
+            for board, answer in enumerate(answers)
+        ])
+    return solver.guesses
+
+
+def _interactive(solver: MultiBoardSolver, top_k: int) -> None:
+    print(
+        "Enter each guess followed by its tiles on every unsolved board, "
+        "e.g. CRANE BYG.. GGBBB (or undo)"
+    )
+    print(f"Suggestions: {solver.rank_guesses(top_k)}")
+    for line in sys.stdin:
+        parts = line.split()
+        if not parts:
+            continue
+        try:
+            if parts[0].lower() == "undo":
+                solver.undo()
+            else:
+                tiles = iter(parts[1:])
+                unsolved = solver.unsolved_boards()
+                if len(parts) - 1 != len(unsolved):
+                    raise ValueError(
+                        f"Expected tiles for {len(unsolved)} boards"
+                    )
+                solver.add_guess(parts[0], [
+                    None if solver.is_board_solved(board) else next(tiles)
+                    for board in range(solver.num_boards)
+                ])
+        except (IndexError, ValueError) as error:
+            print(f"Error: {error}")
+            continue
+
+        if solver.is_solved():
+            print(f"Solved in {len(solver.guesses)} guesses")
+            break
+        for board in solver.unsolved_boards():
+            answers = solver.get_valid_answers(board)
+            print(f"Board {board + 1}: {len(answers)} candidates "
+                  f"{' '.join(answers[:10])}")
+        print(f"Suggestions: {solver.rank_guesses(top_k)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Solve several Wordle boards played with the same "
+        "guesses"
+    )
+    parser.add_argument(
+        "-n", "--boards", type=int, default=4,
+        help="Number of boards, e.g. 4 for Quordle or 8 for Octordle"
+    )
+    parser.add_argument(
+        "--simulate", type=int, default=0, metavar="GAMES",
+        help="Play this many games against random answers instead of "
+        "reading guesses from stdin"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-k", "--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    table = get_default_table()
+    if not args.simulate:
+        _interactive(MultiBoardSolver(args.boards, table), args.top_k)
+        sys.exit()
+
+    rng = random.Random(args.seed)
+    limit = guess_limit(args.boards)
+    lengths = []
+    for _ in range(args.simulate):
+        answers = rng.sample(table.answers, args.boards)
+        lengths.append(len(play_game(answers, table, limit + 10)))
+    wins = sum(length <= limit for length in lengths)
+    print(
+        f"{args.simulate} games of {args.boards} boards: mean "
+        f"{np.mean(lengths):.3f} guesses, worst {max(lengths)}, "
+        f"{wins} won within {limit}"
+    )
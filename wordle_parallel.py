@@ -0,0 +1,67 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def bounded_map(
+    fn: Callable[..., R],
+    items: Iterable[T],
+    executor: Executor,
+    window: int,
+    ordered: bool = True,
+    args: Tuple = ()
+) -> Iterator[R]:
+    """Like Executor.map, but only reads ahead of the results by window items
+    so that memory stays bounded on arbitrarily long inputs.
+
+    Args:
+        fn (Callable[..., R]): Called as fn(item, *args) in the executor
+        items (Iterable[T]): The inputs, consumed lazily
+        executor (Executor): The executor to run fn in
+        window (int): The maximum number of items in flight
+        ordered (bool): Whether results come back in input order, or as soon
+        as they are ready
+        args (Tuple): Extra arguments passed to fn after each item
+
+    Returns:
+        Iterator[R]: The results of fn
+    """
+    items = iter(items)
+    pending = deque(
+        executor.submit(fn, item, *args) for item in islice(items, window)
+    )
+
+    while pending:
+        if ordered:
+            done = [pending.popleft()]
+        else:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            done = [future for future in pending if future in finished]
+            for future in done:
+                pending.remove(future)
+
+        for future in done:
+            yield future.result()
+            for item in islice(items, 1):
+                pending.append(executor.submit(fn, item, *args))
+
+
+def chunk_lines(lines: Iterable[str], size: int) -> Iterator[List[str]]:
+    """
+    Args:
+        lines (Iterable[str]): Lines of input, read lazily
+        size (int): The most lines per chunk
+
+    Returns:
+        Iterator[List[str]]: The non-blank lines, in chunks of size lines
+    """
+    lines = (line for line in lines if line.strip())
+    while True:
+        chunk = list(islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,283 @@
+from typing import List, Optional, Sequence, Tuple, Union
+
+WORD_LENGTH = 5
+NUM_PATTERNS = 3 ** WORD_LENGTH
+
+# Each tile of a feedback pattern is a base-3 digit, with the first letter of
+# the guess in the least significant place
+_TILE_NOT_IN_WORD = 0
+_TILE_WRONG_PLACE = 1
+_TILE_CORRECT = 2
+
+ALL_CORRECT = NUM_PATTERNS - 1
+
+# Hint values as used by Wordle.Guess, indexed by tile
+_TILE_HINTS = (None, False, True)
+
+
+def num_patterns(length: int) -> int:
+    """
+    Args:
+        length (int): The number of letters in a word
+
+    Returns:
+        int: The number of distinct patterns for words of this length
+    """
+    return 3 ** length
+
+
+def all_correct(length: int) -> int:
+    """
+    Args:
+        length (int): The number of letters in a word
+
+    Returns:
+        int: The pattern code of a solved guess of this length
+    """
+    return 3 ** length - 1
+
+
+def encode_hints(hints: Sequence[Optional[bool]]) -> int:
+    """
+    Args:
+        hints (Sequence[Optional[bool]]): Per-tile hints as used by
+        Wordle.Guess (True, False or None)
+
+    Returns:
+        int: The base-3 pattern code for these hints
+    """
+    pattern = 0
+    for i, hint in enumerate(hints):
+        if hint is True:
+            pattern += _TILE_CORRECT * 3 ** i
+        elif hint is False:
+            pattern += _TILE_WRONG_PLACE * 3 ** i
+    return pattern
+
+
+# Letters, and the squares of shared results in the normal and high-contrast
+# (orange and blue) colour schemes
+_PATTERN_CHARS = {
+    'G': _TILE_CORRECT, '\U0001f7e9': _TILE_CORRECT,
+    '\U0001f7e7': _TILE_CORRECT,
+    'Y': _TILE_WRONG_PLACE, '\U0001f7e8': _TILE_WRONG_PLACE,
+    '\U0001f7e6': _TILE_WRONG_PLACE,
+    'B': _TILE_NOT_IN_WORD, '.': _TILE_NOT_IN_WORD, '-': _TILE_NOT_IN_WORD,
+    '\u2b1b': _TILE_NOT_IN_WORD, '\u2b1c': _TILE_NOT_IN_WORD,
+}
+
+
+def _parse_tiles(text: str, length: Optional[int]) -> List[int]:
+    chars = text.strip().replace('\ufe0f', '').upper()
+    if length is not None and len(chars) != length:
+        raise ValueError(f"Expected {length} tiles, got {text!r}")
+
+    tiles = []
+    for char in chars:
+        tile = _PATTERN_CHARS.get(char)
+        if tile is None:
+            raise ValueError(f"Unknown tile {char!r} in {text!r}")
+        tiles.append(tile)
+    return tiles
+
+
+def parse_pattern(text: str, length: int = WORD_LENGTH) -> int:
+    """
+    Args:
+        text (str): One character per tile: G for correct, Y for wrong place
+        and B (or . or -) for not in word. The coloured square emoji are
+        accepted too.
+        length (int): The number of tiles expected
+
+    Returns:
+        int: The base-3 pattern code for these tiles
+    """
+    tiles = _parse_tiles(text, length)
+    return sum(tile * 3 ** i for i, tile in enumerate(tiles))
+
+
+def format_pattern(pattern: int, length: int = WORD_LENGTH) -> str:
+    """
+    Args:
+        pattern (int): A base-3 pattern code
+        length (int): The number of tiles in the pattern
+
+    Returns:
+        str: The pattern as G/Y/B letters, e.g. "GYBBB"
+    """
+    letters = []
+    for _ in range(length):
+        letters.append("BYG"[pattern % 3])
+        pattern //= 3
+    return ''.join(letters)
+
+
+def decode_pattern(
+    pattern: int, length: int = WORD_LENGTH
+) -> List[Optional[bool]]:
+    """
+    Args:
+        pattern (int): A base-3 pattern code
+        length (int): The number of tiles in the pattern
+
+    Returns:
+        List[Optional[bool]]: The per-tile hints encoded by the pattern
+    """
+    hints = []
+    for _ in range(length):
+        hints.append(_TILE_HINTS[pattern % 3])
+        pattern //= 3
+    return hints
+
+
+def score_guess(guess: str, answer: str) -> int:
+    """Reference scorer which works out the feedback for a single guess the
+    same way the game does: greens first, then yellows from left to right
+    while unmatched copies of the letter remain in the answer.
+
+    Args:
+        guess (str): The guessed word
+        answer (str): The answer to score the guess against
+
+    Returns:
+        int: The base-3 pattern code the game would show for this guess
+    """
+    tiles = [_TILE_NOT_IN_WORD] * len(guess)
+    unmatched = {}
+    for i, (guess_letter, answer_letter) in enumerate(zip(guess, answer)):
+        if guess_letter == answer_letter:
+            tiles[i] = _TILE_CORRECT
+        else:
+            unmatched[answer_letter] = unmatched.get(answer_letter, 0) + 1
+
+    for i, guess_letter in enumerate(guess):
+        if tiles[i] != _TILE_CORRECT and unmatched.get(guess_letter, 0) > 0:
+            tiles[i] = _TILE_WRONG_PLACE
+            unmatched[guess_letter] -= 1
+
+    return sum(tile * 3 ** i for i, tile in enumerate(tiles))
+
+
+class Feedback:
+    """The tiles shown for one guess, held as a single base-3 code (the same
+    code used to index feedback tables) plus the number of tiles. Instances
+    are immutable and compare equal to their code, so they can be used
+    directly as table indices and dictionary keys.
+    """
+
+    __slots__ = ("code", "length")
+
+    NOT_IN_WORD = _TILE_NOT_IN_WORD
+    WRONG_PLACE = _TILE_WRONG_PLACE
+    CORRECT = _TILE_CORRECT
+
+    def __init__(self, code: int, length: int = WORD_LENGTH) -> None:
+        if not 0 <= code < 3 ** length:
+            raise ValueError(f"{code} is not a {length}-tile pattern code")
+        object.__setattr__(self, "code", code)
+        object.__setattr__(self, "length", length)
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError("Feedback is immutable")
+
+    @classmethod
+    def parse(cls, text: str, length: Optional[int] = None) -> "Feedback":
+        """
+        Args:
+            text (str): Tiles as accepted by parse_pattern, e.g. "GYB.."
+            length (Optional[int]): The number of tiles expected. Defaults
+            to however many the text holds.
+
+        Returns:
+            Feedback: The parsed feedback
+        """
+        tiles = _parse_tiles(text, length)
+        return cls.from_tiles(tiles)
+
+    @classmethod
+    def from_tiles(cls, tiles: Sequence[int]) -> "Feedback":
+        """
+        Args:
+            tiles (Sequence[int]): NOT_IN_WORD, WRONG_PLACE or CORRECT per
+            tile
+
+        Returns:
+            Feedback: The feedback with these tiles
+        """
+        code = 0
+        for tile in reversed(tiles):
+            code = code * 3 + tile
+        return cls(code, len(tiles))
+
+    @classmethod
+    def from_hints(
+        cls, hints: Union["Feedback", Sequence[Optional[bool]]]
+    ) -> "Feedback":
+        """
+        Args:
+            hints (Union[Feedback, Sequence[Optional[bool]]]): Per-tile
+            hints as used by Wordle.Guess (True, False or None)
+
+        Returns:
+            Feedback: The feedback with these hints
+        """
+        if isinstance(hints, Feedback):
+            return hints
+        return cls(encode_hints(hints), len(hints))
+
+    @property
+    def tiles(self) -> Tuple[int, ...]:
+        """The tile of each letter, first letter first."""
+        tiles = []
+        code = self.code
+        for _ in range(self.length):
+            code, tile = divmod(code, 3)
+            tiles.append(tile)
+        return tuple(tiles)
+
+    @property
+    def hints(self) -> List[Optional[bool]]:
+        """The per-tile hints as used by Wordle.Guess."""
+        return [_TILE_HINTS[tile] for tile in self.tiles]
+
+    def tile(self, index: int) -> int:
+        return self.code // 3 ** index % 3
+
+    def with_tile(self, index: int, tile: int) -> "Feedback":
+        """
+        Returns:
+            Feedback: A copy of this feedback with one tile changed
+        """
+        place = 3 ** index
+        code = self.code + (tile - self.code // place % 3) * place
+        return Feedback(code, self.length)
+
+    def is_solved(self) -> bool:
+        return self.code == all_correct(self.length)
+
+    def __index__(self) -> int:
+        return self.code
+
+    __int__ = __index__
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Feedback):
+            return self.code == other.code and self.length == other.length
+        if isinstance(other, int):
+            return self.code == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.code)
+
+    def __str__(self) -> str:
+        return ''.join("BYG"[tile] for tile in self.tiles)
+
+    def __repr__(self) -> str:
+        return f"Feedback({str(self)!r})"
+
+    def __reduce__(self):
+        return (Feedback, (self.code, self.length))
@@ -0,0 +1,472 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+import wordle_stats
+from wordle_feedback import FeedbackTable
+
+# Guess x candidate cells scored per bincount call. Bounds the temporary
+# arrays to a few tens of megabytes.
+_CELLS_PER_CHUNK = 1 << 21
+
+# Pattern buckets counted per bincount call when scoring several boards.
+# Keeps the counts small enough to stay in cache.
+_BUCKETS_PER_CHUNK = 1 << 19
+
+# Below this many guess x candidate cells, starting worker processes costs
+# more than it saves
+_PARALLEL_THRESHOLD = 1 << 23
+
+# Guess x candidate cells scored exactly between deadline checks in
+# anytime_rank. Each step takes a few milliseconds.
+_ANYTIME_CELLS_PER_STEP = 1 << 18
+
+
+def pattern_counts(
+    table: FeedbackTable, guess_ids: np.ndarray, candidate_ids: np.ndarray
+) -> np.ndarray:
+    """Buckets the candidates by the pattern each guess would produce.
+
+    Args:
+        table (FeedbackTable): The feedback table to read patterns from
+        guess_ids (np.ndarray): Row ids of the guesses to bucket by
+        candidate_ids (np.ndarray): Column ids of the remaining answers
+
+    Returns:
+        np.ndarray: A (len(guess_ids), table.num_patterns) array holding the
+        number of candidates in each guess's pattern buckets
+    """
+    num_patterns = table.num_patterns
+    rows = table.block(guess_ids, candidate_ids)
+    offsets = np.arange(len(guess_ids), dtype=np.intp)[:, None] * num_patterns
+    counts = np.bincount(
+        (rows + offsets).ravel(), minlength=len(guess_ids) * num_patterns
+    )
+    return counts.reshape(len(guess_ids), num_patterns)
+
+
+def entropies(
+    table: FeedbackTable, guess_ids: np.ndarray, candidate_ids: np.ndarray
+) -> np.ndarray:
+    """
+    Args:
+        table (FeedbackTable): The feedback table to read patterns from
+        guess_ids (np.ndarray): Row ids of the guesses to score
+        candidate_ids (np.ndarray): Column ids of the remaining answers
+
+    Returns:
+        np.ndarray: The expected information, in bits, each guess reveals
+        about which candidate is the answer
+    """
+    num_candidates = len(candidate_ids)
+    scores = np.zeros(len(guess_ids))
+    if num_candidates == 0:
+        return scores
+    wordle_stats.count("guesses_scored", len(guess_ids))
+    wordle_stats.count("cells_scored", len(guess_ids) * num_candidates)
+
+    chunk_size = max(1, _CELLS_PER_CHUNK // num_candidates)
+    for start in range(0, len(guess_ids), chunk_size):
+        chunk = guess_ids[start:start + chunk_size]
+        counts = pattern_counts(table, chunk, candidate_ids).astype(np.float64)
+        weighted = counts * np.log2(np.maximum(counts, 1))
+        scores[start:start + chunk_size] = (
+            np.log2(num_candidates) - weighted.sum(axis=1) / num_candidates
+        )
+
+    return scores
+
+
+def multi_board_entropies(
+    table: FeedbackTable,
+    guess_ids: np.ndarray,
+    boards: Sequence[np.ndarray]
+) -> np.ndarray:
+    """Scores guesses on several boards at once. Every board's candidates
+    are read from the same table rows in one pass, with each board's
+    patterns offset into its own range of buckets so that a single bincount
+    counts them all. Boards with the same candidates are only scored once,
+    so early turns cost about as much as on a single board.
+
+    Args:
+        table (FeedbackTable): The feedback table to read patterns from
+        guess_ids (np.ndarray): Row ids of the guesses to score
+        boards (Sequence[np.ndarray]): Column ids of the remaining answers on
+        each board
+
+    Returns:
+        np.ndarray: The expected information, in bits, each guess reveals
+        summed over the boards
+    """
+    scores = np.zeros(len(guess_ids))
+
+    # A board with one candidate left has nothing more to reveal
+    unique: Dict[bytes, Tuple[np.ndarray, int]] = {}
+    for candidate_ids in boards:
+        if len(candidate_ids) > 1:
+            key = np.asarray(candidate_ids, dtype=np.int32).tobytes()
+            ids, weight = unique.get(key, (candidate_ids, 0))
+            unique[key] = (ids, weight + 1)
+    if not unique:
+        return scores
+
+    sizes = np.array([len(ids) for ids, _ in unique.values()])
+    weights = np.array([weight for _, weight in unique.values()])
+    candidate_ids = np.concatenate([ids for ids, _ in unique.values()])
+    num_patterns = table.num_patterns
+    board_offsets = np.repeat(np.arange(len(sizes)) * num_patterns, sizes)
+    buckets = len(sizes) * num_patterns
+
+    # Most buckets are empty, so n log n is looked up rather than computed
+    n = np.arange(sizes.max() + 1)
+    n_log_n = n * np.log2(np.maximum(n, 1))
+    wordle_stats.count("guesses_scored", len(guess_ids))
+    wordle_stats.count("cells_scored", len(guess_ids) * len(candidate_ids))
+
+    chunk_size = max(1, min(
+        _CELLS_PER_CHUNK // len(candidate_ids), _BUCKETS_PER_CHUNK // buckets
+    ))
+    for start in range(0, len(guess_ids), chunk_size):
+        chunk = guess_ids[start:start + chunk_size]
+        rows = table.block(chunk, candidate_ids) + board_offsets
+        rows += np.arange(len(chunk), dtype=np.intp)[:, None] * buckets
+        counts = np.bincount(rows.ravel(), minlength=len(chunk) * buckets)
+        counts = counts.reshape(len(chunk), len(sizes), num_patterns)
+        weighted = n_log_n[counts].sum(axis=2)
+        scores[start:start + chunk_size] = (
+            (np.log2(sizes) - weighted / sizes) * weights
+        ).sum(axis=1)
+
+    return scores
+
+
+def letter_counts(
+    table: FeedbackTable, candidate_ids: np.ndarray
+) -> np.ndarray:
+    """
+    Args:
+        table (FeedbackTable): The table whose answers the ids refer to
+        candidate_ids (np.ndarray): Column ids of the remaining answers
+
+    Returns:
+        np.ndarray: A (table.word_length, 26) array holding the number of
+        candidates with each letter at each position
+    """
+    length = table.word_length
+    letters = table.answer_letters[candidate_ids]
+    offsets = np.arange(length) * 26
+    return np.bincount(
+        (letters + offsets).ravel(), minlength=length * 26
+    ).reshape(length, 26)
+
+
+def letter_frequencies(
+    table: FeedbackTable, candidate_ids: np.ndarray
+) -> np.ndarray:
+    """
+    Args:
+        table (FeedbackTable): The table whose answers the ids refer to
+        candidate_ids (np.ndarray): Column ids of the remaining answers
+
+    Returns:
+        np.ndarray: A (table.word_length, 26) array holding the fraction of the
+        candidates with each letter at each position
+    """
+    counts = letter_counts(table, candidate_ids)
+    return counts / max(len(candidate_ids), 1)
+
+
+def frequency_scores(
+    table: FeedbackTable, guess_ids: np.ndarray, frequencies: np.ndarray
+) -> np.ndarray:
+    """A cheap stand-in for entropy: the expected number of green tiles each
+    guess would get, given per-position letter frequencies.
+
+    Args:
+        table (FeedbackTable): The table whose guesses the ids refer to
+        guess_ids (np.ndarray): Row ids of the guesses to score
+        frequencies (np.ndarray): As returned by letter_frequencies
+
+    Returns:
+        np.ndarray: The score of each guess
+    """
+    letters = table.guess_letters[guess_ids]
+    return frequencies[np.arange(table.word_length), letters].sum(axis=1)
+
+
+# Tables opened by worker processes, keyed by their file path
+_worker_tables: Dict[str, FeedbackTable] = {}
+
+
+def _entropies_worker(
+    path: str,
+    guesses: List[str],
+    answers: List[str],
+    guess_ids: np.ndarray,
+    candidate_ids: np.ndarray
+) -> np.ndarray:
+    table = _worker_tables.get(path)
+    if table is None:
+        table = FeedbackTable(
+            guesses, answers, np.load(path, mmap_mode='r'), path
+        )
+        _worker_tables[path] = table
+    return entropies(table, guess_ids, candidate_ids)
+
+
+# The pool shared by every parallel ranking, started on first use and
+# kept so that workers keep their memory-mapped tables between rankings. It
+# always has one worker per CPU; callers asking for fewer workers split
+# their work into fewer tasks rather than resizing it under other callers.
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _shutdown_pool(pool: Optional[ProcessPoolExecutor] = None) -> None:
+    """Shuts the shared pool down so that the next ranking starts a new one.
+
+    Args:
+        pool (Optional[ProcessPoolExecutor]): Only shut the pool down if it
+        is still this one, so that a pool another caller has already
+        replaced is left alone
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and (pool is None or pool is _pool):
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+atexit.register(_shutdown_pool)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    Returns:
+        ProcessPoolExecutor: The shared pool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Workers are started by a fork server rather than forked from
+            # the caller, which may have other threads running
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else None
+            )
+            _pool = ProcessPoolExecutor(
+                os.cpu_count() or 1, mp_context=context
+            )
+        return _pool
+
+
+def parallel_entropies(
+    table: FeedbackTable,
+    guess_ids: np.ndarray,
+    candidate_ids: np.ndarray,
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None
+) -> np.ndarray:
+    """Scores guesses like entropies(), splitting the guesses across worker
+    processes when there is enough work to make that worthwhile. Workers
+    memory-map the table file, so it is shared rather than copied, and keep
+    it open for later calls.
+
+    Args:
+        table (FeedbackTable): The feedback table to read patterns from
+        guess_ids (np.ndarray): Row ids of the guesses to score
+        candidate_ids (np.ndarray): Column ids of the remaining answers
+        workers (Optional[int]): Number of worker processes. Defaults to the
+        number of CPUs.
+        executor (Optional[Executor]): A process pool to score on. Defaults
+        to a pool shared by every call in this process, which has one worker
+        per CPU whatever the number of workers asked for.
+
+    Returns:
+        np.ndarray: The expected information of each guess, in bits
+    """
+    workers = workers or os.cpu_count() or 1
+    cells = len(guess_ids) * len(candidate_ids)
+    if workers < 2 or table.path is None or cells < _PARALLEL_THRESHOLD:
+        return entropies(table, guess_ids, candidate_ids)
+
+    # Workers keep their own counters, so count their share here
+    wordle_stats.count("guesses_scored", len(guess_ids))
+    wordle_stats.count("cells_scored", cells)
+    wordle_stats.count("parallel_rankings")
+
+    chunks = np.array_split(guess_ids, workers)
+    pool = executor or _get_pool()
+    try:
+        futures = [
+            pool.submit(
+                _entropies_worker,
+                table.path,
+                table.guesses,
+                table.answers,
+                chunk,
+                candidate_ids
+            )
+            for chunk in chunks
+        ]
+        return np.concatenate([future.result() for future in futures])
+    except (BrokenProcessPool, RuntimeError):
+        # RuntimeError means the pool was shut down, by another caller or
+        # at exit, between fetching it and submitting to it
+        if executor is not None:
+            raise
+        # A worker died, or the pool is gone. Start a fresh pool next time
+        # and score here.
+        _shutdown_pool(pool)
+        return entropies(table, guess_ids, candidate_ids)
+
+
+def rank_guesses(
+    table: FeedbackTable,
+    candidate_ids: np.ndarray,
+    top_k: int = 10,
+    guess_ids: Optional[np.ndarray] = None,
+    workers: Optional[int] = None
+) -> List[Tuple[str, float]]:
+    """
+    Args:
+        table (FeedbackTable): The feedback table to read patterns from
+        candidate_ids (np.ndarray): Column ids of the remaining answers
+        top_k (int): The number of guesses to return
+        guess_ids (Optional[np.ndarray]): Row ids of the guesses to consider.
+        Defaults to every guess in the table.
+        workers (Optional[int]): Number of worker processes to score with
+
+    Returns:
+        List[Tuple[str, float]]: The top_k guesses and their expected
+        information in bits, best first. Ties go to guesses which could be
+        the answer themselves.
+    """
+    if guess_ids is None:
+        guess_ids = np.arange(len(table.guesses))
+    if len(candidate_ids) == 0 or len(guess_ids) == 0:
+        return []
+
+    scores = parallel_entropies(table, guess_ids, candidate_ids, workers)
+
+    candidate_words = {table.answers[i] for i in candidate_ids}
+    is_candidate = np.array(
+        [table.guesses[i] in candidate_words for i in guess_ids]
+    )
+    order = np.lexsort((~is_candidate, -scores))[:top_k]
+
+    return [
+        (table.guesses[guess_ids[i]], float(scores[i])) for i in order
+    ]
+
+
+class AnytimeRanking(NamedTuple):
+    """A ranking which may only be partly exact.
+
+    ranking holds the top guesses, best first. Guesses which were scored
+    exactly come first, with their expected information in bits; any which
+    were not reached are ordered by the letter frequency heuristic and have
+    a score of None. refined of total guesses were scored exactly, and
+    complete is True when that was all of them, in which case the ranking is
+    the same as rank_guesses would give.
+    """
+    ranking: List[Tuple[str, Optional[float]]]
+    refined: int
+    total: int
+    complete: bool
+    seconds: float
+
+
+def anytime_rank(
+    table: FeedbackTable,
+    candidate_ids: np.ndarray,
+    time_budget: float,
+    top_k: int = 10,
+    guess_ids: Optional[np.ndarray] = None,
+    frequencies: Optional[np.ndarray] = None,
+    progress: Optional[Callable[[AnytimeRanking], None]] = None
+) -> AnytimeRanking:
+    """Ranks guesses within a time budget. Every guess is first ordered by
+    the cheap letter frequency heuristic, and then guesses are scored
+    exactly, in that order, until the budget runs out.
+
+    Args:
+        table (FeedbackTable): The feedback table to read patterns from
+        candidate_ids (np.ndarray): Column ids of the remaining answers
+        time_budget (float): Seconds to spend on exact scoring. The
+        heuristic ranking is always made, however small the budget.
+        top_k (int): The number of guesses to return
+        guess_ids (Optional[np.ndarray]): Row ids of the guesses to consider.
+        Defaults to every guess in the table.
+        frequencies (Optional[np.ndarray]): As returned by
+        letter_frequencies, if already known
+        progress (Optional[Callable[[AnytimeRanking], None]]): Called with
+        the heuristic ranking and then with the improved ranking after each
+        step of exact scoring
+
+    Returns:
+        AnytimeRanking: The best ranking found within the budget
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget
+    if guess_ids is None:
+        guess_ids = np.arange(len(table.guesses))
+    if len(candidate_ids) == 0 or len(guess_ids) == 0:
+        return AnytimeRanking([], 0, len(guess_ids), True, 0.0)
+
+    if frequencies is None:
+        frequencies = letter_frequencies(table, candidate_ids)
+    heuristic = frequency_scores(table, guess_ids, frequencies)
+    order = np.argsort(-heuristic, kind="stable")
+
+    candidate_guess_ids = [
+        table.guess_ids.get(table.answers[i], -1) for i in candidate_ids
+    ]
+    is_candidate = np.isin(guess_ids, candidate_guess_ids)
+
+    scores = np.zeros(len(guess_ids))
+
+    def snapshot(refined: int) -> AnytimeRanking:
+        # Ordered as rank_guesses orders them, so that a complete ranking
+        # matches it exactly
+        exact = np.sort(order[:refined])
+        ranked = exact[np.lexsort((~is_candidate[exact], -scores[exact]))]
+        ranking = [
+            (table.guesses[guess_ids[i]], float(scores[i]))
+            for i in ranked[:top_k]
+        ]
+        ranking.extend(
+            (table.guesses[guess_ids[i]], None)
+            for i in order[refined:refined + top_k - len(ranking)]
+        )
+        return AnytimeRanking(
+            ranking,
+            refined,
+            len(guess_ids),
+            refined == len(guess_ids),
+            time.perf_counter() - start
+        )
+
+    if progress is not None:
+        progress(snapshot(0))
+
+    step = max(1, _ANYTIME_CELLS_PER_STEP // len(candidate_ids))
+    refined = 0
+    while refined < len(order) and time.perf_counter() < deadline:
+        chunk = order[refined:refined + step]
+        scores[chunk] = entropies(table, guess_ids[chunk], candidate_ids)
+        refined += len(chunk)
+        if progress is not None and refined < len(order):
+            progress(snapshot(refined))
+
+    result = snapshot(refined)
+    if progress is not None:
+        progress(result)
+    return result
@@ -0,0 +1,247 @@
+import argparse
+import sys
+import time
+from collections import Counter
+from typing import List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from wordle_feedback import Feedback, FeedbackTable, get_default_table
+
+# Guess x answer cells read per step when building an index
+_CELLS_PER_CHUNK = 1 << 22
+
+Pattern = Union[Feedback, int, str]
+
+
+class ReverseResult(NamedTuple):
+    """The answers which could produce a grid of patterns."""
+
+    answers: List[str]
+    # Per row, how many allowed guesses produce its pattern for at least
+    # one of the answers
+    row_guess_counts: List[int]
+    # (len(answers), rows) guesses producing each row's pattern per answer
+    answer_guess_counts: np.ndarray
+
+
+class ReverseIndex:
+    """An inverted feedback table. For each answer it holds the number of
+    guesses which produce each pattern, so that the answers consistent with
+    a grid of patterns are found with a few column reads rather than by
+    trying every guess against every answer for every row. Optionally it
+    also holds the guesses themselves, grouped by pattern, for each answer.
+    """
+
+    def __init__(
+        self,
+        table: FeedbackTable,
+        counts: np.ndarray,
+        guess_order: Optional[np.ndarray] = None
+    ) -> None:
+        self.table = table
+        # (answers, patterns) number of guesses giving each pattern
+        self.counts = counts
+        # (answers, guesses) guess ids of each answer sorted by pattern
+        self.guess_order = guess_order
+        # (answers, patterns) where each pattern's guesses start in
+        # guess_order
+        self.starts = None if guess_order is None else (
+            np.cumsum(counts, axis=1, dtype=np.int64) - counts
+        )
+
+    @classmethod
+    def build(
+        cls, table: FeedbackTable, guess_sets: bool = True
+    ) -> "ReverseIndex":
+        """
+        Args:
+            table (FeedbackTable): The feedback table to invert
+            guess_sets (bool): Whether to store the guesses behind each
+            count, which takes four bytes per table cell. Without them,
+            guesses_for reads the table instead.
+
+        Returns:
+            ReverseIndex: The index over the table's word lists
+        """
+        num_guesses, num_answers = len(table.guesses), len(table.answers)
+        num_patterns = table.num_patterns
+        count_dtype = np.uint16 if num_guesses < 1 << 16 else np.uint32
+        counts = np.empty((num_answers, num_patterns), dtype=count_dtype)
+        guess_order = np.empty(
+            (num_answers, num_guesses), dtype=np.int32
+        ) if guess_sets else None
+
+        all_guesses = np.arange(num_guesses)
+        chunk_size = max(1, _CELLS_PER_CHUNK // max(1, num_guesses))
+        for start in range(0, num_answers, chunk_size):
+            answer_ids = np.arange(start, min(start + chunk_size, num_answers))
+            columns = table.block(all_guesses, answer_ids).T
+            offsets = np.arange(len(answer_ids))[:, None] * num_patterns
+            counts[answer_ids] = np.bincount(
+                (columns + offsets).ravel(),
+                minlength=len(answer_ids) * num_patterns
+            ).reshape(len(answer_ids), num_patterns)
+            if guess_order is not None:
+                guess_order[answer_ids] = np.argsort(
+                    columns, axis=1, kind="stable"
+                )
+
+        return cls(table, counts, guess_order)
+
+    def _code(self, pattern: Pattern) -> int:
+        if isinstance(pattern, str):
+            pattern = Feedback.parse(pattern, self.table.word_length)
+        code = int(pattern)
+        if not 0 <= code < self.table.num_patterns:
+            raise ValueError(f"{pattern!r} is not a pattern for this table")
+        return code
+
+    def guesses_for(self, answer_id: int, pattern: Pattern) -> np.ndarray:
+        """
+        Args:
+            answer_id (int): Column id of the answer
+            pattern (Pattern): The pattern shown
+
+        Returns:
+            np.ndarray: Row ids of the guesses which show this pattern
+            against this answer
+        """
+        code = self._code(pattern)
+        if self.guess_order is None:
+            column = self.table.block(
+                np.arange(len(self.table.guesses)), np.array([answer_id])
+            )[:, 0]
+            return np.flatnonzero(column == code)
+        start = int(self.starts[answer_id, code])
+        end = start + int(self.counts[answer_id, code])
+        return np.sort(self.guess_order[answer_id, start:end])
+
+    def consistent_answer_ids(self, patterns: Sequence[Pattern]) -> np.ndarray:
+        """
+        Args:
+            patterns (Sequence[Pattern]): The pattern of each row, first
+            guess first
+
+        Returns:
+            np.ndarray: Column ids of the answers the rows could have been
+            played against, in increasing order. Each row needs a different
+            guess, so a pattern which appears on several rows needs that many
+            guesses giving it.
+        """
+        mask = np.ones(len(self.table.answers), dtype=bool)
+        for code, rows in Counter(
+            self._code(pattern) for pattern in patterns
+        ).items():
+            mask &= self.counts[:, code] >= rows
+        return np.flatnonzero(mask)
+
+    def solve(self, patterns: Sequence[Pattern]) -> ReverseResult:
+        """Works out which answers a grid could have been played against,
+        and how many guesses could have made each row.
+
+        Args:
+            patterns (Sequence[Pattern]): The pattern of each row, first
+            guess first
+
+        Returns:
+            ReverseResult: The consistent answers, in word list order, with
+            the number of guesses consistent with each row
+        """
+        codes = [self._code(pattern) for pattern in patterns]
+        answer_ids = self.consistent_answer_ids(codes)
+
+        row_guess_counts = []
+        for code in codes:
+            if self.guess_order is None or len(answer_ids) == 0:
+                columns = self.table.block(
+                    np.arange(len(self.table.guesses)), answer_ids
+                )
+                row_guess_counts.append(
+                    int((columns == code).any(axis=1).sum())
+                )
+                continue
+            # Gather every answer's run of guesses with this pattern at once
+            starts = self.starts[answer_ids, code]
+            lengths = self.counts[answer_ids, code].astype(np.int64)
+            rows = np.repeat(answer_ids, lengths)
+            columns = np.arange(lengths.sum()) + np.repeat(
+                starts - (np.cumsum(lengths) - lengths), lengths
+            )
+            seen = np.zeros(len(self.table.guesses), dtype=bool)
+            seen[self.guess_order[rows, columns]] = True
+            row_guess_counts.append(int(seen.sum()))
+
+        return ReverseResult(
+            [self.table.answers[i] for i in answer_ids],
+            row_guess_counts,
+            self.counts[answer_ids][:, codes]
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Find the answers a grid of colour patterns could have "
+        "been played against"
+    )
+    parser.add_argument(
+        "patterns", nargs='*',
+        help="The pattern of each row, e.g. BYBGB GGBBY GGGGG. Without "
+        "any, a shared grid is read from stdin."
+    )
+    parser.add_argument(
+        "--answer",
+        help="Also list the guesses which could have made each row for "
+        "this answer"
+    )
+    parser.add_argument(
+        "--limit", type=int, default=20, help="The most answers to list"
+    )
+    args = parser.parse_args()
+
+    if args.patterns:
+        patterns = args.patterns
+    else:
+        from wordle_analytics import parse_grid
+        patterns = parse_grid(sys.stdin.read()).feedback
+
+    start = time.perf_counter()
+    index = ReverseIndex.build(get_default_table())
+    built = time.perf_counter()
+    try:
+        result = index.solve(patterns)
+    except ValueError as error:
+        parser.error(str(error))
+    solved = time.perf_counter()
+
+    print(
+        f"{len(result.answers)} answers (index built in "
+        f"{built - start:.2f}s, query took {(solved - built) * 1000:.1f}ms)"
+    )
+    shown = result.answers[:args.limit]
+    if shown:
+        print(' '.join(shown) + (
+            f" ... and {len(result.answers) - len(shown)} more"
+            if len(result.answers) > len(shown) else ""
+        ))
+    for row, (pattern, count) in enumerate(
+        zip(patterns, result.row_guess_counts), 1
+    ):
+        feedback = Feedback(index._code(pattern), index.table.word_length)
+        print(f"Row {row} {feedback}: {count} guesses")
+
+    if args.answer:
+        answer = args.answer.upper()
+        if answer not in result.answers:
+            print(f"{answer} could not have produced this grid")
+        else:
+            answer_id = index.table.answer_ids[answer]
+            for row, pattern in enumerate(patterns, 1):
+                guesses = [
+                    index.table.guesses[i]
+                    for i in index.guesses_for(answer_id, pattern)
+                ]
+                print(f"Row {row} for {answer}: {' '.join(guesses[:20])}" + (
+                    f" ... and {len(guesses) - 20} more"
+                    if len(guesses) > 20 else ""
+                ))
@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, Optional, Tuple, Union
+
+import wordle_stats
+from wordle_batch import parse_guess, solve_record
+from wordle_constraints import compile_constraints
+from wordle_feedback import FeedbackTable, get_default_table
+from wordle_solver import cache_stats
+
+_MAX_BODY_BYTES = 1 << 20
+_MAX_RANK = 100
+
+# Paths requests are counted under. Anything else counts as "other", so
+# that clients cannot grow the counters by asking for arbitrary paths.
+_ENDPOINTS = ("/solve", "/health", "/metrics")
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class SolveService:
+    """Solves game states against one warm copy of the word lists and
+    feedback table, shared by every client. Work runs on a thread pool so
+    that the event loop stays free, and identical requests which arrive
+    while one is already being computed wait for that computation rather
+    than starting their own.
+    """
+
+    def __init__(
+        self,
+        table: Optional[FeedbackTable] = None,
+        workers: Optional[int] = None
+    ) -> None:
+        self.table = table or get_default_table()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.started = time.time()
+
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+        self.requests: Dict[str, int] = {}
+        self.errors = 0
+        self.computed = 0
+        self.coalesced = 0
+        self.solve_seconds = 0.0
+
+    async def _coalesce(self, key: Hashable, fn, *args) -> Any:
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.computed += 1
+            future = asyncio.get_running_loop().run_in_executor(
+                self.executor, fn, *args
+            )
+            self._in_flight[key] = future
+            future.add_done_callback(
+                lambda _: self._in_flight.pop(key, None)
+            )
+        # Shielded so that one client disconnecting does not cancel the
+        # computation for the others
+        return await asyncio.shield(future)
+
+    async def solve(self, payload: Any) -> Dict[str, Any]:
+        """
+        Args:
+            payload (Any): A game state as accepted by wordle_batch, with an
+            optional "rank" giving the number of ranked guesses to return
+
+        Returns:
+            Dict[str, Any]: The candidates and ranked guesses
+        """
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Expected a JSON object")
+        rank = payload.get("rank", 10)
+        if not isinstance(rank, int) or not 0 <= rank <= _MAX_RANK:
+            raise HTTPError(
+                400, f"rank must be an integer from 0 to {_MAX_RANK}"
+            )
+
+        try:
+            guesses = [
+                parse_guess(entry) for entry in payload.get("guesses", [])
+            ]
+            constraints = compile_constraints(
+                guesses, self.table.word_length
+            )
+        except (KeyError, TypeError, ValueError) as error:
+            raise HTTPError(400, f"Invalid guesses: {error}")
+
+        start = time.perf_counter()
+        key = (constraints.key(), rank)
+        result = await self._coalesce(
+            key,
+            solve_record,
+            {"guesses": payload.get("guesses", [])},
+            self.table,
+            rank
+        )
+        self.solve_seconds += time.perf_counter() - start
+
+        result = dict(result)
+        result["id"] = payload.get("id")
+        return result
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "answers": len(self.table.answers),
+            "guesses": len(self.table.guesses),
+            "uptime_seconds": time.time() - self.started
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "requests": dict(self.requests),
+            "errors": self.errors,
+            "computed": self.computed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "solve_seconds": self.solve_seconds,
+            "caches": cache_stats(),
+            "stats": wordle_stats.snapshot()
+        }
+
+    def prometheus_metrics(self) -> str:
+        """
+        Returns:
+            str: The service counters plus the solver statistics, in the
+            Prometheus text format
+        """
+        lines = [
+            "# TYPE wordle_server_requests_total counter",
+            *(
+                f'wordle_server_requests_total{{path="{path}"}} {count}'
+                for path, count in sorted(self.requests.items())
+            ),
+            "# TYPE wordle_server_errors_total counter",
+            f"wordle_server_errors_total {self.errors}",
+            "# TYPE wordle_server_computed_total counter",
+            f"wordle_server_computed_total {self.computed}",
+            "# TYPE wordle_server_coalesced_total counter",
+            f"wordle_server_coalesced_total {self.coalesced}",
+            "# TYPE wordle_server_in_flight gauge",
+            f"wordle_server_in_flight {len(self._in_flight)}",
+            "# TYPE wordle_server_solve_seconds_total counter",
+            f"wordle_server_solve_seconds_total {self.solve_seconds}",
+        ]
+        return '\n'.join(lines) + '\n' + wordle_stats.to_prometheus()
+
+    async def route(
+        self, method: str, path: str, body: bytes
+    ) -> Tuple[int, Union[Dict[str, Any], str]]:
+        path, _, query = path.partition('?')
+        counted = path if path in _ENDPOINTS else "other"
+        self.requests[counted] = self.requests.get(counted, 0) + 1
+
+        if path == "/solve":
+            if method != "POST":
+                raise HTTPError(405, "Use POST")
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError as error:
+                raise HTTPError(400, f"Invalid JSON: {error}")
+            return 200, await self.solve(payload)
+        if path == "/health":
+            return 200, self.health()
+        if path == "/metrics":
+            if "format=prometheus" in query.split('&'):
+                return 200, self.prometheus_metrics()
+            return 200, self.metrics()
+        raise HTTPError(404, f"No such endpoint {path}")
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serves HTTP/1.1 requests on one connection until the client
+        closes it or asks for it to be closed.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, version = \
+                        request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version == "HTTP/1.1"
+                )
+
+                try:
+                    length = int(headers.get("content-length", 0))
+                    if length > _MAX_BODY_BYTES:
+                        raise HTTPError(413, "Request body is too large")
+                    body = await reader.readexactly(length) if length else b""
+                    status, response = await self.route(method, path, body)
+                except HTTPError as error:
+                    self.errors += 1
+                    status, response = error.status, {"error": str(error)}
+                    keep_alive = keep_alive and error.status != 413
+                except ValueError as error:
+                    self.errors += 1
+                    status, response = 400, {"error": str(error)}
+                except Exception as error:
+                    self.errors += 1
+                    status, response = 500, {"error": repr(error)}
+
+                if isinstance(response, str):
+                    content = response.encode()
+                    content_type = "text/plain; version=0.0.4"
+                else:
+                    content = json.dumps(response).encode()
+                    content_type = "application/json"
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}"
+                    "\r\n\r\n".encode("latin-1") + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(
+    host: str = "127.0.0.1", port: int = 8080, workers: Optional[int] = None
+) -> None:
+    service = SolveService(workers=workers)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving on http://{host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve Wordle solves over HTTP/JSON"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "-j", "--workers", type=int, default=None,
+        help="Threads to solve on"
+    )
+    parser.add_argument(
+        "--instrument", action="store_true",
+        help="Record stage timings and counters for /metrics"
+    )
+    args = parser.parse_args()
+    wordle_stats.enable(args.instrument)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
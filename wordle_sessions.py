@@ -0,0 +1,453 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from wordle_feedback import FeedbackTable, get_default_table
+from wordle_patterns import Feedback
+from wordle_solver import Wordle, WordleSolver
+
+_SNAPSHOT_VERSION = 1
+
+
+def _entry_overhead(entries: int = 1000) -> int:
+    """
+    Returns:
+        int: The bytes an OrderedDict entry costs beyond its key and value,
+        that is its share of the hash table and the node of its linked
+        list, as this interpreter reports them
+    """
+    filled = OrderedDict((i, None) for i in range(entries))
+    return (sys.getsizeof(filled) - sys.getsizeof(OrderedDict())) // entries
+
+
+_ENTRY_OVERHEAD = _entry_overhead()
+
+Pattern = Union[Feedback, int, str]
+
+
+def _allocated(value: Any) -> int:
+    # The allocator hands out memory in 16-byte steps
+    return (sys.getsizeof(value) + 15) & ~15
+
+
+class _Session:
+    """One game's state. Candidates are either a little-endian bitset over
+    answer ids (the layout wordle_constraints uses for its int bitsets) or,
+    when fewer bytes, the sorted ids themselves. Guesses are packed one
+    integer per turn as guess id * num_patterns + pattern.
+    """
+
+    __slots__ = ("candidates", "guesses", "last_used")
+
+    def __init__(self, candidates: bytes, guesses: bytes, last_used: float):
+        self.candidates = candidates
+        self.guesses = guesses
+        self.last_used = last_used
+
+
+class SessionStore:
+    """Holds many concurrent games in a few hundred bytes each. The word
+    lists and feedback table are shared by every session; a session only
+    keeps its guesses and a compact candidate set, which each guess narrows
+    with one read of the guess's feedback table row. Sessions idle for
+    longer than ttl seconds expire, and the least recently used are evicted
+    once the store passes max_sessions or max_bytes. Any limit may be None
+    to disable it.
+    """
+
+    def __init__(
+        self,
+        table: Optional[FeedbackTable] = None,
+        max_bytes: Optional[int] = None,
+        max_sessions: Optional[int] = None,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.table = table or get_default_table()
+        self.max_bytes = max_bytes
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.clock = clock
+
+        num_answers = len(self.table.answers)
+        self._bitset_bytes = (num_answers + 7) // 8
+        self._id_dtype = np.uint16 if num_answers <= 1 << 16 else np.uint32
+        self._turn_dtype = np.uint32 \
+            if len(self.table.guesses) * self.table.num_patterns < 1 << 32 \
+            else np.uint64
+
+        # The state every new game starts from, shared by all of them
+        self._all_ids = np.arange(num_answers)
+        self._all_ids.setflags(write=False)
+        self._all_candidates = np.packbits(
+            np.ones(num_answers, dtype=bool), bitorder="little"
+        ).tobytes()
+
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.evictions = 0
+        self.expirations = 0
+
+    def _encode(self, ids: np.ndarray) -> bytes:
+        if len(ids) == len(self._all_ids):
+            return self._all_candidates
+        sparse = ids.astype(self._id_dtype).tobytes()
+        if len(sparse) < self._bitset_bytes:
+            return sparse
+        bitmap = np.zeros(len(self._all_ids), dtype=bool)
+        bitmap[ids] = True
+        return np.packbits(bitmap, bitorder="little").tobytes()
+
+    def _decode(self, candidates: bytes) -> np.ndarray:
+        if candidates is self._all_candidates:
+            return self._all_ids
+        if len(candidates) == self._bitset_bytes:
+            return np.flatnonzero(np.unpackbits(
+                np.frombuffer(candidates, np.uint8),
+                count=len(self._all_ids), bitorder="little"
+            ))
+        return np.frombuffer(candidates, self._id_dtype).astype(np.intp)
+
+    def _size(self, session_id: str, session: _Session) -> int:
+        """
+        Returns:
+            int: The memory a session costs the store: its entry, id, state
+            and anything not shared with other sessions. It depends only on
+            the session, so it is recomputed rather than stored.
+        """
+        size = _allocated(session_id) + _allocated(session) \
+            + _allocated(session.last_used) + _ENTRY_OVERHEAD
+        if session.candidates is not self._all_candidates:
+            size += _allocated(session.candidates)
+        if session.guesses:
+            size += _allocated(session.guesses)
+        return size
+
+    def _store(self, session_id: str, session: _Session) -> None:
+        """Adds or replaces a session as the most recently used, then
+        evicts as needed. Called with the lock held.
+        """
+        previous = self._sessions.get(session_id)
+        if previous is not None:
+            self._bytes -= self._size(session_id, previous)
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        self._bytes += self._size(session_id, session)
+
+        while len(self._sessions) > 1 and (
+            (self.max_sessions is not None
+             and len(self._sessions) > self.max_sessions)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            self._remove(next(iter(self._sessions)))
+            self.evictions += 1
+
+    def _remove(self, session_id: str) -> None:
+        self._bytes -= self._size(session_id, self._sessions.pop(session_id))
+
+    def _expire(self) -> None:
+        """Drops sessions idle for longer than the ttl. Sessions are kept in
+        order of use, so only the expired ones are visited. Called with the
+        lock held.
+        """
+        if self.ttl is None:
+            return
+        deadline = self.clock() - self.ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_used >= deadline:
+                break
+            self._remove(session_id)
+            self.expirations += 1
+
+    def _get(self, session_id: str) -> _Session:
+        """Called with the lock held.
+
+        Raises:
+            KeyError: If there is no such session, or it has been evicted
+        """
+        self._expire()
+        session = self._sessions[session_id]
+        session.last_used = self.clock()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def create(self, session_id: Optional[str] = None) -> str:
+        """Starts a new game, replacing any session with the same id.
+
+        Args:
+            session_id (Optional[str]): The id to store the game under.
+            Defaults to a new random id.
+
+        Returns:
+            str: The session's id
+        """
+        session_id = session_id or uuid.uuid4().hex
+        with self._lock:
+            self._expire()
+            self._store(
+                session_id, _Session(self._all_candidates, b'', self.clock())
+            )
+        return session_id
+
+    def _code(self, pattern: Pattern) -> int:
+        if isinstance(pattern, str):
+            pattern = Feedback.parse(pattern, self.table.word_length)
+        code = int(pattern)
+        if not 0 <= code < self.table.num_patterns:
+            raise ValueError(f"{pattern!r} is not a pattern for this table")
+        return code
+
+    def _guess_id(self, word: str) -> int:
+        guess_id = self.table.guess_ids.get(word.upper())
+        if guess_id is None:
+            raise ValueError(f"{word!r} is not an allowed guess")
+        return guess_id
+
+    def _narrow(
+        self, candidates: bytes, guess_id: int, code: int
+    ) -> np.ndarray:
+        ids = self._decode(candidates)
+        return ids[self.table.patterns[guess_id][ids] == code]
+
+    def add_guess(
+        self, session_id: str, word: str, feedback: Pattern
+    ) -> int:
+        """Narrows a game's candidates with one more guess.
+
+        Args:
+            session_id (str): The game's id
+            word (str): The guessed word, from the guess list
+            feedback (Pattern): The tiles shown, e.g. "BYBGB" or a Feedback
+
+        Returns:
+            int: The number of candidate answers left
+        """
+        guess_id = self._guess_id(word)
+        code = self._code(feedback)
+        turn = np.array(
+            [guess_id * self.table.num_patterns + code], self._turn_dtype
+        )
+        with self._lock:
+            session = self._get(session_id)
+            ids = self._narrow(session.candidates, guess_id, code)
+            self._store(session_id, _Session(
+                self._encode(ids), session.guesses + turn.tobytes(),
+                session.last_used
+            ))
+        return len(ids)
+
+    def _turns(self, session: _Session) -> List[Tuple[int, int]]:
+        return [
+            divmod(int(turn), self.table.num_patterns)
+            for turn in np.frombuffer(session.guesses, self._turn_dtype)
+        ]
+
+    def undo(self, session_id: str) -> str:
+        """Removes a game's most recent guess. Earlier candidate sets are not
+        kept, so the remaining guesses are replayed.
+
+        Returns:
+            str: The guess which was removed
+        """
+        with self._lock:
+            session = self._get(session_id)
+            turns = self._turns(session)
+            if not turns:
+                raise IndexError("There are no guesses to undo")
+            candidates = self._all_candidates
+            for guess_id, code in turns[:-1]:
+                candidates = self._encode(
+                    self._narrow(candidates, guess_id, code)
+                )
+            self._store(session_id, _Session(
+                candidates,
+                session.guesses[:-np.dtype(self._turn_dtype).itemsize],
+                session.last_used
+            ))
+        return self.table.guesses[turns[-1][0]]
+
+    def remove(self, session_id: str) -> None:
+        with self._lock:
+            self._remove(session_id)
+
+    def candidate_ids(self, session_id: str) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The feedback table column ids of the game's possible
+            solutions, in increasing order
+        """
+        with self._lock:
+            return self._decode(self._get(session_id).candidates)
+
+    def candidates(self, session_id: str) -> List[str]:
+        """
+        Returns:
+            List[str]: The game's possible solutions
+        """
+        answers = self.table.answers
+        return [answers[i] for i in self.candidate_ids(session_id)]
+
+    def guesses(self, session_id: str) -> List[Wordle.Guess]:
+        """
+        Returns:
+            List[Wordle.Guess]: The game's guesses so far
+        """
+        with self._lock:
+            turns = self._turns(self._get(session_id))
+        return [
+            Wordle.Guess(
+                self.table.guesses[guess_id],
+                Feedback(code, self.table.word_length)
+            )
+            for guess_id, code in turns
+        ]
+
+    def solver(self, session_id: str) -> WordleSolver:
+        """
+        Returns:
+            WordleSolver: A solver over the game's guesses, for ranking.
+            It is not kept, so it costs nothing once dropped.
+        """
+        return WordleSolver(Wordle(self.guesses(session_id)), self.table)
+
+    def expire(self) -> int:
+        """Drops every session idle for longer than the ttl.
+
+        Returns:
+            int: The number of sessions dropped
+        """
+        with self._lock:
+            before = self.expirations
+            self._expire()
+            return self.expirations - before
+
+    def __contains__(self, session_id: object) -> bool:
+        """Checks for a live session without counting as a use of it."""
+        with self._lock:
+            self._expire()
+            return session_id in self._sessions
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: The number of sessions, their estimated size in
+            bytes, and the evictions and expirations so far
+        """
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "bytes_per_session": self._bytes / len(self._sessions)
+                if self._sessions else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+    def snapshot(self, path: str) -> None:
+        """Writes every session's guesses and idle time to a JSON file.
+        Candidates are not written; they are replayed on restore.
+        """
+        with self._lock:
+            self._expire()
+            now = self.clock()
+            sessions = {
+                session_id: {
+                    "guesses": [
+                        [self.table.guesses[guess_id],
+                         str(Feedback(code, self.table.word_length))]
+                        for guess_id, code in self._turns(session)
+                    ],
+                    "idle": now - session.last_used
+                }
+                for session_id, session in self._sessions.items()
+            }
+
+        # Write to a temporary file first so that a crash never leaves a
+        # partially written snapshot. Its name is unique, so snapshots taken
+        # at the same time by other threads or processes cannot mix.
+        fd, temp_path = tempfile.mkstemp(
+            prefix=f"{os.path.basename(path)}.", suffix=".tmp",
+            dir=os.path.dirname(path) or None
+        )
+        try:
+            with os.fdopen(fd, 'w') as snapshot_file:
+                json.dump({
+                    "version": _SNAPSHOT_VERSION,
+                    "word_lists": self.table.digest,
+                    "sessions": sessions
+                }, snapshot_file)
+            os.replace(temp_path, path)
+        except OSError:
+            os.remove(temp_path)
+            raise
+
+    def restore(self, path: str) -> int:
+        """Loads the sessions in a snapshot, replacing any with the same ids.
+        Restored sessions keep their idle times and take their place among
+        the live ones by last use, so expiry and the limits treat them the
+        same as sessions which were never snapshotted.
+
+        Args:
+            path (str): A file written by snapshot, over the same word lists
+
+        Returns:
+            int: The number of sessions restored
+        """
+        with open(path) as snapshot_file:
+            snapshot = json.load(snapshot_file)
+        if snapshot.get("version") != _SNAPSHOT_VERSION:
+            raise ValueError(f"{path} has an unsupported version")
+        if snapshot.get("word_lists") != self.table.digest:
+            raise ValueError(f"{path} was taken over different word lists")
+
+        now = self.clock()
+        restored = {}
+        for session_id, record in snapshot["sessions"].items():
+            candidates = self._all_candidates
+            turns = []
+            for word, tiles in record["guesses"]:
+                guess_id = self._guess_id(word)
+                code = self._code(tiles)
+                candidates = self._encode(
+                    self._narrow(candidates, guess_id, code)
+                )
+                turns.append(guess_id * self.table.num_patterns + code)
+            restored[session_id] = _Session(
+                candidates,
+                np.array(turns, self._turn_dtype).tobytes(),
+                now - record["idle"]
+            )
+
+        with self._lock:
+            # Expiry and eviction walk the store from its front, so the
+            # restored sessions are merged with the live ones in order of
+            # last use rather than appended after them
+            live = [
+                item for item in self._sessions.items()
+                if item[0] not in restored
+            ]
+            self._sessions.clear()
+            self._bytes = 0
+            for session_id, session in sorted(
+                live + list(restored.items()),
+                key=lambda item: item[1].last_used
+            ):
+                self._store(session_id, session)
+            self._expire()
+        return len(restored)
@@ -0,0 +1,246 @@
+import argparse
+import importlib
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
+
+from wordle_feedback import Feedback, FeedbackTable, get_default_table
+from wordle_parallel import bounded_map
+from wordle_solver import Wordle, WordleSolver
+
+# A strategy picks the next guess for a game in progress
+Strategy = Callable[[WordleSolver], str]
+
+# Games count as failures when they take more guesses than this
+MAX_GUESSES = 6
+
+# Games are abandoned after this many guesses so that a broken strategy
+# cannot loop forever
+_GUESS_LIMIT = 20
+
+_ANSWERS_PER_TASK = 16
+
+
+def entropy_strategy(solver: WordleSolver) -> str:
+    """Guesses the word with the most expected information. Every game
+    shares the same opening, so most early turns come from the opening book
+    or the solver's ranking cache.
+    """
+    return solver.best_guess(workers=1)
+
+
+def first_candidate_strategy(solver: WordleSolver) -> str:
+    """Guesses the first answer which is still possible."""
+    return solver.get_valid_answers()[0]
+
+
+STRATEGIES: Dict[str, Strategy] = {
+    "entropy": entropy_strategy,
+    "first-candidate": first_candidate_strategy,
+}
+
+
+def load_strategy(spec: str) -> Strategy:
+    """
+    Args:
+        spec (str): The name of a built-in strategy, or "module:function"
+        for a strategy defined elsewhere
+
+    Returns:
+        Strategy: The strategy function
+    """
+    if spec in STRATEGIES:
+        return STRATEGIES[spec]
+    if ':' not in spec:
+        raise ValueError(
+            f"Unknown strategy {spec!r}. Choose one of "
+            f"{', '.join(STRATEGIES)} or give module:function."
+        )
+    module_name, function_name = spec.split(':', 1)
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def play_game(
+    answer: str, strategy: Strategy, table: FeedbackTable
+) -> dict:
+    """Plays one game to completion, scoring each guess against the answer.
+
+    Args:
+        answer (str): The answer to play against
+        strategy (Strategy): Picks each guess
+        table (FeedbackTable): The feedback table to solve and score with
+
+    Returns:
+        dict: The answer, the guesses made, whether the game was solved
+        within MAX_GUESSES, and how long it took in seconds
+    """
+    start = time.perf_counter()
+    solver = WordleSolver(Wordle([]), table)
+
+    guesses = []
+    solved = False
+    while len(guesses) < _GUESS_LIMIT:
+        guess = strategy(solver)
+        guesses.append(guess)
+        pattern = table.pattern(guess, answer)
+        if pattern == table.all_correct:
+            solved = True
+            break
+        solver.add_guess(
+            Wordle.Guess(guess, Feedback(pattern, table.word_length))
+        )
+
+    return {
+        "answer": answer,
+        "guesses": guesses,
+        "num_guesses": len(guesses),
+        "solved": solved and len(guesses) <= MAX_GUESSES,
+        "seconds": time.perf_counter() - start
+    }
+
+
+_worker_table: Optional[FeedbackTable] = None
+
+
+def _init_worker() -> None:
+    global _worker_table
+    _worker_table = get_default_table()
+
+
+def _play_games(answers: List[str], strategy_spec: str) -> List[dict]:
+    strategy = load_strategy(strategy_spec)
+    return [play_game(answer, strategy, _worker_table) for answer in answers]
+
+
+def _read_results(path: str) -> Iterator[dict]:
+    if not os.path.exists(path):
+        return
+    with open(path) as results_file:
+        for line in results_file:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A run interrupted mid-write leaves a partial last line
+                continue
+
+
+def simulate(
+    strategy_spec: str,
+    results_path: str,
+    answers: Optional[List[str]] = None,
+    workers: Optional[int] = None
+) -> int:
+    """Plays every answer which does not already have a result in the
+    results file, appending each game's result as a JSON line. Rerunning with
+    the same file resumes an interrupted run.
+
+    Args:
+        strategy_spec (str): The strategy to play with (see load_strategy)
+        results_path (str): The JSONL file to append results to
+        answers (Optional[List[str]]): The answers to play. Defaults to every
+        answer in the word list.
+        workers (Optional[int]): Number of worker processes. Defaults to the
+        number of CPUs.
+
+    Returns:
+        int: The number of games played by this call
+    """
+    load_strategy(strategy_spec)
+    table = get_default_table()
+    answers = table.answers if answers is None else answers
+    workers = workers or os.cpu_count() or 1
+
+    finished = {result["answer"] for result in _read_results(results_path)}
+    remaining = [answer for answer in answers if answer not in finished]
+    tasks = (
+        remaining[i:i + _ANSWERS_PER_TASK]
+        for i in range(0, len(remaining), _ANSWERS_PER_TASK)
+    )
+
+    played = 0
+    with open(results_path, 'a+') as results_file, ProcessPoolExecutor(
+        workers, initializer=_init_worker
+    ) as executor:
+        # Start on a fresh line if an interrupted run left a partial one
+        if results_file.tell() > 0:
+            results_file.seek(results_file.tell() - 1)
+            if results_file.read(1) != '\n':
+                results_file.write('\n')
+
+        for results in bounded_map(
+            _play_games, tasks, executor, 2 * workers,
+            ordered=False, args=(strategy_spec,)
+        ):
+            for result in results:
+                results_file.write(json.dumps(result) + '\n')
+            results_file.flush()
+            played += len(results)
+
+    return played
+
+
+def summarize(results_path: str) -> dict:
+    """
+    Args:
+        results_path (str): A results file written by simulate
+
+    Returns:
+        dict: The number of games, the distribution of guesses per game, the
+        failure count, the mean number of guesses and the wall time per game
+    """
+    distribution = Counter()
+    seconds = []
+    failures = 0
+    for result in _read_results(results_path):
+        distribution[result["num_guesses"]] += 1
+        seconds.append(result["seconds"])
+        if not result["solved"]:
+            failures += 1
+
+    games = sum(distribution.values())
+    return {
+        "games": games,
+        "distribution": dict(sorted(distribution.items())),
+        "failures": failures,
+        "mean_guesses": (
+            sum(n * count for n, count in distribution.items()) / games
+            if games else None
+        ),
+        "mean_seconds": statistics.mean(seconds) if seconds else None,
+        "max_seconds": max(seconds, default=None)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Play every Wordle answer with a strategy and report "
+        "how it did"
+    )
+    parser.add_argument(
+        "results", help="JSONL file to append results to (resumed if present)"
+    )
+    parser.add_argument(
+        "-s", "--strategy", default="entropy",
+        help=f"One of {', '.join(STRATEGIES)}, or module:function"
+    )
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    played = simulate(args.strategy, args.results, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(args.results)
+    summary["played_this_run"] = played
+    summary["run_seconds"] = elapsed
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,54 @@
-from typing import List
-from wordle_answers import ALL_WORDLE_ANSWERS
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+import wordle_stats
+from wordle_cache import LRUCache
+from wordle_constraints import Constraints, compile_constraints, get_index
+from wordle_feedback import FeedbackTable, bitset_array, get_default_table
+from wordle_patterns import Feedback
+from wordle_ranking import (
+    AnytimeRanking, anytime_rank, entropies, frequency_scores, letter_counts,
+    rank_guesses
+)
+
+# Results shared by every solver, keyed on the word lists and the canonical
+# compiled constraints. The same state reached through different or
+# redundant guesses is only computed once.
+ANSWERS_CACHE = LRUCache(max_entries=8192)
+RANKING_CACHE = LRUCache(max_entries=1024)
+wordle_stats.register_cache("answers", ANSWERS_CACHE)
+wordle_stats.register_cache("ranking", RANKING_CACHE)
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Returns:
+        Dict[str, Dict[str, Any]]: Hit, miss and eviction counts for the
+        shared answer and ranking caches
+    """
+    return {
+        "answers": ANSWERS_CACHE.stats(),
+        "ranking": RANKING_CACHE.stats()
+    }
+
+
+def __getattr__(name: str):
+    # The answer list used to be imported here. Keep it importable without
+    # paying for it on every import of this module.
+    if name == "ALL_WORDLE_ANSWERS":
+        from wordle_answers import ALL_WORDLE_ANSWERS
+        return ALL_WORDLE_ANSWERS
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class Wordle:
     class Guess:
         """A class to represent an incorrect guess in a Wordle game. A guess
-        object contains the word which was guessed along with a list of five
-        bools. These bools indicate whether the corresponding letter in the word
-        is
+        object contains the word which was guessed along with its feedback.
+        The feedback can be given as a Feedback, a tile string such as
+        "GYB..", or a list with one bool per letter. These bools indicate
+        whether the corresponding letter in the word is
             a. in the solution and in the correct place (True)
             b. in the solution, but in the wrong place (False)
             a. not in the solution at all (None)
@@ -15,11 +56,26 @@ class Wordle:
         _LETTER_NOT_IN_WORD = None
         _LETTER_CORRECT = True
         _LETTER_WRONG_PLACE = False
-        
-        def __init__(self, word: str, hints: List[bool]) -> None:
+
+        __slots__ = ("word", "feedback")
+
+        def __init__(
+            self, word: str, hints: Union[Feedback, str, List[bool]]
+        ) -> None:
             self.word = word
             self.hints = hints
 
+        @property
+        def hints(self) -> List[Optional[bool]]:
+            return self.feedback.hints
+
+        @hints.setter
+        def hints(self, hints: Union[Feedback, str, List[bool]]) -> None:
+            if isinstance(hints, str):
+                self.feedback = Feedback.parse(hints, len(self.word))
+            else:
+                self.feedback = Feedback.from_hints(hints)
+
     def __init__(self, guesses_made) -> None:
         self.guesses_made: List[Wordle.Guess] = guesses_made
         
@@ -28,10 +84,42 @@ class Wordle:
 
 
 class WordleSolver:
-    _LEN_GUESS = 5
-
-    def __init__(self, wordle: Wordle) -> None:
+    def __init__(
+        self,
+        wordle: Wordle,
+        feedback_table: Optional[FeedbackTable] = None,
+        opening_book=None
+    ) -> None:
         self.wordle = wordle
+        self.feedback_table = feedback_table or get_default_table()
+
+        # Any word length works; it is set by the table's word lists
+        self.word_length = self.feedback_table.word_length
+
+        # An OpeningBook to consult before ranking early guesses. Defaults
+        # to the generated book for these word lists, if there is one.
+        self.opening_book = opening_book
+        self.answer_index = get_index(self.feedback_table.answers)
+        self.guess_index = get_index(self.feedback_table.guesses)
+
+        # Candidate answers after each turn, as bitsets of answer ids, along
+        # with the constraints known at that point. Entry i holds the state
+        # after the first i guesses, so the stacks always have one more entry
+        # than there are applied guesses.
+        self._applied_guesses: List[Wordle.Guess] = []
+        # The feedback each guess had when applied, so that a guess whose
+        # hints have since been changed is applied again
+        self._applied_feedback: List[Feedback] = []
+        self._candidates: List[int] = [self.answer_index.all_bits]
+        self._constraints: List[Constraints] = [Constraints(self.word_length)]
+
+        # Hard-mode guess pools per turn, as bitsets of guess ids. Only built
+        # as far as hard-mode ranking has needed them.
+        self._hard_mode_pools: List[int] = [self.guess_index.all_bits]
+
+        # Positional letter counts over the candidates per turn, for the
+        # frequency heuristic. Also only built as far as needed.
+        self._letter_counts: List[np.ndarray] = []
 
     def _check_solution(self, solution: str) -> bool:
         """
@@ -43,43 +131,180 @@ class WordleSolver:
             this Wordle
         """
 
-        # Check that the solution utilizes all the hints from previous guesses
-        for guess in self.wordle.get_guesses_made():
-            # Check letter by letter
-            for i in range(self._LEN_GUESS):
-                if guess.hints[i] == guess._LETTER_CORRECT:
-                    # Verify that the solution uses the correct letter here
-                    if solution[i] != guess.word[i]:
-                        return False
-
-                elif guess.hints[i] == guess._LETTER_WRONG_PLACE:
-                    # region Verify that the solution does use this letter
-                    # Find indices at which the solution uses this letter
-                    letter_matched_indices = [
-                        index for (index, letter) in enumerate(solution)
-                        if letter == guess.word[i]
-                    ]
-                    
-                    # Remove indices of already-correct letters
-                    for index in letter_matched_indices:
-                        if guess.hints[index] == guess._LETTER_CORRECT:
-                            letter_matched_indices.remove(index)
-
-                    # Verify that 
-                    if not len(letter_matched_indices) > 0:
-                        return False
-                    # endregion
-
-                    # Verify that the solution only uses this letter elsewhere
-                    if solution[i] == guess.word[i]:
-                        return False
-
-                elif guess.hints[i] == guess._LETTER_NOT_IN_WORD:
-                    # Verify that the solution does not contain this letter
-                    if guess.word[i] in solution:
-                        return False
-
-        return True
+        self._sync()
+        wordle_stats.count("solutions_checked")
+        return self._constraints[-1].matches(solution)
+
+    def _narrow(self, guess: Wordle.Guess) -> None:
+        if len(guess.word) != self.word_length \
+                or len(guess.feedback) != self.word_length:
+            raise ValueError(
+                f"{guess.word!r} does not fit a game of "
+                f"{self.word_length}-letter words"
+            )
+        with wordle_stats.stage("narrow"):
+            constraints = self._constraints[-1].copy()
+            constraints.add_guess(guess.word, guess.feedback)
+
+            key = (self.feedback_table.digest, constraints.key())
+            candidates = ANSWERS_CACHE.get(key)
+            if candidates is None:
+                revealed = compile_constraints([guess], self.word_length)
+                candidates = \
+                    self._candidates[-1] & self.answer_index.filter(revealed)
+                ANSWERS_CACHE.put(key, candidates)
+
+                if wordle_stats.is_enabled():
+                    examined = bin(self._candidates[-1]).count('1')
+                    remaining = bin(candidates).count('1')
+                    wordle_stats.count("words_examined", examined)
+                    wordle_stats.count("words_pruned", examined - remaining)
+
+        self._candidates.append(candidates)
+        self._constraints.append(constraints)
+        self._applied_guesses.append(guess)
+        self._applied_feedback.append(guess.feedback)
+
+    def _sync(self) -> None:
+        """Brings the candidate stack in line with the Wordle's guesses,
+        keeping every turn up to the first guess which differs.
+        """
+        guesses = self.wordle.get_guesses_made()
+
+        common = 0
+        for applied, feedback, guess in zip(
+            self._applied_guesses, self._applied_feedback, guesses
+        ):
+            if applied is not guess or feedback is not guess.feedback:
+                break
+            common += 1
+
+        del self._applied_guesses[common:]
+        del self._applied_feedback[common:]
+        del self._candidates[common + 1:]
+        del self._constraints[common + 1:]
+        del self._hard_mode_pools[common + 1:]
+        del self._letter_counts[common + 1:]
+        for guess in guesses[common:]:
+            self._narrow(guess)
+
+    def add_guess(self, guess: Wordle.Guess) -> None:
+        """Adds a guess to the Wordle and narrows the current candidates with
+        it, without rescanning the answers ruled out on earlier turns.
+
+        Args:
+            guess (Wordle.Guess): The guess to add
+        """
+        self._sync()
+        self.wordle.guesses_made.append(guess)
+        self._narrow(guess)
+
+    def undo(self) -> Wordle.Guess:
+        """Removes the most recent guess.
+
+        Returns:
+            Wordle.Guess: The guess which was removed
+        """
+        self._sync()
+        if not self._applied_guesses:
+            raise IndexError("There are no guesses to undo")
+        guess = self.wordle.guesses_made.pop()
+        self._applied_guesses.pop()
+        self._applied_feedback.pop()
+        self._candidates.pop()
+        self._constraints.pop()
+        del self._hard_mode_pools[len(self._candidates):]
+        del self._letter_counts[len(self._candidates):]
+        return guess
+
+    def rollback(self, turn: int) -> None:
+        """Removes every guess after the given turn.
+
+        Args:
+            turn (int): The number of guesses to keep
+        """
+        self._sync()
+        if not 0 <= turn <= len(self._applied_guesses):
+            raise IndexError(f"There is no turn {turn} to roll back to")
+        del self.wordle.guesses_made[turn:]
+        del self._applied_guesses[turn:]
+        del self._applied_feedback[turn:]
+        del self._candidates[turn + 1:]
+        del self._constraints[turn + 1:]
+        del self._hard_mode_pools[turn + 1:]
+        del self._letter_counts[turn + 1:]
+
+    def get_constraints(self) -> Constraints:
+        """
+        Returns:
+            Constraints: Everything the guesses so far reveal about the answer
+        """
+        self._sync()
+        return self._constraints[-1]
+
+    def _candidate_ids(self) -> np.ndarray:
+        return bitset_array(
+            self._candidates[-1], len(self.feedback_table.answers)
+        )
+
+    def get_candidate_ids(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The feedback table column ids of the possible
+            solutions, in increasing order
+        """
+        self._sync()
+        return self._candidate_ids()
+
+    def _hard_mode_pool(self) -> int:
+        """
+        Returns:
+            int: A bitset of the guesses which are legal in hard mode after
+            the guesses so far, narrowed from the previous turn's pool
+        """
+        while len(self._hard_mode_pools) < len(self._candidates):
+            turn = len(self._hard_mode_pools)
+            guess = self._applied_guesses[turn - 1]
+            revealed = compile_constraints([guess], self.word_length)
+            self._hard_mode_pools.append(
+                self._hard_mode_pools[-1]
+                & self.guess_index.filter(revealed.hard_mode())
+            )
+        return self._hard_mode_pools[len(self._candidates) - 1]
+
+    def _candidate_letter_counts(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: Positional letter counts over the candidates, updated
+            from the previous turn's counts by subtracting the answers this
+            turn ruled out, when there are fewer of those than remain
+        """
+        table = self.feedback_table
+        size = len(table.answers)
+        if not self._letter_counts:
+            self._letter_counts.append(
+                letter_counts(table, bitset_array(self._candidates[0], size))
+            )
+        while len(self._letter_counts) < len(self._candidates):
+            turn = len(self._letter_counts)
+            before, after = self._candidates[turn - 1], self._candidates[turn]
+            removed = before & ~after
+            if bin(removed).count('1') < bin(after).count('1'):
+                counts = self._letter_counts[-1] - letter_counts(
+                    table, bitset_array(removed, size)
+                )
+            else:
+                counts = letter_counts(table, bitset_array(after, size))
+            self._letter_counts.append(counts)
+        return self._letter_counts[len(self._candidates) - 1]
+
+    def get_hard_mode_guesses(self) -> List[str]:
+        """
+        Returns:
+            List[str]: The allowed guesses which reuse every revealed hint
+        """
+        self._sync()
+        return self.guess_index.words_in(self._hard_mode_pool())
 
     def get_valid_answers(self) -> List[str]:
         """
@@ -87,9 +312,196 @@ class WordleSolver:
             List[str]: A list of all possible solutions to this Wordle which
             utilize all known hints
         """
-        valid_answers = []
-        for answer in ALL_WORDLE_ANSWERS:
-            if self._check_solution(answer):
-                valid_answers.append(answer)
+        self._sync()
+        return self.answer_index.words_in(self._candidates[-1])
+
+    def score_candidates(
+        self, max_entropy_candidates: int = 4096
+    ) -> List[Tuple[str, Optional[float], float]]:
+        """Scores each remaining candidate as a guess.
+
+        Args:
+            max_entropy_candidates (int): Expected information is only worked
+            out when there are at most this many candidates, since its cost
+            grows with the square of their number
+
+        Returns:
+            List[Tuple[str, Optional[float], float]]: Each candidate with the
+            information it is expected to reveal as a guess (or None), and
+            its positional letter frequency score
+        """
+        self._sync()
+        table = self.feedback_table
+        candidate_ids = self._candidate_ids()
+        words = [table.answers[i] for i in candidate_ids]
+
+        candidate_guess_ids = np.array(
+            [table.guess_ids.get(word, -1) for word in words], dtype=np.intp
+        )
+        in_guesses = candidate_guess_ids >= 0
+        frequencies = np.zeros(len(words))
+        information = np.full(len(words), np.nan)
+
+        if in_guesses.any():
+            guess_ids = candidate_guess_ids[in_guesses]
+            frequencies[in_guesses] = frequency_scores(
+                table,
+                guess_ids,
+                self._candidate_letter_counts() / len(candidate_ids)
+            )
+            if len(words) <= max_entropy_candidates:
+                information[in_guesses] = entropies(
+                    table, guess_ids, candidate_ids
+                )
+
+        return [
+            (
+                word,
+                None if np.isnan(information[i]) else float(information[i]),
+                float(frequencies[i])
+            )
+            for i, word in enumerate(words)
+        ]
+
+    def rank_guesses(
+        self,
+        top_k: int = 10,
+        workers: Optional[int] = None,
+        hard_mode: bool = False
+    ) -> List[Tuple[str, float]]:
+        """Scores every allowed guess by the information it is expected to
+        reveal about the remaining answers.
+
+        Args:
+            top_k (int): The number of guesses to return
+            workers (Optional[int]): Number of worker processes to use when
+            there are many guesses and candidates. Defaults to the number of
+            CPUs.
+            hard_mode (bool): Only consider guesses which reuse every
+            revealed hint. These are picked out before scoring, so hard mode
+            costs no more than normal mode.
+
+        Returns:
+            List[Tuple[str, float]]: The best top_k guesses with their
+            expected information in bits, best first
+        """
+        self._sync()
+        key, guess_ids = self._ranking_key(top_k, hard_mode)
+        ranking = RANKING_CACHE.get(key)
+        if ranking is None:
+            with wordle_stats.stage("rank"):
+                ranking = rank_guesses(
+                    self.feedback_table,
+                    self._candidate_ids(),
+                    top_k,
+                    guess_ids,
+                    workers
+                )
+            RANKING_CACHE.put(key, ranking)
+        return list(ranking)
+
+    def best_guess(
+        self, hard_mode: bool = False, workers: Optional[int] = None
+    ) -> Optional[str]:
+        """The single best next guess. Early in the game this comes straight
+        from the opening book when it covers the guesses so far.
+
+        Args:
+            hard_mode (bool): Only consider guesses which reuse every
+            revealed hint. The opening book is not used in hard mode.
+            workers (Optional[int]): Number of worker processes to rank
+            with, as in rank_guesses
+
+        Returns:
+            Optional[str]: The guess with the most expected information, or
+            None if no answer is possible
+        """
+        self._sync()
+        if not hard_mode:
+            # Imported here as wordle_book builds on this module
+            from wordle_book import get_default_book
+            book = self.opening_book or \
+                get_default_book(self.feedback_table)
+            if book is not None and self._candidates[-1]:
+                guess = book.lookup([
+                    (guess.word, guess.feedback.code)
+                    for guess in self._applied_guesses
+                ])
+                if guess is not None:
+                    wordle_stats.count("opening_book_hits")
+                    return guess
+
+        ranking = self.rank_guesses(1, workers, hard_mode)
+        return ranking[0][0] if ranking else None
+
+    def _ranking_key(
+        self, top_k: int, hard_mode: bool
+    ) -> Tuple[Tuple, Optional[np.ndarray]]:
+        """
+        Returns:
+            Tuple[Tuple, Optional[np.ndarray]]: The ranking cache key for the
+            current state, and the ids of the guesses to rank (None for all)
+        """
+        constraints = self._constraints[-1]
+        key = (
+            self.feedback_table.digest,
+            constraints.key(),
+            constraints.hard_mode().key() if hard_mode else None,
+            top_k
+        )
+        guess_ids = bitset_array(
+            self._hard_mode_pool(), len(self.feedback_table.guesses)
+        ) if hard_mode else None
+        return key, guess_ids
+
+    def rank_guesses_within(
+        self,
+        time_budget: float,
+        top_k: int = 10,
+        hard_mode: bool = False,
+        progress: Optional[Callable[[AnytimeRanking], None]] = None
+    ) -> AnytimeRanking:
+        """Ranks guesses like rank_guesses, but gives up on exact scoring
+        once the time budget is spent. Guesses are scored in order of their
+        positional letter frequency, so the likeliest ones are scored first.
+
+        Args:
+            time_budget (float): Seconds to spend on exact scoring
+            top_k (int): The number of guesses to return
+            hard_mode (bool): Only consider guesses which reuse every
+            revealed hint
+            progress (Optional[Callable[[AnytimeRanking], None]]): Called
+            with each improved ranking as it is found
+
+        Returns:
+            AnytimeRanking: The ranking, and how much of it is exact
+        """
+        self._sync()
+        key, guess_ids = self._ranking_key(top_k, hard_mode)
+        total = len(self.feedback_table.guesses) if guess_ids is None \
+            else len(guess_ids)
+
+        ranking = RANKING_CACHE.get(key)
+        if ranking is not None:
+            result = AnytimeRanking(list(ranking), total, total, True, 0.0)
+            if progress is not None:
+                progress(result)
+            return result
 
-        return valid_answers
+        candidate_ids = self._candidate_ids()
+        frequencies = self._candidate_letter_counts() \
+            / max(len(candidate_ids), 1)
+        with wordle_stats.stage("rank_within"):
+            result = anytime_rank(
+                self.feedback_table,
+                candidate_ids,
+                time_budget,
+                top_k,
+                guess_ids,
+                frequencies,
+                progress
+            )
+        wordle_stats.count("guesses_refined", result.refined)
+        if result.complete:
+            RANKING_CACHE.put(key, result.ranking)
+        return result
@@ -1,13 +1,30 @@
 import sys
-from typing import Callable
+import threading
+from typing import Callable, List, Optional, Tuple
 from PySide6 import QtCore, QtGui, QtWidgets
 
+from wordle_patterns import Feedback
 from wordle_solver import Wordle, WordleSolver
+from wordle_wordlist import default_answers
 
 _COLOR_LETTER_NOT_IN_WORD = "#202020"
 _COLOR_LETTER_CORRECT = "#009600"
 _COLOR_LETTER_WRONG_PLACE = "#ffc425"
 
+_TILE_COLORS = {
+    Feedback.NOT_IN_WORD: _COLOR_LETTER_NOT_IN_WORD,
+    Feedback.WRONG_PLACE: _COLOR_LETTER_WRONG_PLACE,
+    Feedback.CORRECT: _COLOR_LETTER_CORRECT,
+}
+
+# The tile each tile changes to when it is clicked
+_NEXT_TILE = {
+    Feedback.CORRECT: Feedback.WRONG_PLACE,
+    Feedback.WRONG_PLACE: Feedback.NOT_IN_WORD,
+    Feedback.NOT_IN_WORD: Feedback.CORRECT,
+}
+
+
 class LetterTile(QtWidgets.QPushButton):
     
     _STYLE_HIGHLIGHTED = "border-color: white; border-width: 2px;"
@@ -21,6 +38,9 @@ class LetterTile(QtWidgets.QPushButton):
         self.line_number:int = None
         self.letter_index:int = None
 
+        # The Feedback tile shown, or None while no letter is entered
+        self.tile: Optional[int] = None
+
     def _change_style_property(self, property: str, value: str) -> None:
         stylesheet = self.styleSheet().split()
         value_index = stylesheet.index(property + ':') + 1
@@ -30,17 +50,10 @@ class LetterTile(QtWidgets.QPushButton):
     def change_bg_color(self, color: str):
         self._change_style_property("background-color", color)
 
-    def hint(self) -> bool:
-        stylesheet = self.styleSheet().split()
-        
-        letter_color = stylesheet[stylesheet.index("background-color:") + 1].strip(';')
-        if letter_color == _COLOR_LETTER_CORRECT:
-            return Wordle.Guess._LETTER_CORRECT
-        elif letter_color == _COLOR_LETTER_WRONG_PLACE:
-            return Wordle.Guess._LETTER_WRONG_PLACE
-        else:
-            return Wordle.Guess._LETTER_NOT_IN_WORD
-        
+    def set_tile(self, tile: Optional[int], color: str = None) -> None:
+        self.tile = tile
+        self.change_bg_color(color or _TILE_COLORS[tile])
+
     def is_empty(self) -> bool:
         return self.text() == ''
 
@@ -57,45 +70,236 @@ class LetterTile(QtWidgets.QPushButton):
             )
 
 
+class CandidateModel(QtCore.QAbstractTableModel):
+    """The remaining candidates, each with its expected information as a
+    guess and its positional letter frequency score. Rows are handed to the
+    view a page at a time through fetchMore, and new candidate lists are
+    applied as a diff against the current one so that the view only
+    relays out the rows which changed.
+    """
+
+    _HEADERS = ("Word", "Score", "Frequency")
+    _PAGE_SIZE = 256
+
+    Row = Tuple[str, Optional[float], Optional[float]]
+
+    def __init__(self, parent: QtCore.QObject = None) -> None:
+        super().__init__(parent)
+        self._rows: List[CandidateModel.Row] = []
+        self._loaded = 0
+
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._HEADERS)
+
+    def data(self, index: QtCore.QModelIndex, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._rows[index.row()][index.column()]
+        if role == QtCore.Qt.UserRole:
+            # Raw values for sorting. Unscored rows sort last.
+            return -1.0 if value is None else value
+        if role == QtCore.Qt.DisplayRole:
+            if value is None:
+                return ''
+            return value if index.column() == 0 else f"{value:.3f}"
+        return None
+
+    def headerData(
+        self, section: int, orientation, role=QtCore.Qt.DisplayRole
+    ):
+        if role == QtCore.Qt.DisplayRole \
+                and orientation == QtCore.Qt.Horizontal:
+            return self._HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()) -> bool:
+        return not parent.isValid() and self._loaded < len(self._rows)
+
+    def fetchMore(self, parent=QtCore.QModelIndex()) -> None:
+        if parent.isValid():
+            return
+        count = min(self._PAGE_SIZE, len(self._rows) - self._loaded)
+        self.beginInsertRows(
+            QtCore.QModelIndex(), self._loaded, self._loaded + count - 1
+        )
+        self._loaded += count
+        self.endInsertRows()
+
+    def fetch_all(self) -> None:
+        if self.canFetchMore():
+            self.beginInsertRows(
+                QtCore.QModelIndex(), self._loaded, len(self._rows) - 1
+            )
+            self._loaded = len(self._rows)
+            self.endInsertRows()
+
+    def set_rows(self, rows: List[Row]) -> None:
+        """Replaces the candidates. Both the old and new rows must be in the
+        same relative order, as they are when they come from the solver.
+        """
+        new_words = {row[0] for row in rows}
+
+        # region Remove rows which are no longer candidates, last first
+        removed = [
+            i for (i, row) in enumerate(self._rows) if row[0] not in new_words
+        ]
+        while removed:
+            end = removed.pop() + 1
+            start = end - 1
+            while removed and removed[-1] == start - 1:
+                start = removed.pop()
+
+            visible = start < self._loaded
+            if visible:
+                self.beginRemoveRows(
+                    QtCore.QModelIndex(), start, min(end, self._loaded) - 1
+                )
+                self._loaded -= min(end, self._loaded) - start
+            del self._rows[start:end]
+            if visible:
+                self.endRemoveRows()
+        # endregion
+
+        # region Insert new candidates in runs
+        old_words = {row[0] for row in self._rows}
+        position = 0
+        i = 0
+        while i < len(rows):
+            if rows[i][0] in old_words:
+                self._rows[position] = rows[i]
+                position += 1
+                i += 1
+                continue
+
+            run_end = i
+            while run_end < len(rows) and rows[run_end][0] not in old_words:
+                run_end += 1
+            count = run_end - i
+
+            visible = position < self._loaded
+            if visible:
+                self.beginInsertRows(
+                    QtCore.QModelIndex(), position, position + count - 1
+                )
+                self._loaded += count
+            self._rows[position:position] = rows[i:run_end]
+            if visible:
+                self.endInsertRows()
+
+            position += count
+            i = run_end
+        # endregion
+
+        # Scores of the remaining candidates change as the set narrows
+        if self._loaded:
+            self.dataChanged.emit(
+                self.index(0, 1),
+                self.index(self._loaded - 1, len(self._HEADERS) - 1)
+            )
+
+        # Keep at least a page showing
+        if self._loaded < self._PAGE_SIZE and self.canFetchMore():
+            self.fetchMore()
+
+
+class SolveSignals(QtCore.QObject):
+    # Job id, candidate list, ranked suggestions and scored candidates
+    finished = QtCore.Signal(int, list, list, list)
+    # Job id and the reason the guesses could not be solved
+    failed = QtCore.Signal(int, str)
+
+
+class SolveJob(QtCore.QRunnable):
+    """Solves a set of guesses on a worker thread. A job can be cancelled,
+    which stops it at the next stage boundary; its results are then never
+    reported.
+    """
+
+    def __init__(
+        self,
+        job_id: int,
+        guesses: List[Wordle.Guess],
+        num_suggestions: int,
+        score_candidates: bool = False
+    ) -> None:
+        super().__init__()
+        self.job_id = job_id
+        self.guesses = guesses
+        self.num_suggestions = num_suggestions
+        self.score_candidates = score_candidates
+        self.signals = SolveSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def run(self) -> None:
+        if self._cancelled.is_set():
+            return
+        solver = WordleSolver(Wordle(self.guesses))
+        try:
+            solutions = solver.get_valid_answers()
+        except ValueError as error:
+            self.signals.failed.emit(self.job_id, str(error))
+            return
+
+        if self._cancelled.is_set():
+            return
+        suggestions = solver.rank_guesses(self.num_suggestions, workers=1) \
+            if solutions else []
+
+        if self._cancelled.is_set():
+            return
+        scored = solver.score_candidates() if self.score_candidates else []
+
+        if not self._cancelled.is_set():
+            self.signals.finished.emit(
+                self.job_id, solutions, suggestions, scored
+            )
+
+
 class WordleSolverGUI(QtWidgets.QWidget):
-    _APP_WIDTH = 500
-    _APP_HEIGHT = 600
+    _APP_HEIGHT = 640
     _LETTER_WIDTH = 100
     _LETTER_HEIGHT = 100
 
-    _LENGTH_ROW = 5
     _NUM_ROWS = 5
     _COLOR_LETTER_NOT_ENTERED = "#121213"
 
-    _RESULTS_VIEWER_GEOMETRY = QtCore.QRect(0, 0, _APP_WIDTH, _APP_WIDTH)
-    _SUBMIT_BUTTON_GEOMETRY = QtCore.QRect(
-        _APP_WIDTH / 2 - (3 * _LETTER_WIDTH / 2),
-        _NUM_ROWS * _LETTER_HEIGHT + _LETTER_HEIGHT / 4,
-        3 * _LETTER_WIDTH,
-        _LETTER_HEIGHT / 2
-    )
+    # Quiet period after an edit before the live count is recomputed
+    _LIVE_UPDATE_DELAY_MS = 150
+    _NUM_SUGGESTIONS = 3
 
-    def __init__(self) -> None:
+    def __init__(self, word_length: Optional[int] = None) -> None:
         super().__init__()
 
+        # One column per letter. Defaults to the length of the answer list
+        # the solver uses.
+        self.word_length = word_length or default_answers().word_length
+        app_width = self.word_length * self._LETTER_WIDTH
+        grid_height = self._NUM_ROWS * self._LETTER_HEIGHT
+
         # region Initialize widget layout
         self.setStyleSheet(
             "QPushButton {background-color: #101010; font: 48pt \"Arial\";"
             "border-style: solid; border-width: 3px; border-color: black;}"
         )
-        self.setGeometry(500, 300, self._APP_WIDTH, self._APP_HEIGHT)
+        self.setGeometry(500, 300, app_width, self._APP_HEIGHT)
         # endregion
 
         # region Initialize letter grid layout
         self.letter_grid = [
-            [LetterTile(self) for j in range(self._LENGTH_ROW)]
+            [LetterTile(self) for j in range(self.word_length)]
             for i in range(self._NUM_ROWS)
         ]
         # endregion
 
         # region Configure each letter tile
         for i in range(self._NUM_ROWS):
-            for j in range(self._LENGTH_ROW):
+            for j in range(self.word_length):
                 letter = self.letter_grid[i][j]
                 letter.setGeometry(
                     self._LETTER_WIDTH * j,
@@ -115,9 +319,43 @@ class WordleSolverGUI(QtWidgets.QWidget):
         # endregion
         
         # region Initialize results viewer
-        self.results = QtWidgets.QPlainTextEdit(self)
-        self.results.setGeometry(self._RESULTS_VIEWER_GEOMETRY)
-        self.results.setReadOnly(True)
+        self.results = QtWidgets.QWidget(self)
+        self.results.setGeometry(0, 0, app_width, grid_height)
+        self.results.setAutoFillBackground(True)
+        results_layout = QtWidgets.QVBoxLayout(self.results)
+
+        self.results_search = QtWidgets.QLineEdit(self.results)
+        self.results_search.setPlaceholderText("Search (Esc to close)")
+        results_layout.addWidget(self.results_search)
+
+        self.results_model = CandidateModel(self)
+        self.results_proxy = QtCore.QSortFilterProxyModel(self)
+        self.results_proxy.setSourceModel(self.results_model)
+        self.results_proxy.setSortRole(QtCore.Qt.UserRole)
+        self.results_proxy.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
+
+        self.results_view = QtWidgets.QTableView(self.results)
+        self.results_view.setModel(self.results_proxy)
+        self.results_view.setStyleSheet("font: 14pt Arial;")
+        self.results_view.verticalHeader().hide()
+        self.results_view.verticalHeader().setSectionResizeMode(
+            QtWidgets.QHeaderView.Fixed
+        )
+        self.results_view.horizontalHeader().setSectionResizeMode(
+            QtWidgets.QHeaderView.Stretch
+        )
+        self.results_view.horizontalHeader().setSortIndicator(
+            -1, QtCore.Qt.AscendingOrder
+        )
+        self.results_view.setSortingEnabled(True)
+        results_layout.addWidget(self.results_view)
+
+        # Sorting and searching need every row, not just the loaded pages
+        self.results_view.horizontalHeader().sortIndicatorChanged.connect(
+            lambda *_: self.results_model.fetch_all()
+        )
+        self.results_search.textChanged.connect(self._search_results)
+
         self.results.hide()
         self.results_showing = False
         # endregion
@@ -125,16 +363,46 @@ class WordleSolverGUI(QtWidgets.QWidget):
         # region Initialize submit button
         self.submit_button = QtWidgets.QPushButton(self)
         self.submit_button.setText("Get Solutions")
-        self.submit_button.setGeometry(self._SUBMIT_BUTTON_GEOMETRY)
+        self.submit_button.setGeometry(
+            app_width // 2 - 3 * self._LETTER_WIDTH // 2,
+            grid_height + self._LETTER_HEIGHT // 4,
+            3 * self._LETTER_WIDTH,
+            self._LETTER_HEIGHT // 2
+        )
         self.submit_button.setStyleSheet("font: 24pt Arial; color: white;")
         self.submit_button.clicked.connect(self._submit_guesses)
         # endregion
 
+        # region Initialize live candidate count
+        self.status = QtWidgets.QLabel(self)
+        self.status.setGeometry(
+            0,
+            grid_height + self._LETTER_HEIGHT,
+            app_width,
+            self._LETTER_HEIGHT * 2 // 5
+        )
+        self.status.setAlignment(QtCore.Qt.AlignCenter)
+        self.status.setStyleSheet("font: 14pt Arial; color: white;")
+
+        self.live_update_timer = QtCore.QTimer(self)
+        self.live_update_timer.setSingleShot(True)
+        self.live_update_timer.setInterval(self._LIVE_UPDATE_DELAY_MS)
+        self.live_update_timer.timeout.connect(self._update_live_count)
+        # endregion
+
+        # region Initialize background solving
+        self.thread_pool = QtCore.QThreadPool.globalInstance()
+        self.solve_job: SolveJob = None
+        self.solve_job_id = 0
+        self.show_results_when_solved = False
+        # endregion
+
         # region Initialize the user's grid cursor
         self.letter_cursor = [0, 0]
         self._current_letter().setHighlight(True)
         # endregion
-        
+
+        self._update_live_count()
         self.show()
 
     def _current_letter(self) -> LetterTile:
@@ -145,17 +413,13 @@ class WordleSolverGUI(QtWidgets.QWidget):
         if letter.is_empty():
             return
         
-        letter_style = letter.styleSheet()
-        if _COLOR_LETTER_CORRECT in letter_style:
-            letter.change_bg_color(_COLOR_LETTER_WRONG_PLACE)
-        elif _COLOR_LETTER_WRONG_PLACE in letter_style:
-            letter.change_bg_color(_COLOR_LETTER_NOT_IN_WORD)
-        else:
-            letter.change_bg_color(_COLOR_LETTER_CORRECT)
+        letter.set_tile(_NEXT_TILE.get(letter.tile, Feedback.CORRECT))
+        self._grid_changed()
 
     def _delete_current_letter(self) -> None:
         self._current_letter().setText('')
-        self._current_letter().change_bg_color(self._COLOR_LETTER_NOT_ENTERED)
+        self._current_letter().set_tile(None, self._COLOR_LETTER_NOT_ENTERED)
+        self._grid_changed()
 
 
     def _move_cursor(move_cursor: Callable):
@@ -213,36 +477,106 @@ class WordleSolverGUI(QtWidgets.QWidget):
     def _move_cursor_to_letter(self, letter: LetterTile) -> None:
         self.letter_cursor = [letter.line_number, letter.letter_index]
 
-    def _submit_guesses(self):
-        # Create a list of Wordle Guesses for the Wordle object
+    def _guesses(self) -> List[Wordle.Guess]:
+        # Create a list of Wordle Guesses from the completely filled rows
         guesses = []
         for row in self.letter_grid:
-            if row[0].is_empty():
+            if any(letter.is_empty() for letter in row):
                 break
             word = ''.join([letter.text() for letter in row])
-            hints = [letter.hint() for letter in row]
-            guesses.append(Wordle.Guess(word, hints))
-            
-        wordle = Wordle(guesses)
-        wordle_solver = WordleSolver(wordle)
-        solutions = wordle_solver.get_valid_answers()
-        
-        self.results.setPlainText("Possible Solutions: " + repr(solutions))
-        self.results.show()
-        
-        self.results_showing = True
+            feedback = Feedback.from_tiles([letter.tile for letter in row])
+            guesses.append(Wordle.Guess(word, feedback))
+        return guesses
+
+    def _start_solve(self) -> None:
+        """Solves the current grid on the thread pool, cancelling any solve
+        which is still running for an older version of the grid.
+        """
+        if self.solve_job is not None:
+            self.solve_job.cancel()
+
+        self.solve_job_id += 1
+        self.solve_job = SolveJob(
+            self.solve_job_id,
+            self._guesses(),
+            self._NUM_SUGGESTIONS,
+            score_candidates=self.show_results_when_solved
+        )
+        self.solve_job.signals.finished.connect(self._solve_finished)
+        self.solve_job.signals.failed.connect(self._solve_failed)
+        self.thread_pool.start(self.solve_job)
+
+    def _grid_changed(self) -> None:
+        if self.solve_job is not None:
+            self.solve_job.cancel()
+        self.show_results_when_solved = False
+        self.live_update_timer.start()
+
+    def _update_live_count(self) -> None:
+        self.status.setText("Solving...")
+        self._start_solve()
+
+    @QtCore.Slot(str)
+    def _search_results(self, text: str) -> None:
+        if text:
+            self.results_model.fetch_all()
+        self.results_proxy.setFilterFixedString(text)
+
+    @QtCore.Slot(int, list, list, list)
+    def _solve_finished(
+        self,
+        job_id: int,
+        solutions: List[str],
+        suggestions: list,
+        scored: list
+    ) -> None:
+        if job_id != self.solve_job_id:
+            return
+        self.solve_job = None
+
+        status = f"{len(solutions)} possible"
+        if suggestions:
+            status += " \u2022 try " + ", ".join(
+                word for word, _ in suggestions
+            )
+        self.status.setText(status)
+
+        if self.show_results_when_solved:
+            self.show_results_when_solved = False
+            self.results_model.set_rows(scored)
+            self.results.show()
+            self.results.raise_()
+            self.results_search.setFocus()
+            self.results_showing = True
+
+    @QtCore.Slot(int, str)
+    def _solve_failed(self, job_id: int, message: str) -> None:
+        if job_id != self.solve_job_id:
+            return
+        self.solve_job = None
+        self.show_results_when_solved = False
+        self.status.setText(message)
+
+    def _submit_guesses(self):
+        self.live_update_timer.stop()
+        self.show_results_when_solved = True
+        self._start_solve()
 
     def keyPressEvent(self, event: QtGui.QKeyEvent) -> None:
         if self.results_showing:
             self.results.hide()
             self.results_showing = False
+            self.setFocus()
             return
         
         key = event.key()
-        if event.text().isalpha():
+        # Only A-Z: the solver's word lists have no other letters
+        text = event.text()
+        if text.isascii() and text.isalpha():
             if self._current_letter().is_empty():
-                self._current_letter().change_bg_color(_COLOR_LETTER_NOT_IN_WORD)
-            self._current_letter().setText(event.text().upper())
+                self._current_letter().set_tile(Feedback.NOT_IN_WORD)
+            self._current_letter().setText(text.upper())
+            self._grid_changed()
             self._move_cursor_right()
         elif key == QtCore.Qt.Key_Backspace:
             if self._current_letter().is_empty():
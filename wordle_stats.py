@@ -0,0 +1,227 @@
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Instrumentation is off unless something turns it on. While it is off,
+# stage() hands back a shared no-op context and count() returns straight
+# away, so instrumented code pays for little more than a function call.
+_enabled = False
+
+_lock = threading.Lock()
+
+# Stage name -> [calls, total seconds, longest call in seconds]
+_timers: Dict[str, list] = {}
+_counters: Dict[str, int] = {}
+
+# Name -> object with a stats() method, such as an LRUCache
+_caches: Dict[str, Any] = {}
+
+
+def enable(enabled: bool = True) -> None:
+    """Turns stage timers and counters on or off. Cache statistics are kept
+    by the caches themselves and are always available.
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self.start
+        with _lock:
+            timer = _timers.get(self.name)
+            if timer is None:
+                _timers[self.name] = [1, elapsed, elapsed]
+            else:
+                timer[0] += 1
+                timer[1] += elapsed
+                if elapsed > timer[2]:
+                    timer[2] = elapsed
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str):
+    """
+    Args:
+        name (str): The stage to time, such as "narrow" or "rank"
+
+    Returns:
+        A context manager which adds the time spent inside it to the stage
+    """
+    return _Stage(name) if _enabled else _NULL_STAGE
+
+
+def count(name: str, amount: int = 1) -> None:
+    """
+    Args:
+        name (str): The counter to add to, such as "words_pruned"
+        amount (int): How much to add
+    """
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def register_cache(name: str, cache: Any) -> None:
+    """
+    Args:
+        name (str): The name to report the cache's statistics under
+        cache (Any): Anything with a stats() method returning a dict
+    """
+    _caches[name] = cache
+
+
+def reset() -> None:
+    """Clears the stage timers and counters."""
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def snapshot() -> Dict[str, Any]:
+    """
+    Returns:
+        Dict[str, Any]: Calls and seconds per stage, the counters, and the
+        statistics of every registered cache
+    """
+    with _lock:
+        timers = {
+            name: {"calls": calls, "seconds": total, "max_seconds": longest}
+            for name, (calls, total, longest) in sorted(_timers.items())
+        }
+        counters = dict(sorted(_counters.items()))
+    return {
+        "enabled": _enabled,
+        "stages": timers,
+        "counters": counters,
+        "caches": {
+            name: cache.stats() for name, cache in sorted(_caches.items())
+        }
+    }
+
+
+def to_json(indent: Optional[int] = None) -> str:
+    return json.dumps(snapshot(), indent=indent)
+
+
+def _prometheus_line(name: str, label: str, key: str, value) -> str:
+    key = key.replace('\\', '\\\\').replace('"', '\\"')
+    return f'{name}{{{label}="{key}"}} {value}'
+
+
+def to_prometheus(prefix: str = "wordle") -> str:
+    """
+    Args:
+        prefix (str): Prepended to every metric name
+
+    Returns:
+        str: The snapshot in the Prometheus text exposition format
+    """
+    stats = snapshot()
+    metrics = [
+        ("stage_calls_total", "counter", "Calls per solver stage",
+         "stage", {n: s["calls"] for n, s in stats["stages"].items()}),
+        ("stage_seconds_total", "counter", "Seconds spent per solver stage",
+         "stage", {n: s["seconds"] for n, s in stats["stages"].items()}),
+        ("stage_max_seconds", "gauge", "Longest call per solver stage",
+         "stage", {n: s["max_seconds"] for n, s in stats["stages"].items()}),
+        ("events_total", "counter", "Solver counters",
+         "counter", stats["counters"]),
+    ]
+    for field, kind in (
+        ("hits", "counter"),
+        ("misses", "counter"),
+        ("evictions", "counter"),
+        ("entries", "gauge"),
+        ("bytes", "gauge")
+    ):
+        suffix = "_total" if kind == "counter" else ""
+        metrics.append((
+            f"cache_{field}{suffix}", kind, f"Cache {field}", "cache",
+            {
+                name: cache[field]
+                for name, cache in stats["caches"].items()
+                if cache.get(field) is not None
+            }
+        ))
+
+    lines = []
+    for name, kind, description, label, values in metrics:
+        if not values:
+            continue
+        lines.append(f"# HELP {prefix}_{name} {description}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for key, value in values.items():
+            lines.append(
+                _prometheus_line(f"{prefix}_{name}", label, key, value)
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def profile(
+    fn: Callable,
+    *args,
+    path: Optional[str] = None,
+    limit: int = 30,
+    **kwargs
+) -> Any:
+    """Runs fn under cProfile with stage timers on, then reports where the
+    time went.
+
+    Args:
+        fn (Callable): Called as fn(*args, **kwargs)
+        path (Optional[str]): Where to dump the raw profile, for use with
+        pstats or snakeviz. If not given, the slowest functions by
+        cumulative time are printed to stderr instead.
+        limit (int): The number of functions to print
+
+    Returns:
+        Any: Whatever fn returned
+    """
+    was_enabled = _enabled
+    enable()
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args, **kwargs)
+    finally:
+        enable(was_enabled)
+        if path is not None:
+            profiler.dump_stats(path)
+        else:
+            report = io.StringIO()
+            pstats.Stats(profiler, stream=report) \
+                .sort_stats("cumulative").print_stats(limit)
+            sys.stderr.write(report.getvalue())
+        sys.stderr.write(to_json(indent=2) + '\n')
@@ -0,0 +1,420 @@
+import argparse
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import wordle_stats
+from wordle_constraints import Constraints, get_index
+from wordle_feedback import (
+    Feedback, FeedbackTable, bitset_array, get_default_table, word_list_hash
+)
+from wordle_ranking import entropies
+
+OBJECTIVE_EXPECTED = "expected"
+OBJECTIVE_MINIMAX = "minimax"
+
+_NO_GUESS = -1
+
+
+class TreeSearch:
+    """Searches for a strategy tree which solves every answer in a candidate
+    set. The tree either minimizes the total number of guesses over all
+    answers (and so the expected number of guesses) or, as a minimax option,
+    the number of guesses needed for the hardest answer.
+
+    At each node only the beam_width guesses with the most expected
+    information are searched, along with the best of the candidates
+    themselves. Subproblems are memoized on the sorted candidate ids, and
+    guesses are abandoned as soon as a lower bound on their cost shows they
+    cannot beat the best guess found so far.
+
+    In hard mode each node only considers the guesses which reuse every hint
+    revealed on the way to it. The pool of such guesses is narrowed from the
+    parent's pool and becomes part of the memo key.
+    """
+
+    def __init__(
+        self,
+        table: FeedbackTable,
+        objective: str = OBJECTIVE_EXPECTED,
+        beam_width: int = 3,
+        guess_ids: Optional[np.ndarray] = None,
+        hard_mode: bool = False
+    ) -> None:
+        if objective not in (OBJECTIVE_EXPECTED, OBJECTIVE_MINIMAX):
+            raise ValueError(f"Unknown objective {objective!r}")
+
+        self.table = table
+        self.objective = objective
+        self.beam_width = beam_width
+        self.guess_ids = (
+            np.arange(len(table.guesses)) if guess_ids is None else guess_ids
+        )
+        self.hard_mode = hard_mode
+        self.guess_index = get_index(table.guesses)
+
+        # Bitset of the guesses allowed at the root
+        self.root_pool = 0
+        for guess_id in self.guess_ids:
+            self.root_pool |= 1 << int(guess_id)
+
+        # Answer id -> guess id, for answers which are also allowed guesses
+        self._answer_guess_ids = np.array([
+            table.guess_ids.get(word, _NO_GUESS) for word in table.answers
+        ])
+
+        # Canonical candidate key (plus guess pool in hard mode) ->
+        # (cost, guess id)
+        self._memo: Dict[Tuple[bytes, int], Tuple[int, int]] = {}
+
+    def child_pool(self, pool: int, guess_id: int, pattern: int) -> int:
+        """
+        Args:
+            pool (int): Bitset of the guesses allowed at a node
+            guess_id (int): The guess made at the node
+            pattern (int): The feedback shown for it
+
+        Returns:
+            int: Bitset of the guesses allowed at the child node
+        """
+        if not self.hard_mode:
+            return pool
+        revealed = Constraints(self.table.word_length)
+        revealed.add_guess(
+            self.table.guesses[guess_id],
+            Feedback(pattern, self.table.word_length)
+        )
+        return pool & self.guess_index.filter(revealed.hard_mode())
+
+    def _lower_bound(self, num_candidates: int) -> int:
+        if num_candidates == 0:
+            return 0
+        if self.objective == OBJECTIVE_MINIMAX:
+            return 1 if num_candidates == 1 else 2
+        # At best one answer is guessed straight away and the rest take at
+        # least one more guess each
+        return 2 * num_candidates - 1
+
+    def _combine(self, num_candidates: int, costs: List[int]) -> int:
+        if self.objective == OBJECTIVE_MINIMAX:
+            return 1 + max(costs, default=0)
+        return num_candidates + sum(costs)
+
+    def _buckets(
+        self, guess_id: int, candidate_ids: np.ndarray
+    ) -> List[np.ndarray]:
+        """
+        Returns:
+            List[np.ndarray]: The candidates split by the pattern the guess
+            produces, leaving out the answer the guess itself solves
+        """
+        patterns = self.table.patterns[guess_id][candidate_ids]
+        order = np.argsort(patterns, kind="stable")
+        sorted_patterns = patterns[order]
+        splits = np.flatnonzero(np.diff(sorted_patterns)) + 1
+        starts = np.concatenate(([0], splits))
+
+        buckets = []
+        for bucket, start in zip(np.split(order, splits), starts):
+            if sorted_patterns[start] != self.table.all_correct:
+                buckets.append(candidate_ids[bucket])
+        return buckets
+
+    def _guesses_to_try(
+        self, candidate_ids: np.ndarray, pool: int
+    ) -> List[int]:
+        guess_ids = self.guess_ids if pool == self.root_pool \
+            else bitset_array(pool, len(self.table.guesses))
+        scores = entropies(self.table, guess_ids, candidate_ids)
+        best = np.argsort(-scores, kind="stable")[:self.beam_width]
+        guesses = [int(guess_ids[i]) for i in best if scores[i] > 0]
+
+        # The candidate with the most information can end the game at once,
+        # which the plain entropy ranking does not reward
+        own_ids = self._answer_guess_ids[candidate_ids]
+        own_ids = own_ids[own_ids != _NO_GUESS]
+        if len(own_ids) > 0:
+            own_scores = entropies(self.table, own_ids, candidate_ids)
+            own_best = int(own_ids[np.argmax(own_scores)])
+            if own_best not in guesses:
+                guesses.append(own_best)
+
+        return guesses
+
+    def solve(
+        self, candidate_ids: np.ndarray, pool: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """
+        Args:
+            candidate_ids (np.ndarray): Sorted ids of the remaining answers
+            pool (Optional[int]): Bitset of the guesses allowed here.
+            Defaults to every guess the search was given.
+
+        Returns:
+            Tuple[int, int]: The cost of the best strategy found for these
+            candidates, and the id of the guess it starts with
+        """
+        num_candidates = len(candidate_ids)
+        if num_candidates <= 2:
+            guess_id = int(self._answer_guess_ids[candidate_ids[0]])
+            if guess_id != _NO_GUESS:
+                if self.objective == OBJECTIVE_MINIMAX:
+                    return num_candidates, guess_id
+                return 2 * num_candidates - 1, guess_id
+
+        if pool is None:
+            pool = self.root_pool
+        key = (
+            candidate_ids.astype(np.int32).tobytes(),
+            pool if self.hard_mode else 0
+        )
+        result = self._memo.get(key)
+        if result is not None:
+            wordle_stats.count("tree_memo_hits")
+            return result
+        wordle_stats.count("tree_nodes_searched")
+
+        best_cost = None
+        best_guess = _NO_GUESS
+        for guess_id in self._guesses_to_try(candidate_ids, pool):
+            buckets = self._buckets(guess_id, candidate_ids)
+            patterns = self.table.patterns[guess_id]
+
+            # Skip guesses which do not split the candidates at all
+            if len(buckets) == 1 and len(buckets[0]) == num_candidates:
+                continue
+
+            bounds = [self._lower_bound(len(bucket)) for bucket in buckets]
+            if (best_cost is not None
+                    and self._combine(num_candidates, bounds) >= best_cost):
+                wordle_stats.count("tree_guesses_pruned")
+                continue
+
+            # Solve the largest buckets first so that hopeless guesses are
+            # abandoned as early as possible
+            costs = list(bounds)
+            pruned = False
+            for i in sorted(range(len(buckets)), key=lambda i: -bounds[i]):
+                bucket = buckets[i]
+                bucket_pool = self.child_pool(
+                    pool, guess_id, int(patterns[bucket[0]])
+                )
+                costs[i] = self.solve(bucket, bucket_pool)[0]
+                if (best_cost is not None
+                        and self._combine(num_candidates, costs) >= best_cost):
+                    wordle_stats.count("tree_guesses_pruned")
+                    pruned = True
+                    break
+
+            if not pruned:
+                best_cost = self._combine(num_candidates, costs)
+                best_guess = guess_id
+
+        if best_cost is None:
+            raise ValueError("No guess can tell these candidates apart")
+
+        result = (best_cost, best_guess)
+        self._memo[key] = result
+        return result
+
+
+class StrategyTree:
+    """A strategy tree stored as flat arrays. Node 0 is the root, and each
+    node holds the guess to make plus one child per feedback pattern, sorted
+    by pattern code.
+    """
+
+    def __init__(
+        self,
+        table: FeedbackTable,
+        guesses: np.ndarray,
+        child_offsets: np.ndarray,
+        child_patterns: np.ndarray,
+        child_nodes: np.ndarray
+    ) -> None:
+        self.table = table
+        self.guesses = guesses
+        self.child_offsets = child_offsets
+        self.child_patterns = child_patterns
+        self.child_nodes = child_nodes
+
+    @classmethod
+    def build(
+        cls,
+        table: FeedbackTable,
+        objective: str = OBJECTIVE_EXPECTED,
+        beam_width: int = 3,
+        candidate_ids: Optional[np.ndarray] = None,
+        hard_mode: bool = False
+    ) -> Tuple["StrategyTree", int]:
+        """
+        Args:
+            table (FeedbackTable): The feedback table to build the tree from
+            objective (str): OBJECTIVE_EXPECTED or OBJECTIVE_MINIMAX
+            beam_width (int): The number of guesses searched at each node
+            candidate_ids (Optional[np.ndarray]): The answers the tree must
+            solve. Defaults to every answer in the table.
+            hard_mode (bool): Only make guesses which reuse every revealed
+            hint
+
+        Returns:
+            Tuple[StrategyTree, int]: The tree and its cost, which is the
+            total number of guesses over all answers or the worst-case number
+            of guesses, depending on the objective
+        """
+        search = TreeSearch(table, objective, beam_width, hard_mode=hard_mode)
+        if candidate_ids is None:
+            candidate_ids = np.arange(len(table.answers))
+
+        guesses = []
+        children: List[List[Tuple[int, int]]] = []
+
+        def add_node(node_candidates: np.ndarray, pool: int) -> int:
+            node = len(guesses)
+            guess_id = search.solve(node_candidates, pool)[1]
+            guesses.append(guess_id)
+            children.append([])
+
+            patterns = table.patterns[guess_id]
+            for bucket in search._buckets(guess_id, node_candidates):
+                pattern = int(patterns[bucket[0]])
+                child = add_node(
+                    bucket, search.child_pool(pool, guess_id, pattern)
+                )
+                children[node].append((pattern, child))
+            return node
+
+        cost = search.solve(candidate_ids)[0]
+        add_node(candidate_ids, search.root_pool)
+
+        child_offsets = np.zeros(len(guesses) + 1, dtype=np.int32)
+        child_offsets[1:] = np.cumsum([len(c) for c in children])
+        flat = sorted(
+            (node, pattern, child)
+            for node, node_children in enumerate(children)
+            for pattern, child in node_children
+        )
+        tree = cls(
+            table,
+            np.array(guesses, dtype=np.int32),
+            child_offsets,
+            np.array(
+                [pattern for _, pattern, _ in flat],
+                dtype=table.patterns.dtype
+            ),
+            np.array([child for _, _, child in flat], dtype=np.int32)
+        )
+        return tree, cost
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(
+            path,
+            word_list_hash=np.array(
+                word_list_hash(self.table.guesses, self.table.answers)
+            ),
+            guesses=self.guesses,
+            child_offsets=self.child_offsets,
+            child_patterns=self.child_patterns,
+            child_nodes=self.child_nodes
+        )
+
+    @classmethod
+    def load(cls, path: str, table: FeedbackTable) -> "StrategyTree":
+        """
+        Args:
+            path (str): A file written by StrategyTree.save
+            table (FeedbackTable): The table over the word lists the tree was
+            built from
+
+        Returns:
+            StrategyTree: The loaded tree
+        """
+        with np.load(path) as data:
+            expected_hash = word_list_hash(table.guesses, table.answers)
+            if str(data["word_list_hash"]) != expected_hash:
+                raise ValueError(
+                    f"{path} was built from a different word list"
+                )
+            return cls(
+                table,
+                data["guesses"],
+                data["child_offsets"],
+                data["child_patterns"],
+                data["child_nodes"]
+            )
+
+    def guess(self, node: int = 0) -> str:
+        return self.table.guesses[self.guesses[node]]
+
+    def child(self, node: int, pattern: int) -> Optional[int]:
+        """
+        Args:
+            node (int): The current node
+            pattern (int): The feedback shown for the node's guess
+
+        Returns:
+            Optional[int]: The node to move to, or None if the pattern is not
+            possible from this node (or solves the game)
+        """
+        start = self.child_offsets[node]
+        end = self.child_offsets[node + 1]
+        i = start + np.searchsorted(self.child_patterns[start:end], pattern)
+        if i < end and self.child_patterns[i] == pattern:
+            return int(self.child_nodes[i])
+        return None
+
+    def next_guess(self, patterns: Sequence[int]) -> Optional[str]:
+        """
+        Args:
+            patterns (Sequence[int]): The feedback shown for each guess the
+            tree has suggested so far
+
+        Returns:
+            Optional[str]: The next guess to make, or None if the feedback
+            does not match any answer the tree covers
+        """
+        node = 0
+        for pattern in patterns:
+            node = self.child(node, pattern)
+            if node is None:
+                return None
+        return self.guess(node)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build a Wordle strategy tree over the built-in answers"
+    )
+    parser.add_argument("output", help="Where to write the tree (.npz)")
+    parser.add_argument(
+        "--objective",
+        choices=[OBJECTIVE_EXPECTED, OBJECTIVE_MINIMAX],
+        default=OBJECTIVE_EXPECTED
+    )
+    parser.add_argument("--beam-width", type=int, default=3)
+    parser.add_argument(
+        "--hard-mode", action="store_true",
+        help="Only make guesses which reuse every revealed hint"
+    )
+    parser.add_argument(
+        "--profile", nargs='?', const='', metavar="PATH",
+        help="Profile the build, printing a report to stderr or dumping "
+        "the raw profile to PATH"
+    )
+    args = parser.parse_args()
+
+    table = get_default_table()
+    build_args = (table, args.objective, args.beam_width, None, args.hard_mode)
+    if args.profile is None:
+        tree, cost = StrategyTree.build(*build_args)
+    else:
+        tree, cost = wordle_stats.profile(
+            StrategyTree.build, *build_args, path=args.profile or None
+        )
+    tree.save(args.output)
+
+    if args.objective == OBJECTIVE_MINIMAX:
+        print(f"Worst case: {cost} guesses")
+    else:
+        print(f"Expected: {cost / len(table.answers):.4f} guesses")
+    print(f"Root guess: {tree.guess()} ({len(tree.guesses)} nodes)")
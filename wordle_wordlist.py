@@ -0,0 +1,234 @@
+import argparse
+import hashlib
+import mmap
+import operator
+import os
+import struct
+import tempfile
+import zlib
+from functools import cached_property
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Union
+
+# Header of a compiled word list: magic, format version, word length, word
+# count and a CRC-32 of the records. The records follow as fixed-width
+# uppercase ASCII words with no separators.
+_MAGIC = b"WDLW"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHII")
+
+_ANSWERS_ENV = "WORDLE_ANSWERS"
+_GUESSES_ENV = "WORDLE_GUESSES"
+_CACHE_DIR_ENV = "WORDLE_SOLVER_CACHE"
+
+
+class WordList(Sequence[str]):
+    """A read-only list of equal-length words backed by packed fixed-width
+    records. Words are only decoded into strings when they are accessed, so
+    loading even a large list costs almost nothing.
+    """
+
+    def __init__(
+        self,
+        records: Union[bytes, memoryview],
+        word_length: int,
+        path: Optional[str] = None
+    ) -> None:
+        if len(records) % word_length:
+            raise ValueError("Records are not a whole number of words")
+        self.records = records
+        self.word_length = word_length
+        self.path = path
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> "WordList":
+        words = [word.strip().upper() for word in words]
+        words = [word for word in words if word]
+        if not words:
+            raise ValueError("A word list needs at least one word")
+
+        word_length = len(words[0])
+        for word in words:
+            if len(word) != word_length or not word.isascii() \
+                    or not word.isalpha():
+                raise ValueError(
+                    f"{word!r} is not a {word_length}-letter A-Z word"
+                )
+        return cls(''.join(words).encode("ascii"), word_length)
+
+    def __len__(self) -> int:
+        return len(self.records) // self.word_length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        index = operator.index(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("word list index out of range")
+        start = index * self.word_length
+        return str(self.records[start:start + self.word_length], "ascii")
+
+    def __iter__(self) -> Iterator[str]:
+        for start in range(0, len(self.records), self.word_length):
+            yield str(self.records[start:start + self.word_length], "ascii")
+
+    @cached_property
+    def ids(self) -> Dict[str, int]:
+        """Word -> index, built on first use."""
+        return {word: i for (i, word) in enumerate(self)}
+
+    def __contains__(self, word) -> bool:
+        return word in self.ids
+
+    def index(self, word, start: int = 0, stop: Optional[int] = None) -> int:
+        i = self.ids.get(word)
+        if i is None or i < start or (stop is not None and i >= stop):
+            raise ValueError(f"{word!r} is not in the word list")
+        return i
+
+    @cached_property
+    def digest(self) -> str:
+        return hashlib.sha1(self.records).hexdigest()
+
+    def __reduce__(self):
+        # Memory-mapped lists are reopened from their file rather than copied
+        if self.path is not None:
+            return (load_word_list, (self.path,))
+        return (WordList, (bytes(self.records), self.word_length))
+
+
+def compile_word_list(words: Iterable[str], path: str) -> WordList:
+    """Writes words to a compiled word list file.
+
+    Args:
+        words (Iterable[str]): Equal-length words made up of the letters A-Z
+        path (str): Where to write the file
+
+    Returns:
+        WordList: The compiled list, memory-mapped from the new file
+    """
+    word_list = words if isinstance(words, WordList) else \
+        WordList.from_words(words)
+    records = bytes(word_list.records)
+    header = _HEADER.pack(
+        _MAGIC, _VERSION, word_list.word_length, len(word_list),
+        zlib.crc32(records)
+    )
+
+    # Write to a temporary file first so that readers never see a partially
+    # written list. Its name is unique, so concurrent writers cannot
+    # overwrite each other's file.
+    fd, temp_path = tempfile.mkstemp(
+        prefix=f"{os.path.basename(path)}.", suffix=".tmp",
+        dir=os.path.dirname(path) or None
+    )
+    with os.fdopen(fd, "wb") as list_file:
+        list_file.write(header)
+        list_file.write(records)
+    os.replace(temp_path, path)
+
+    return load_word_list(path)
+
+
+def load_word_list(path: str) -> WordList:
+    """Loads a word list from a compiled file, which is memory-mapped, or
+    from a text file with one word per line.
+
+    Args:
+        path (str): The file to load
+
+    Returns:
+        WordList: The words in the file
+    """
+    with open(path, "rb") as list_file:
+        if list_file.read(len(_MAGIC)) != _MAGIC:
+            list_file.seek(0)
+            return WordList.from_words(
+                str(list_file.read(), "ascii").splitlines()
+            )
+        mapped = mmap.mmap(list_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapped) < _HEADER.size:
+        raise ValueError(f"{path} is truncated")
+    _, version, word_length, count, checksum = _HEADER.unpack_from(mapped)
+    if version != _VERSION:
+        raise ValueError(f"{path} has unsupported version {version}")
+
+    records = memoryview(mapped)[_HEADER.size:]
+    if len(records) != word_length * count:
+        raise ValueError(f"{path} is truncated")
+    if zlib.crc32(records) != checksum:
+        raise ValueError(f"{path} is corrupt (checksum mismatch)")
+
+    return WordList(records, word_length, path)
+
+
+def default_cache_dir() -> str:
+    return os.environ.get(_CACHE_DIR_ENV) or os.path.join(
+        os.path.expanduser('~'), ".cache", "wordle_solver"
+    )
+
+
+def _builtin_answers() -> WordList:
+    """The built-in answer list, compiled into the cache directory the first
+    time it is used so that later runs need not import wordle_answers.
+    """
+    source = os.path.join(os.path.dirname(__file__), "wordle_answers.py")
+    path = os.path.join(default_cache_dir(), "answers.wdl")
+    try:
+        if os.path.getmtime(path) >= os.path.getmtime(source):
+            return load_word_list(path)
+    except (OSError, ValueError):
+        pass
+
+    from wordle_answers import ALL_WORDLE_ANSWERS
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return compile_word_list(ALL_WORDLE_ANSWERS, path)
+    except OSError:
+        return WordList.from_words(ALL_WORDLE_ANSWERS)
+
+
+_default_answers: Optional[WordList] = None
+_default_guesses: Optional[WordList] = None
+
+
+def default_answers() -> WordList:
+    """
+    Returns:
+        WordList: The answer list named by $WORDLE_ANSWERS, or the built-in
+        answer list
+    """
+    global _default_answers
+    if _default_answers is None:
+        path = os.environ.get(_ANSWERS_ENV)
+        _default_answers = load_word_list(path) if path else _builtin_answers()
+    return _default_answers
+
+
+def default_guesses() -> WordList:
+    """
+    Returns:
+        WordList: The allowed-guess list named by $WORDLE_GUESSES, or the
+        answer list
+    """
+    global _default_guesses
+    if _default_guesses is None:
+        path = os.environ.get(_GUESSES_ENV)
+        _default_guesses = load_word_list(path) if path else default_answers()
+    return _default_guesses
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compile a text word list (one word per line) into the "
+        "packed binary format"
+    )
+    parser.add_argument("input", help="Text or compiled word list")
+    parser.add_argument("output", help="Where to write the compiled list")
+    args = parser.parse_args()
+
+    word_list = compile_word_list(load_word_list(args.input), args.output)
+    print(f"Compiled {len(word_list)} {word_list.word_length}-letter words")